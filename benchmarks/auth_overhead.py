@@ -0,0 +1,83 @@
+"""
+Microbenchmark del costo de autenticación por request.
+
+Genera un par de claves RSA local, apunta IAM_PUBLIC_KEY a la pública y mide
+por llamada:
+
+- baseline: jwt.decode con el PEM en texto (lo que se hacía antes)
+- cold:     TokenVerifier con caché, pero cada token es nuevo (siempre falla)
+- warm:     TokenVerifier con caché y el mismo token repetido
+
+    uv run python -m benchmarks.auth_overhead --iterations 5000
+"""
+import argparse
+import os
+import time
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def generate_keypair() -> tuple[str, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    return private_pem, public_pem
+
+
+def sign(private_key, sub: str) -> str:
+    claims = {"sub": sub, "roles": ["STUDENT"], "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, private_key, algorithm="RS256")
+
+
+def per_call_us(fn, tokens: list[str]) -> float:
+    started = time.perf_counter()
+    for token in tokens:
+        fn(f"Bearer {token}")
+    return (time.perf_counter() - started) / len(tokens) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    private_pem, public_pem = generate_keypair()
+    os.environ["IAM_PUBLIC_KEY"] = public_pem
+
+    # Import diferido: la configuración lee IAM_PUBLIC_KEY al importarse
+    from src.interface.api import dependencies
+
+    def baseline(authorization: str) -> dict:
+        return jwt.decode(
+            authorization.split(" ", 1)[1],
+            key=public_pem,
+            algorithms=["RS256"],
+            options={"verify_aud": False},
+        )
+
+    # Parsear la clave privada es caro; se hace una vez para firmar todos los tokens
+    private_key = serialization.load_pem_private_key(private_pem.encode(), password=None)
+    fresh_tokens = [sign(private_key, f"user-{i}") for i in range(args.iterations)]
+    same_token = [sign(private_key, "hot-user")] * args.iterations
+
+    results = {
+        "baseline_us": per_call_us(baseline, fresh_tokens),
+        "cold_us": per_call_us(dependencies._authenticate, fresh_tokens),
+        "warm_us": per_call_us(dependencies._authenticate, same_token),
+    }
+    for name, value in results.items():
+        print(f"{name:12s} {value:10.1f}")
+    print(dependencies.token_verifier.cache.stats() if dependencies.token_verifier.cache else "cache disabled")
+
+
+if __name__ == "__main__":
+    main()
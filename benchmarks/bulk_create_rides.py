@@ -0,0 +1,88 @@
+"""
+Alta de N rides uno por uno vs el alta masiva.
+
+El modo `single` usa `CreateRideUseCase` en un bucle (un INSERT y un commit por
+ride), como una integración de flota que llama a POST /rides por cada fecha; el modo `bulk` usa
+`BulkCreateRidesUseCase` (INSERT multi-fila con RETURNING, un commit por chunk).
+
+    uv run python -m benchmarks.bulk_create_rides --rides 1000 --chunk-size 200
+"""
+import argparse
+import time
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from src.application.dto import CreateRideCommand
+from src.application.use_cases.create_ride import BulkCreateRidesUseCase, CreateRideUseCase
+from src.domain.clock import utcnow
+from src.infrastructure.db.session import SessionLocal, engine, init_db
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+
+def commands(count: int, label: str) -> list[CreateRideCommand]:
+    start = utcnow() + timedelta(days=1)
+    return [
+        CreateRideCommand(
+            driver_id=f"bench-{label}",
+            origin="UPC Monterrico",
+            destination="Miraflores",
+            departure_time=start + timedelta(days=i),
+            seats_total=4,
+        )
+        for i in range(count)
+    ]
+
+
+def run(label: str, count: int, chunk_size: int) -> dict:
+    batch = commands(count, label)
+    statements = 0
+    commits = 0
+
+    def count_statement(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    def count_commit(*_args) -> None:
+        nonlocal commits
+        commits += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    event.listen(engine, "commit", count_commit)
+    started = time.perf_counter()
+    try:
+        with SessionLocal() as session:
+            uow = SQLAlchemyUnitOfWork(session)
+            if label == "single":
+                use_case = CreateRideUseCase(uow)
+                created = sum(1 for command in batch if use_case.execute(command).id)
+            else:
+                results = BulkCreateRidesUseCase(uow, chunk_size=chunk_size).execute(batch)
+                created = sum(1 for result in results if result.ride is not None)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+        event.remove(engine, "commit", count_commit)
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": label,
+        "rides": created,
+        "db_statements": statements,
+        "commits": commits,
+        "seconds": round(elapsed, 3),
+        "rides_per_s": round(created / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    print(run("single", args.rides, args.chunk_size))
+    print(run("bulk", args.rides, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Búsqueda de rides por cercanía sobre un dataset sintético (1M por defecto).
+
+Siembra rides con orígenes aleatorios en un rectángulo del tamaño de Lima
+(~50 x 45 km) y compara, para consultas de radio aleatorias:
+
+- `geohash`: `list_rides(origin_area=...)`, que busca las celdas geohash que
+  cubren el área en su índice B-tree (hasta ~3 km de radio; más grande, el
+  planner recorre el índice por fecha);
+- `no_index`: los mismos filtros de rectángulo y distancia solo sobre
+  latitud/longitud, es decir, lo que haría la base sin índice espacial.
+
+La siembra se reutiliza entre corridas si la base ya tiene las filas.
+
+    uv run python -m benchmarks.geo_search --rides 1000000 --queries 200 --radius-km 2
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import and_, func, insert, select
+
+from src.domain.clock import utcnow
+from src.domain.entities import Ride, RideStatus
+from src.domain.geo import KM_PER_DEGREE, GeoRadius
+from src.infrastructure.db.models import RideModel
+from src.infrastructure.db.session import SessionLocal, engine, init_db
+from src.infrastructure.repositories.ride_queries import list_rides_stmt, ride_values
+
+DRIVER = "geo-bench"
+MIN_LAT, MAX_LAT = -12.30, -11.90
+MIN_LNG, MAX_LNG = -77.15, -76.75
+
+
+def seed(rides: int, batch: int = 10_000) -> None:
+    with engine.begin() as conn:
+        present = conn.execute(
+            select(func.count()).select_from(RideModel).where(RideModel.driver_id == DRIVER)
+        ).scalar_one()
+        if present >= rides:
+            return
+        rng = random.Random(7)
+        now = utcnow()
+        started = time.perf_counter()
+        for offset in range(present, rides, batch):
+            rows = []
+            for i in range(offset, min(offset + batch, rides)):
+                ride = Ride(
+                    id=None,
+                    driver_id=DRIVER,
+                    origin=f"place-{i % 500}",
+                    destination=f"place-{(i * 7) % 500}",
+                    departure_time=now + timedelta(minutes=i % 200_000),
+                    seats_total=4,
+                    seats_available=4,
+                    status=RideStatus.OPEN if i % 4 else RideStatus.COMPLETED,
+                    created_at=now,
+                    updated_at=now,
+                    origin_lat=rng.uniform(MIN_LAT, MAX_LAT),
+                    origin_lng=rng.uniform(MIN_LNG, MAX_LNG),
+                    destination_lat=rng.uniform(MIN_LAT, MAX_LAT),
+                    destination_lng=rng.uniform(MIN_LNG, MAX_LNG),
+                )
+                rows.append(ride_values(ride))
+            conn.execute(insert(RideModel), rows)
+        print(f"seeded {rides - present} rides in {time.perf_counter() - started:.1f}s")
+
+
+def no_index_stmt(area: GeoRadius, limit: int):
+    box = area.bounding_box()
+    dlat = RideModel.origin_lat - area.lat
+    dlng = (RideModel.origin_lng - area.lng) * area.lng_scale
+    return list_rides_stmt(status=RideStatus.OPEN, limit=limit).where(
+        and_(
+            RideModel.origin_lat.between(box.min_lat, box.max_lat),
+            RideModel.origin_lng.between(box.min_lng, box.max_lng),
+            dlat * dlat + dlng * dlng <= (area.radius_km / KM_PER_DEGREE) ** 2,
+        )
+    )
+
+
+def measure(label: str, areas: list[GeoRadius], build, limit: int) -> dict:
+    timings = []
+    found = 0
+    with SessionLocal() as session:
+        for area in areas:
+            started = time.perf_counter()
+            rows = session.execute(build(area, limit)).all()
+            timings.append((time.perf_counter() - started) * 1000)
+            found += len(rows)
+            session.expunge_all()
+    timings.sort()
+    return {
+        "mode": label,
+        "queries": len(areas),
+        "avg_rows": round(found / len(areas), 1),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "max_ms": round(timings[-1], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=2.0)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rides)
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE rides")
+            conn.commit()
+        else:
+            conn.exec_driver_sql("ANALYZE")
+
+    rng = random.Random(11)
+    areas = [
+        GeoRadius(
+            lat=rng.uniform(MIN_LAT, MAX_LAT),
+            lng=rng.uniform(MIN_LNG, MAX_LNG),
+            radius_km=args.radius_km,
+        )
+        for _ in range(args.queries)
+    ]
+
+    def geohash_stmt(area: GeoRadius, limit: int):
+        return list_rides_stmt(status=RideStatus.OPEN, origin_area=area, limit=limit)
+
+    print(measure("no_index", areas, no_index_stmt, args.limit))
+    print(measure("geohash", areas, geohash_stmt, args.limit))
+
+
+if __name__ == "__main__":
+    main()
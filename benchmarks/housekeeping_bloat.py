@@ -0,0 +1,228 @@
+"""
+Latencia de los listados con y sin historial acumulado, antes y después del housekeeping.
+
+Usa la base de DATABASE_URL, que debe ser descartable: el housekeeping vence y
+archiva toda la tabla, no solo lo sembrado acá. Siembra:
+
+- `--history` rides que ya salieron (último año), con un pasajero cada uno: la
+  mitad quedó OPEN/FULL porque el driver nunca llamó a complete_ride, el resto
+  COMPLETED/CANCELLED;
+- `--live` rides OPEN que salen en los próximos días.
+
+Mide cada listado (p50/p95 de `--repeat` corridas y cuántos rides de la primera
+página ya salieron) con la tabla inflada, corre un ciclo completo del
+housekeeping mientras un hilo hace joins sobre los rides vigentes (latencia del
+join en reposo contra durante los lotes) y vuelve a medir con la tabla limpia.
+
+    DATABASE_URL=sqlite:////tmp/bloat.db uv run python -m benchmarks.housekeeping_bloat --history 200000 --live 5000
+"""
+import argparse
+import contextlib
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+from sqlalchemy import String, cast, func, insert, literal, select
+
+from src.application.dto import JoinRideCommand
+from src.application.use_cases.join_ride import (
+    JoinRideUseCase,
+    RideIsFullError,
+)
+from src.domain.clock import utcnow
+from src.domain.entities import Ride, RideStatus
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.infrastructure.db.models import (
+    PassengerStatusDB,
+    RideArchiveModel,
+    RideModel,
+    RidePassengerModel,
+)
+from src.infrastructure.db.session import SessionLocal, engine, init_db
+from src.infrastructure.housekeeping import HousekeepingScheduler
+from src.infrastructure.repositories.ride_queries import open_place_counts_stmt, ride_values
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+HISTORY_DRIVER = "bloat-history"
+LIVE_DRIVER = "bloat-live"
+_HISTORY_STATUSES = (RideStatus.OPEN, RideStatus.FULL, RideStatus.COMPLETED, RideStatus.CANCELLED)
+
+
+def seed(history: int, live: int, now: datetime, batch: int = 10_000) -> None:
+    rng = random.Random(7)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        for driver, count in ((HISTORY_DRIVER, history), (LIVE_DRIVER, live)):
+            for offset in range(0, count, batch):
+                rows = []
+                for i in range(offset, min(offset + batch, count)):
+                    if driver == HISTORY_DRIVER:
+                        departure = now - timedelta(minutes=rng.randrange(60, 365 * 24 * 60))
+                        status = _HISTORY_STATUSES[i % 4]
+                        destination = f"place-{i % 200}"
+                    else:
+                        departure = now + timedelta(minutes=rng.randrange(60, 7 * 24 * 60))
+                        status = RideStatus.OPEN
+                        # Un destino que la historia no tiene: la búsqueda lo encuentra rápido solo sin historia
+                        destination = f"campus-{i % 5}" if i % 10 == 0 else f"place-{i % 200}"
+                    rows.append(
+                        ride_values(
+                            Ride(
+                                id=None,
+                                driver_id=driver,
+                                origin=f"place-{(i * 7) % 200}",
+                                destination=destination,
+                                departure_time=departure,
+                                seats_total=4,
+                                seats_available=3 if status == RideStatus.OPEN else 0,
+                                status=status,
+                                created_at=departure - timedelta(days=1),
+                                updated_at=departure - timedelta(days=1),
+                            )
+                        )
+                    )
+                conn.execute(insert(RideModel), rows)
+        # Un pasajero por ride de la historia, en una sola sentencia
+        conn.execute(
+            insert(RidePassengerModel).from_select(
+                ["ride_id", "passenger_id", "status", "joined_at"],
+                select(
+                    RideModel.id,
+                    literal("history-") + cast(RideModel.id, String),
+                    literal(PassengerStatusDB.JOINED, RidePassengerModel.status.type),
+                    RideModel.created_at,
+                ).where(RideModel.driver_id == HISTORY_DRIVER),
+            )
+        )
+    print({"case": "seed", "history": history, "live": live, "elapsed_s": round(time.perf_counter() - started, 1)})
+
+
+def queries(now: datetime) -> Dict[str, dict]:
+    return {
+        "open": {"status": RideStatus.OPEN},
+        "all": {},
+        "origin+open": {"origin": "place-21", "status": RideStatus.OPEN},
+        "destination_search": {"destination_search": "campus"},
+        "open_from_now": {"status": RideStatus.OPEN, "departure_from": now},
+    }
+
+
+def table_sizes() -> dict:
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.execute(select(func.count()).select_from(model)).scalar_one()
+            for model in (RideModel, RidePassengerModel, RideArchiveModel)
+        }
+
+
+def measure_lists(now: datetime, limit: int, repeat: int) -> List[dict]:
+    results = []
+    with SessionLocal() as session:
+        repo = RideSQLAlchemyRepository(session)
+        for name, filters in queries(now).items():
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                page = repo.list_rides(limit=limit, **filters)
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            results.append({
+                "case": f"list:{name}",
+                "rows": len(page),
+                "departed_in_page": sum(ride.departure_time < now for ride in page),
+                "p50_ms": round(statistics.median(samples), 2),
+                "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)], 2),
+            })
+        samples = []
+        for _ in range(max(1, repeat // 10)):
+            started = time.perf_counter()
+            session.execute(open_place_counts_stmt()).all()
+            samples.append((time.perf_counter() - started) * 1000)
+        results.append({"case": "place_counts", "p50_ms": round(statistics.median(samples), 2)})
+    return results
+
+
+def join_latencies(live_ids: List[int], until: Callable[[], bool], seed: int) -> List[float]:
+    rng = random.Random(seed)
+    samples = []
+    while not until():
+        command = JoinRideCommand(ride_id=rng.choice(live_ids), passenger_id=f"live-{rng.randrange(10**9)}")
+        started = time.perf_counter()
+        with SessionLocal() as session:
+            try:
+                JoinRideUseCase(SQLAlchemyUnitOfWork(session)).execute(command)
+            except (RideIsFullError, PassengerAlreadyJoinedError):
+                pass
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summary(samples: List[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "joins": len(samples),
+        "p50_ms": round(statistics.median(samples), 2),
+        "p99_ms": round(samples[max(0, int(len(samples) * 0.99) - 1)], 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+@contextlib.contextmanager
+def unit_of_work() -> Iterator[SQLAlchemyUnitOfWork]:
+    with SessionLocal() as session:
+        yield SQLAlchemyUnitOfWork(session)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=200_000)
+    parser.add_argument("--live", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--batch-pause", type=float, default=0.05)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    init_db()
+    now = utcnow()
+    seed(args.history, args.live, now)
+    with engine.connect() as conn:
+        live_ids = list(conn.scalars(select(RideModel.id).where(RideModel.driver_id == LIVE_DRIVER)))
+
+    print({"case": "tables:bloated", **table_sizes()})
+    for result in measure_lists(now, args.limit, args.repeat):
+        print({"phase": "bloated", **result})
+
+    idle_until = time.perf_counter() + args.idle_seconds
+    print({"case": "joins:idle", **summary(join_latencies(live_ids, lambda: time.perf_counter() > idle_until, 1))})
+
+    scheduler = HousekeepingScheduler(
+        unit_of_work,
+        batch_size=args.batch_size,
+        batch_pause_seconds=args.batch_pause,
+        max_batches=10**9,
+    )
+    done = threading.Event()
+    during: List[float] = []
+    writer = threading.Thread(target=lambda: during.extend(join_latencies(live_ids, done.is_set, 2)))
+    writer.start()
+    result = scheduler.run_once(now)
+    done.set()
+    writer.join()
+    print({"case": "housekeeping", "batch_size": args.batch_size, **result})
+    print({"case": "joins:during_housekeeping", **summary(during)})
+
+    print({"case": "tables:clean", **table_sizes()})
+    for result in measure_lists(now, args.limit, args.repeat):
+        print({"phase": "clean", **result})
+
+
+if __name__ == "__main__":
+    main()
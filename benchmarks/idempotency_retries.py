@@ -0,0 +1,209 @@
+"""
+Reintentos con Idempotency-Key sobre POST /rides: una sola ejecución por clave.
+
+Usa el mismo helper que la ruta (`idempotent`) con CreateRideUseCase real,
+contra la base de DATABASE_URL, y comprueba:
+
+- duplicados concurrentes en un proceso: `--threads` hilos con la misma clave
+  crean un solo ride; el resto recibe la respuesta repetida;
+- dos réplicas (dos guards con cachés distintas sobre la misma tabla): una
+  ejecuta y la otra recibe la respuesta guardada o 409 mientras está en curso;
+- reintento secuencial y con la caché fría (desde la tabla);
+- la misma clave con otro cuerpo: 422;
+- una reserva abandonada (proceso caído) se retoma pasado `lock_seconds`.
+
+Reporta también la latencia de la primera ejecución y de las repeticiones
+(caché en proceso y tabla). Sale con código 1 si algo falla.
+
+    uv run python -m benchmarks.idempotency_retries --threads 16 --repeat 200
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from fastapi import HTTPException, Response
+from sqlalchemy import func, select
+
+from src.application.dto import CreateRideCommand
+from src.application.use_cases.create_ride import CreateRideUseCase
+from src.domain.clock import utcnow
+from src.domain.entities import Ride
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.db.models import RideModel
+from src.infrastructure.db.session import SessionLocal, init_db
+from src.infrastructure.idempotency import IdempotencyGuard, IdempotencyStore
+from src.infrastructure.repositories.ride_queries import insert_idempotency_key_stmt
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from src.interface.api.idempotency import idempotent, request_hash
+from src.interface.api.ride_json import ride_response
+
+DRIVER = "idem-driver"
+
+
+def new_guard(lock_seconds: float = 60) -> IdempotencyGuard:
+    return IdempotencyGuard(
+        IdempotencyStore(SessionLocal, lock_seconds=lock_seconds),
+        TTLCache(10_000, 300),
+    )
+
+
+class Creator:
+    """POST /rides sin HTTP: cuenta cuántas veces corre de verdad el caso de uso."""
+
+    def __init__(self) -> None:
+        self.executions = 0
+        self._lock = threading.Lock()
+
+    def post(self, guard: IdempotencyGuard, key: str, seats: int = 3) -> Response:
+        command = CreateRideCommand(
+            driver_id=DRIVER,
+            origin=f"idem-{key}",
+            destination="UPC Monterrico",
+            departure_time=datetime(2031, 1, 1, 8, 0),
+            seats_total=seats,
+        )
+
+        def respond(ride: Ride) -> Response:
+            return ride_response(ride, status_code=201)
+
+        def handler() -> Response:
+            with self._lock:
+                self.executions += 1
+            with SessionLocal() as session:
+                return respond(CreateRideUseCase(SQLAlchemyUnitOfWork(session)).execute(command))
+
+        fingerprint = request_hash("POST", "/rides", f"{command.origin}|{seats}")
+        return idempotent(guard, key, DRIVER, fingerprint, handler, respond)
+
+
+def rides_for(key: str) -> int:
+    with SessionLocal() as session:
+        return session.scalar(
+            select(func.count()).select_from(RideModel).where(RideModel.origin == f"idem-{key}")
+        ) or 0
+
+
+def status_of(call: Callable[[], Response]) -> int:
+    try:
+        return call().status_code
+    except HTTPException as exc:
+        return exc.status_code
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    run = uuid.uuid4().hex[:8]
+    failures: List[str] = []
+
+    def check(ok: bool, message: str) -> None:
+        if not ok:
+            failures.append(message)
+
+    # Duplicados concurrentes en un proceso
+    creator, guard, key = Creator(), new_guard(), f"{run}-burst"
+    with ThreadPoolExecutor(args.threads) as pool:
+        responses = list(pool.map(lambda _: creator.post(guard, key), range(args.threads)))
+    replayed = sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses)
+    print({
+        "case": "concurrent_same_process",
+        "requests": args.threads,
+        "executions": creator.executions,
+        "rides": rides_for(key),
+        "replayed": replayed,
+        "same_body": len({bytes(r.body) for r in responses}) == 1,
+    })
+    check(creator.executions == 1 and rides_for(key) == 1, "concurrent duplicates ran more than once")
+    check(replayed == args.threads - 1, "concurrent duplicates were not replayed")
+
+    # Dos réplicas sobre la misma tabla
+    creator, replicas, key = Creator(), [new_guard(), new_guard()], f"{run}-replicas"
+    with ThreadPoolExecutor(args.threads) as pool:
+        codes = list(
+            pool.map(
+                lambda i: status_of(lambda: creator.post(replicas[i % 2], key)),
+                range(args.threads),
+            )
+        )
+    print({
+        "case": "concurrent_two_replicas",
+        "executions": creator.executions,
+        "rides": rides_for(key),
+        "status_codes": {c: codes.count(c) for c in sorted(set(codes))},
+    })
+    check(creator.executions == 1 and rides_for(key) == 1, "replicas ran the request more than once")
+    check(set(codes) <= {201, 409}, "replicas answered something other than 201/409")
+
+    # Reintentos secuenciales, otro cuerpo y caché fría
+    creator, guard, key = Creator(), new_guard(), f"{run}-retry"
+    first = creator.post(guard, key)
+    retry = creator.post(guard, key)
+    cold = creator.post(new_guard(), key)
+    reused = status_of(lambda: creator.post(guard, key, seats=2))
+    print({
+        "case": "sequential_retries",
+        "executions": creator.executions,
+        "retry_replayed": retry.headers.get("Idempotent-Replayed"),
+        "cold_cache_replayed": cold.headers.get("Idempotent-Replayed"),
+        "different_body_status": reused,
+    })
+    check(creator.executions == 1, "a sequential retry ran the request again")
+    check(bytes(first.body) == bytes(retry.body) == bytes(cold.body), "replayed body differs")
+    check(reused == 422, "a different request with the same key was not rejected")
+
+    # Reserva abandonada: la fila quedó sin respuesta
+    creator, key = Creator(), f"{run}-abandoned"
+    fingerprint = request_hash("POST", "/rides", f"idem-{key}|3")
+    with SessionLocal() as session, session.begin():
+        session.execute(
+            insert_idempotency_key_stmt(DRIVER, key, fingerprint, utcnow() - timedelta(seconds=5))
+        )
+    in_progress = status_of(lambda: creator.post(new_guard(lock_seconds=60), key))
+    taken_over = status_of(lambda: creator.post(new_guard(lock_seconds=1), key))
+    print({
+        "case": "abandoned_reservation",
+        "while_locked": in_progress,
+        "after_lock": taken_over,
+        "executions": creator.executions,
+    })
+    check(in_progress == 409 and taken_over == 201, "an abandoned reservation was not taken over")
+
+    # Latencias
+    creator, guard = Creator(), new_guard()
+    counter = iter(range(10**9))
+    first_ms = timed(lambda: creator.post(guard, f"{run}-t{next(counter)}"), args.repeat)
+    cached_ms = timed(lambda: creator.post(guard, f"{run}-t0"), args.repeat)
+    table_ms = timed(lambda: creator.post(new_guard(), f"{run}-t0"), args.repeat)
+    print({
+        "case": "latency",
+        "first_p50_ms": round(first_ms, 3),
+        "replay_cache_p50_ms": round(cached_ms, 3),
+        "replay_table_p50_ms": round(table_ms, 3),
+    })
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Simulación sobre el backend en memoria (REPOSITORY_BACKEND=memory), sin base.
+
+Siembra `--rides` rides en un InMemoryRideStore y mide, solo con el costo de
+la aplicación (casos de uso, unidad de trabajo, índices):
+
+- joins/min: JoinRideUseCase desde `--threads` hilos durante `--seconds`,
+  con pasajeros y rides al azar; al final verifica que ningún ride quedó con
+  más pasajeros que asientos ni con asientos perdidos;
+- list_rides: latencia p50 con varios filtros usando los índices, contra un
+  recorrido lineal de todos los rides con los mismos filtros (y que ambos
+  devuelvan la misma página);
+- rollback: un join dentro de una unidad de trabajo que no confirma no deja
+  rastro;
+- con `--parity`, las mismas consultas contra SQLite (sobre los primeros
+  `--parity-rides` rides) devuelven los mismos ids, en el mismo orden.
+
+    uv run python -m benchmarks.in_memory_simulation --rides 200000 --threads 8 --seconds 5 --parity
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.application.dto import JoinRideCommand
+from src.application.use_cases.join_ride import (
+    JoinRideUseCase,
+    RideIsFullError,
+)
+from src.domain.entities import PassengerStatus, Ride, RidePassenger, RideStatus
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.domain.geo import GeoRadius
+from src.infrastructure.db.migrations import migrate
+from src.infrastructure.repositories.in_memory_unit_of_work import InMemoryUnitOfWork
+from src.infrastructure.repositories.ride_in_memory_repository import (
+    InMemoryRideStore,
+    RideInMemoryRepository,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+
+PLACES = [f"Place {i:03d}" for i in range(200)]
+START = datetime(2030, 1, 1)
+
+
+def seed_rides(count: int, seed: int) -> List[Ride]:
+    rng = random.Random(seed)
+    rides = []
+    for _ in range(count):
+        seats = rng.randint(1, 4)
+        located = rng.random() < 0.5
+        departure = START + timedelta(minutes=rng.randrange(60 * 24 * 60))
+        rides.append(
+            Ride(
+                id=None,
+                driver_id=f"driver-{rng.randrange(count // 5 + 1)}",
+                origin=rng.choice(PLACES),
+                destination=rng.choice(PLACES),
+                departure_time=departure,
+                seats_total=seats,
+                seats_available=seats,
+                status=RideStatus.OPEN,
+                created_at=START,
+                updated_at=START,
+                origin_lat=-12.0 + rng.uniform(-0.2, 0.2) if located else None,
+                origin_lng=-77.0 + rng.uniform(-0.2, 0.2) if located else None,
+                destination_lat=-12.1 + rng.uniform(-0.2, 0.2) if located else None,
+                destination_lng=-77.0 + rng.uniform(-0.2, 0.2) if located else None,
+            )
+        )
+    return rides
+
+
+def simulate_joins(store: InMemoryRideStore, rides: int, threads: int, seconds: float) -> dict:
+    outcome = {"joined": 0, "rejected": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(n: int) -> None:
+        rng = random.Random(n)
+        joined = rejected = 0
+        while not stop.is_set():
+            command = JoinRideCommand(
+                ride_id=rng.randint(1, rides), passenger_id=f"p-{rng.randrange(rides * 4)}"
+            )
+            try:
+                JoinRideUseCase(InMemoryUnitOfWork(store)).execute(command)
+                joined += 1
+            except (RideIsFullError, PassengerAlreadyJoinedError):
+                rejected += 1
+        with lock:
+            outcome["joined"] += joined
+            outcome["rejected"] += rejected
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    attempts = outcome["joined"] + outcome["rejected"]
+    return {
+        "case": "joins",
+        "threads": threads,
+        **outcome,
+        "attempts_per_min": round(attempts / elapsed * 60),
+        "joins_per_min": round(outcome["joined"] / elapsed * 60),
+    }
+
+
+def check_consistency(store: InMemoryRideStore, rides: int) -> dict:
+    overbooked = lost_updates = 0
+    for ride_id in range(1, rides + 1):
+        ride = store.get_ride_by_id(ride_id)
+        joined = sum(
+            1 for p in store.list_passengers(ride_id) if p.status == PassengerStatus.JOINED
+        )
+        overbooked += joined > ride.seats_total  # type: ignore[union-attr]
+        lost_updates += ride.seats_total - ride.seats_available != joined  # type: ignore[union-attr]
+    return {"case": "consistency", "overbooked": overbooked, "lost_updates": lost_updates}
+
+
+def check_rollback(store: InMemoryRideStore) -> dict:
+    repo = RideInMemoryRepository(store)
+    before = repo.list_rides(status=RideStatus.OPEN, limit=1)[0]
+    probe = RidePassenger(
+        id=None,
+        ride_id=before.id,  # type: ignore[arg-type]
+        passenger_id="rollback-probe",
+        status=PassengerStatus.JOINED,
+        joined_at=START,
+        left_at=None,
+    )
+    with InMemoryUnitOfWork(store) as uow:
+        reserved = uow.rides.reserve_seat(probe) is not None
+        # Sin commit: al salir del with se deshace
+    return {
+        "case": "rollback",
+        "reserved_in_tx": reserved,
+        "ride_unchanged": store.get_ride_by_id(before.id) == before,  # type: ignore[arg-type]
+        "passenger_absent": store.get_passenger(before.id, "rollback-probe") is None,  # type: ignore[arg-type]
+    }
+
+
+def queries() -> Dict[str, dict]:
+    return {
+        "origin+status": {"origin": PLACES[7], "status": RideStatus.OPEN},
+        "destination": {"destination": PLACES[42]},
+        "departure_window": {
+            "departure_from": START + timedelta(days=30),
+            "departure_to": START + timedelta(days=30, hours=6),
+        },
+        "origin_area": {"origin_area": GeoRadius(-12.0, -77.0, 2.0)},
+        "origin_search": {"origin_search": "place 01"},
+        "full_only": {"status": RideStatus.FULL},
+    }
+
+
+def linear_scan(rides: List[Ride], limit: int, **filters) -> List[int]:
+    """Lo que haría un dict sin índices: filtrar todo, ordenar y cortar."""
+    def matches(ride: Ride) -> bool:
+        if "origin" in filters and ride.origin != filters["origin"]:
+            return False
+        if "destination" in filters and ride.destination != filters["destination"]:
+            return False
+        if "status" in filters and ride.status != filters["status"]:
+            return False
+        if "departure_from" in filters and ride.departure_time < filters["departure_from"]:
+            return False
+        if "departure_to" in filters and ride.departure_time > filters["departure_to"]:
+            return False
+        if "origin_search" in filters and not ride.origin.lower().startswith(filters["origin_search"]):
+            return False
+        if "origin_area" in filters:
+            area = filters["origin_area"]
+            if ride.origin_lat is None or not area.contains(ride.origin_lat, ride.origin_lng):
+                return False
+        return True
+
+    found = sorted((r for r in rides if matches(r)), key=lambda r: (r.departure_time, r.id))
+    return [r.id for r in found[:limit]]  # type: ignore[misc]
+
+
+def p50_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def measure_lists(store: InMemoryRideStore, rides: int, limit: int) -> List[dict]:
+    repo = RideInMemoryRepository(store)
+    snapshot = [store.get_ride_by_id(i) for i in range(1, rides + 1)]
+    results = []
+    for name, filters in queries().items():
+        indexed = [r.id for r in repo.list_rides(limit=limit, **filters)]
+        scanned = linear_scan(snapshot, limit, **filters)  # type: ignore[arg-type]
+        results.append({
+            "case": f"list:{name}",
+            "rows": len(indexed),
+            "indexed_p50_ms": round(p50_ms(lambda: repo.list_rides(limit=limit, **filters), 20), 3),
+            "scan_p50_ms": round(p50_ms(lambda: linear_scan(snapshot, limit, **filters), 3), 3),  # type: ignore[arg-type]
+            "same_page": indexed == scanned,
+        })
+    return results
+
+
+def check_parity(store: InMemoryRideStore, rides: int, limit: int) -> List[dict]:
+    """
+    Las mismas consultas contra SQLite sobre los primeros `rides` rides tal
+    como quedaron tras los joins (en un store aparte: cargar SQLite es lento).
+    """
+    current = [store.get_ride_by_id(i) for i in range(1, rides + 1)]
+    sample = InMemoryRideStore()
+    sample.create_rides(current)  # type: ignore[arg-type]
+    memory = RideInMemoryRepository(sample)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    migrate(engine)
+    with sessionmaker(bind=engine)() as session:
+        sql = RideSQLAlchemyRepository(session)
+        for start in range(0, len(current), 500):
+            sql.create_rides(current[start:start + 500])  # type: ignore[arg-type]
+        session.commit()
+        results = []
+        for name, filters in queries().items():
+            cursor: Optional[tuple] = None
+            same = True
+            # Dos páginas: la segunda con el cursor keyset
+            for _ in range(2):
+                expected = [r.id for r in sql.list_rides(after=cursor, limit=limit, **filters)]
+                actual = [r.id for r in memory.list_rides(after=cursor, limit=limit, **filters)]
+                same = same and expected == actual
+                if not actual:
+                    break
+                last = sample.get_ride_by_id(actual[-1])
+                cursor = (last.departure_time, last.id)  # type: ignore[union-attr]
+            results.append({"case": f"parity:{name}", "same_ids": same})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--parity", action="store_true")
+    parser.add_argument("--parity-rides", type=int, default=5000)
+    args = parser.parse_args()
+
+    store = InMemoryRideStore()
+    seeded = seed_rides(args.rides, args.seed)
+    started = time.perf_counter()
+    store.create_rides(seeded)
+    print({"case": "seed", "rides": args.rides, "elapsed_s": round(time.perf_counter() - started, 2)})
+
+    print(simulate_joins(store, args.rides, args.threads, args.seconds))
+    print(check_consistency(store, args.rides))
+    print(check_rollback(store))
+    for result in measure_lists(store, args.rides, args.limit):
+        print(result)
+    if args.parity:
+        for result in check_parity(store, min(args.parity_rides, args.rides), args.limit):
+            print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark de concurrencia para JoinRideUseCase.
+
+Crea un ride con pocos asientos y lo martilla desde muchos hilos, cada uno
+con su propia sesión y un pasajero distinto. Compara el flujo anterior
+(leer ride, leer pasajero, insertar pasajero, guardar ride) con la reserva
+atómica `reserve_seat`, y reporta overbooking y throughput.
+
+Uso (contra la base configurada en DATABASE_URL):
+
+    uv run python -m benchmarks.join_ride_concurrency --threads 32 --attempts 2000 --seats 50
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from src.application.dto import JoinRideCommand
+from src.application.use_cases.join_ride import (
+    JoinRideUseCase,
+    RideIsFullError,
+)
+from src.domain.clock import utcnow
+from src.domain.entities import PassengerStatus, Ride, RidePassenger, RideStatus
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.infrastructure.db.models import RideModel, RidePassengerModel, RideStatusDB
+from src.infrastructure.db.session import SessionLocal, init_db
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+
+def legacy_join(session: Session, command: JoinRideCommand) -> Ride:
+    """Flujo previo: cinco round trips y lectura-modificación-escritura."""
+    repo = RideSQLAlchemyRepository(session)
+    ride = repo.get_ride_by_id(command.ride_id)
+    if ride is None or ride.status != RideStatus.OPEN or ride.seats_available <= 0:
+        raise RideIsFullError("Ride is full")
+    existing = repo.get_passenger(ride_id=ride.id, passenger_id=command.passenger_id)  # type: ignore[arg-type]
+    if existing is not None:
+        raise PassengerAlreadyJoinedError("Passenger already joined this ride")
+    now = utcnow()
+    repo.add_passenger(
+        RidePassenger(
+            id=None,
+            ride_id=ride.id,  # type: ignore[arg-type]
+            passenger_id=command.passenger_id,
+            status=PassengerStatus.JOINED,
+            joined_at=now,
+            left_at=None,
+        )
+    )
+    session.commit()
+    ride.seats_available -= 1
+    if ride.seats_available == 0:
+        ride.status = RideStatus.FULL
+    # Escribe de vuelta lo que leyó: el UPDATE de toda la fila que pisa a los demás
+    session.execute(
+        update(RideModel)
+        .where(RideModel.id == ride.id)
+        .values(
+            seats_available=ride.seats_available,
+            status=RideStatusDB(ride.status.value),
+            updated_at=now,
+        )
+    )
+    session.commit()
+    return ride
+
+
+def atomic_join(session: Session, command: JoinRideCommand) -> Ride:
+    return JoinRideUseCase(SQLAlchemyUnitOfWork(session)).execute(command)
+
+
+def create_ride(seats: int) -> int:
+    with SessionLocal() as session:
+        now = utcnow()
+        ride = RideSQLAlchemyRepository(session).create_ride(
+            Ride(
+                id=None,
+                driver_id="bench-driver",
+                origin="bench-origin",
+                destination="bench-destination",
+                departure_time=now + timedelta(days=1),
+                seats_total=seats,
+                seats_available=seats,
+                status=RideStatus.OPEN,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        session.commit()
+        return ride.id  # type: ignore[return-value]
+
+
+def run(mode: str, threads: int, attempts: int, seats: int) -> dict:
+    join = legacy_join if mode == "legacy" else atomic_join
+    ride_id = create_ride(seats)
+    outcome = {"joined": 0, "rejected": 0, "errors": 0}
+
+    def attempt(i: int) -> str:
+        with SessionLocal() as session:
+            try:
+                join(
+                    session,
+                    JoinRideCommand(ride_id=ride_id, passenger_id=f"bench-{mode}-{i}"),
+                )
+                return "joined"
+            except (RideIsFullError, PassengerAlreadyJoinedError):
+                return "rejected"
+            except Exception:
+                return "errors"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for result in pool.map(attempt, range(attempts)):
+            outcome[result] += 1
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as session:
+        passengers = session.execute(
+            select(func.count()).where(RidePassengerModel.ride_id == ride_id)
+        ).scalar_one()
+        seats_available = session.execute(
+            select(RideModel.seats_available).where(RideModel.id == ride_id)
+        ).scalar_one()
+
+    return {
+        "mode": mode,
+        **outcome,
+        "passengers_in_db": passengers,
+        "seats_available": seats_available,
+        "overbooked": max(passengers - seats, 0),
+        "lost_updates": (seats - seats_available) != passengers,
+        "elapsed_s": round(elapsed, 3),
+        "attempts_per_s": round(attempts / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--seats", type=int, default=50)
+    parser.add_argument("--mode", choices=["legacy", "atomic", "both"], default="both")
+    args = parser.parse_args()
+
+    init_db()
+    modes = ["legacy", "atomic"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print(run(mode, args.threads, args.attempts, args.seats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Throughput de un GET /rides grande con los print() anteriores vs el logging por cola.
+
+El modo `print` reinstala lo que hacía el código antes: volcar a stdout las
+filas del repositorio, la lista de dominio en el router y el payload del JWT en
+cada request. El modo `queued` usa el pipeline actual (nivel según DEBUG).
+Conviene redirigir stdout a un archivo o a /dev/null, como en un contenedor:
+
+    uv run python -m benchmarks.list_rides_logging --rides 2000 --requests 300 > /tmp/out.log
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    os.environ["IAM_PUBLIC_KEY"] = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    os.environ.setdefault("RIDES_PAGE_SIZE_MAX", str(args.page_size))
+
+    # Imports diferidos: la configuración se lee al importar
+    from fastapi.testclient import TestClient
+
+    from src.application.use_cases.list_rides import ListRidesUseCase
+    from src.domain.clock import utcnow
+    from src.domain.entities import Ride, RideStatus
+    from src.infrastructure.db.session import SessionLocal, init_db
+    from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+        RideSQLAlchemyRepository,
+    )
+    from src.interface.api import dependencies
+    from src.main import app
+
+    init_db()
+    now = utcnow()
+    with SessionLocal() as session:
+        repo = RideSQLAlchemyRepository(session)
+        for i in range(args.rides):
+            repo.create_ride(
+                Ride(
+                    id=None,
+                    driver_id="bench-driver",
+                    origin="bench-origin",
+                    destination="bench-destination",
+                    departure_time=now + timedelta(minutes=i),
+                    seats_total=4,
+                    seats_available=4,
+                    status=RideStatus.OPEN,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        session.commit()
+
+    token = jwt.encode(
+        {"sub": "bench", "roles": ["STUDENT"], "exp": int(time.time()) + 3600},
+        key,
+        algorithm="RS256",
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    url = f"/rides?origin=bench-origin&limit={args.page_size}"
+
+    original_execute = ListRidesUseCase.execute
+    original_authenticate = dependencies._authenticate
+
+    def printing_execute(self, query=None):
+        page = original_execute(self, query)
+        print(page.rides)  # repositorio
+        print(page.rides)  # router
+        return page
+
+    def printing_authenticate(authorization: str):
+        user = original_authenticate(authorization)
+        print({"sub": user.user_id, "roles": user.roles})
+        return user
+
+    def measure(label: str) -> dict:
+        with TestClient(app) as client:
+            client.get(url, headers=headers)  # calentamiento
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                client.get(url, headers=headers)
+            elapsed = time.perf_counter() - started
+        return {"mode": label, "requests_per_s": round(args.requests / elapsed, 1)}
+
+    ListRidesUseCase.execute = printing_execute  # type: ignore[method-assign]
+    dependencies._authenticate = printing_authenticate
+    legacy = measure("print")
+    ListRidesUseCase.execute = original_execute  # type: ignore[method-assign]
+    dependencies._authenticate = original_authenticate
+    queued = measure("queued")
+
+    print(legacy, queued, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Relay del outbox de eventos de rides: throughput por tamaño de lote.
+
+Crea rides con el alta masiva (cada ride deja un ride.created en `ride_outbox`
+en la misma transacción) y los drena con el relay hacia un sink en memoria,
+para varios `--batch-sizes`, y hacia el sink de archivo JSON Lines. Las
+garantías de entrega (sink que falla, relays concurrentes) las cubre
+tests/test_outbox_relay.py.
+
+    DATABASE_URL=postgresql+psycopg2://... uv run python -m benchmarks.outbox_relay --events 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from src.application.dto import CreateRideCommand
+from src.application.use_cases.create_ride import BulkCreateRidesUseCase
+from src.domain.clock import utcnow
+from src.infrastructure.db.session import SessionLocal, init_db
+from src.infrastructure.outbox import InMemoryOutboxSink, JsonLinesOutboxSink, OutboxRelay
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+
+def write_events(count: int, relay: OutboxRelay) -> float:
+    base = utcnow() + timedelta(days=1)
+    commands = [
+        CreateRideCommand(
+            driver_id="outbox-bench",
+            origin=f"Origen {i % 40}",
+            destination="UPC Monterrico",
+            departure_time=base + timedelta(minutes=i),
+            seats_total=4,
+        )
+        for i in range(count)
+    ]
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        BulkCreateRidesUseCase(SQLAlchemyUnitOfWork(session, outbox=relay)).execute(commands)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    init_db()
+    OutboxRelay(SessionLocal, InMemoryOutboxSink(), batch_size=1_000).drain()
+
+    for batch_size in args.batch_sizes:
+        relay = OutboxRelay(SessionLocal, InMemoryOutboxSink(), batch_size=batch_size)
+        write_s = write_events(args.events, relay)
+        started = time.perf_counter()
+        relayed = relay.drain()
+        elapsed = time.perf_counter() - started
+        print({
+            "batch_size": batch_size,
+            "events": relayed,
+            "write_ms": round(write_s * 1000, 1),
+            "relay_ms": round(elapsed * 1000, 1),
+            "events_per_s": round(relayed / elapsed),
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ride-events.jsonl")
+        relay = OutboxRelay(SessionLocal, JsonLinesOutboxSink(path), batch_size=500)
+        write_events(args.events, relay)
+        started = time.perf_counter()
+        relayed = relay.drain()
+        elapsed = time.perf_counter() - started
+        with open(path, encoding="utf-8") as f:
+            lines = sum(1 for _ in f)
+        print({
+            "file_sink_events": relayed,
+            "lines": lines,
+            "events_per_s": round(relayed / elapsed),
+        })
+
+
+if __name__ == "__main__":
+    main()
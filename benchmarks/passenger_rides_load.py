@@ -0,0 +1,214 @@
+"""
+Carga mixta del lado pasajero: unirse, abandonar y listar "mis rides" a la vez.
+
+Crea `--rides` rides con pocos asientos y lanza `--threads` hilos que, durante
+`--operations` operaciones en total hacen join de un pasajero a un ride al
+azar (50 %), leave de una unión lograda (25 %) o GET /rides/joined (25 %),
+cada una con su propia sesión, como un request. Como hay pocos asientos, los
+rides pasan seguido de FULL a OPEN y vuelta, y los pasajeros reingresan.
+
+Al final comprueba los invariantes contra la base:
+
+- seats_available == seats_total - pasajeros JOINED, en cada ride;
+- un ride está FULL si y solo si no le quedan asientos;
+- "mis rides" de cada pasajero coincide con sus filas JOINED.
+
+    uv run python -m benchmarks.passenger_rides_load --threads 16 --operations 5000
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from src.application.dto import (
+    CreateRideCommand,
+    JoinRideCommand,
+    LeaveRideCommand,
+    PassengerRidesQuery,
+)
+from src.application.use_cases.create_ride import BulkCreateRidesUseCase
+from src.application.use_cases.join_ride import (
+    JoinRideUseCase,
+    RideIsFullError,
+)
+from src.application.use_cases.leave_ride import LeaveRideUseCase, PassengerNotJoinedError
+from src.application.use_cases.list_rides import ListPassengerRidesUseCase
+from src.domain.clock import utcnow
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.infrastructure.db.models import (
+    PassengerStatusDB,
+    RideModel,
+    RidePassengerModel,
+    RideStatusDB,
+)
+from src.infrastructure.db.session import SessionLocal, init_db
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+
+def create_rides(count: int, seats: int) -> list[int]:
+    base = utcnow() + timedelta(days=1)
+    commands = [
+        CreateRideCommand(
+            driver_id="load-driver",
+            origin="load-origin",
+            destination="load-destination",
+            departure_time=base + timedelta(minutes=i),
+            seats_total=seats,
+        )
+        for i in range(count)
+    ]
+    with SessionLocal() as session:
+        results = BulkCreateRidesUseCase(SQLAlchemyUnitOfWork(session)).execute(commands)
+    return [r.ride.id for r in results if r.ride is not None]  # type: ignore[misc]
+
+
+def join(ride_id: int, passenger_id: str) -> str:
+    with SessionLocal() as session:
+        try:
+            JoinRideUseCase(SQLAlchemyUnitOfWork(session)).execute(
+                JoinRideCommand(ride_id=ride_id, passenger_id=passenger_id)
+            )
+            return "ok"
+        except (RideIsFullError, PassengerAlreadyJoinedError):
+            return "rejected"
+
+
+def leave(ride_id: int, passenger_id: str) -> str:
+    with SessionLocal() as session:
+        try:
+            LeaveRideUseCase(SQLAlchemyUnitOfWork(session)).execute(
+                LeaveRideCommand(ride_id=ride_id, passenger_id=passenger_id)
+            )
+            return "ok"
+        except PassengerNotJoinedError:
+            return "rejected"
+
+
+def my_rides(passenger_id: str) -> list[int]:
+    with SessionLocal() as session:
+        page = ListPassengerRidesUseCase(
+            RideSQLAlchemyRepository(session), max_page_size=1_000
+        ).execute(PassengerRidesQuery(passenger_id=passenger_id, limit=1_000))
+    return [r.id for r in page.rides]  # type: ignore[misc]
+
+
+def check_invariants(ride_ids: list[int], passengers: list[str]) -> dict:
+    with SessionLocal() as session:
+        rides = session.execute(
+            select(RideModel.id, RideModel.seats_total, RideModel.seats_available, RideModel.status)
+            .where(RideModel.id.in_(ride_ids))
+        ).all()
+        joined = dict(
+            session.execute(
+                select(RidePassengerModel.ride_id, func.count())
+                .where(
+                    RidePassengerModel.ride_id.in_(ride_ids),
+                    RidePassengerModel.status == PassengerStatusDB.JOINED,
+                )
+                .group_by(RidePassengerModel.ride_id)
+            ).tuples().all()
+        )
+        by_passenger = defaultdict(set)
+        for ride_id, passenger_id in session.execute(
+            select(RidePassengerModel.ride_id, RidePassengerModel.passenger_id).where(
+                RidePassengerModel.ride_id.in_(ride_ids),
+                RidePassengerModel.status == PassengerStatusDB.JOINED,
+            )
+        ):
+            by_passenger[passenger_id].add(ride_id)
+
+    seat_mismatches = sum(
+        1 for r in rides if r.seats_available != r.seats_total - joined.get(r.id, 0)
+    )
+    status_mismatches = sum(
+        1 for r in rides if (r.status == RideStatusDB.FULL) != (r.seats_available == 0)
+    )
+    ride_set = set(ride_ids)
+    list_mismatches = sum(
+        1 for p in passengers if set(my_rides(p)) & ride_set != by_passenger.get(p, set())
+    )
+    return {
+        "seat_mismatches": seat_mismatches,
+        "status_mismatches": status_mismatches,
+        "my_rides_mismatches": list_mismatches,
+        "full_rides": sum(1 for r in rides if r.status == RideStatusDB.FULL),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=5_000)
+    parser.add_argument("--rides", type=int, default=20)
+    parser.add_argument("--seats", type=int, default=3)
+    parser.add_argument("--passengers", type=int, default=60)
+    args = parser.parse_args()
+
+    init_db()
+    ride_ids = create_rides(args.rides, args.seats)
+    run_id = int(time.time())
+    passengers = [f"load-{run_id}-{i}" for i in range(args.passengers)]
+    # Uniones logradas: los leave eligen entre ellas para que casi todos apliquen
+    joined: set = set()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def run(i: int) -> tuple:
+        rng = getattr(local, "rng", None)
+        if rng is None:
+            rng = local.rng = random.Random(i)
+        kind = rng.choices(["join", "leave", "my_rides"], weights=[2, 1, 1])[0]
+        pair = (rng.choice(ride_ids), rng.choice(passengers))
+        if kind == "leave":
+            with lock:
+                if joined:
+                    pair = rng.choice(tuple(joined))
+                    joined.discard(pair)
+        started = time.perf_counter()
+        try:
+            if kind == "join":
+                outcome = join(*pair)
+                if outcome == "ok":
+                    with lock:
+                        joined.add(pair)
+            elif kind == "leave":
+                outcome = leave(*pair)
+            else:
+                my_rides(pair[1])
+                outcome = "ok"
+        except Exception:
+            outcome = "errors"
+        return kind, outcome, (time.perf_counter() - started) * 1000
+
+    timings = defaultdict(list)
+    outcomes = defaultdict(lambda: defaultdict(int))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for kind, outcome, ms in pool.map(run, range(args.operations)):
+            timings[kind].append(ms)
+            outcomes[kind][outcome] += 1
+    elapsed = time.perf_counter() - started
+
+    for kind, values in sorted(timings.items()):
+        values.sort()
+        print({
+            "op": kind,
+            **outcomes[kind],
+            "p50_ms": round(statistics.median(values), 2),
+            "p99_ms": round(values[int(len(values) * 0.99) - 1], 2),
+        })
+    print({"operations": args.operations, "ops_per_s": round(args.operations / elapsed, 1)})
+    print(check_invariants(ride_ids, passengers))
+
+
+if __name__ == "__main__":
+    main()
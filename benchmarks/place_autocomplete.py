@@ -0,0 +1,127 @@
+"""
+Latencia del autocompletado de lugares (GET /rides/places) sobre el índice en memoria.
+
+Genera nombres de lugar sintéticos (distrito + tipo + número, con tildes y
+variantes de mayúsculas), les asigna cuentas de rides OPEN con cola larga y
+mide `suggest` para cuatro tipos de consulta: prefijo corto (1-3 letras),
+prefijo de palabra ("monte"), nombre completo y nombre con un error de tipeo.
+Todas son consultas distintas (sin aciertos en la memoización de resultados).
+
+El modo `typing` reproduce usuarios tecleando letra a letra lugares elegidos
+según su popularidad, con un ride nuevo cada `--rides-every` teclas (cada alta
+vacía la memoización), que es la forma real del tráfico de autocompletado.
+
+    uv run python -m benchmarks.place_autocomplete --places 5000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from src.domain.entities import Ride, RideStatus
+from src.infrastructure.place_index import TrigramPlaceIndex
+
+DISTRICTS = [
+    "Miraflores", "San Isidro", "Surco", "Monterrico", "La Molina", "Barranco",
+    "Jesús María", "Lince", "San Borja", "Magdalena", "Pueblo Libre", "Chorrillos",
+    "San Miguel", "Breña", "Rímac", "Ate", "Callao", "Los Olivos", "Comas", "Surquillo",
+]
+KINDS = [
+    "UPC", "Universidad", "Av.", "Jr.", "Parque", "Óvalo", "Plaza", "Colegio",
+    "Hospital", "Mercado", "Estación", "Centro Comercial",
+]
+
+
+def place_names(count: int, rng: random.Random) -> list[str]:
+    names: set[str] = set()
+    while len(names) < count:
+        name = f"{rng.choice(KINDS)} {rng.choice(DISTRICTS)} {rng.randint(1, 2000)}"
+        names.add(name.upper() if rng.random() < 0.05 else name)
+    return sorted(names)
+
+
+def new_ride(i: int, origin: str, destination: str) -> Ride:
+    return Ride(
+        id=i, driver_id="bench", origin=origin, destination=destination,
+        departure_time=None, seats_total=4, seats_available=4,  # type: ignore[arg-type]
+        status=RideStatus.OPEN, created_at=None, updated_at=None,  # type: ignore[arg-type]
+    )
+
+
+def typo(text: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1:] if rng.random() < 0.5 else text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def measure(label: str, index: TrigramPlaceIndex, queries: list[str], limit: int) -> dict:
+    timings = []
+    found = 0
+    for query in queries:
+        started = time.perf_counter()
+        found += len(index.suggest(query, limit))
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {
+        "query": label,
+        "avg_results": round(found / len(queries), 1),
+        "p50_us": round(statistics.median(timings), 1),
+        "p99_us": round(timings[int(len(timings) * 0.99) - 1], 1),
+        "max_us": round(timings[-1], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--places", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rides-every", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    names = place_names(args.places, rng)
+    # Cola larga: pocos lugares concentran la mayoría de rides abiertos
+    counts = {name: int(rng.paretovariate(1.2)) - 1 for name in names}
+
+    index = TrigramPlaceIndex()
+    started = time.perf_counter()
+    index.replace_counts(counts)
+    print({"places": len(index), "build_ms": round((time.perf_counter() - started) * 1000, 1)})
+
+    started = time.perf_counter()
+    for i, name in enumerate(names[: min(len(names), 5_000)]):
+        index.ride_opened(new_ride(i, name, name))
+    print({"incremental_us_per_ride": round((time.perf_counter() - started) * 1_000_000 / min(len(names), 5_000), 1)})
+
+    sample = [rng.choice(names) for _ in range(args.queries)]
+    word_prefixes = [rng.choice(n.split()[1:])[:5] for n in sample]
+    for label, queries in (
+        ("short_prefix", [n[: rng.randint(1, 3)] for n in sample]),
+        ("word_prefix", word_prefixes),
+        ("full_name", sample),
+        ("typo", [typo(n, rng) for n in sample]),
+    ):
+        print(measure(label, index, queries, args.limit))
+
+    weights = [counts[n] + 1 for n in names]
+    typed = rng.choices(names, weights=weights, k=args.queries // 5)
+    keystrokes = [name[:i] for name in typed for i in range(1, len(name) + 1)]
+    timings = []
+    for i, query in enumerate(keystrokes):
+        if i % args.rides_every == 0:
+            index.ride_opened(new_ride(i, rng.choice(names), rng.choice(names)))
+        started = time.perf_counter()
+        index.suggest(query, args.limit)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    print({
+        "query": "typing",
+        "keystrokes": len(keystrokes),
+        "p50_us": round(statistics.median(timings), 1),
+        "p99_us": round(timings[int(len(timings) * 0.99) - 1], 1),
+        "max_us": round(timings[-1], 1),
+    })
+
+
+if __name__ == "__main__":
+    main()
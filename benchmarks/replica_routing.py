@@ -0,0 +1,199 @@
+"""
+Lecturas por réplica (ReplicaRouter) bajo escrituras concurrentes.
+
+Siembra un primario SQLite y copia el archivo como réplicas (sin replicación
+real: las copias no ven los joins, alcanza para medir la contención). Luego,
+durante `--seconds`, `--writers` hilos hacen joins en el primario mientras
+`--readers` hilos listan rides OPEN a través del router:
+
+- primary: router sin réplicas, todo compite en el mismo archivo;
+- replicas: las listas reparten round-robin entre `--replicas` copias.
+
+Además: costo de `read_session` por lectura, una réplica caída (directorio
+inexistente) que el chequeo saca de la rotación, y lecturas de un usuario
+que acaba de escribir servidas por el primario.
+
+    uv run python -m benchmarks.replica_routing --replicas 2 --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from src.application.dto import JoinRideCommand
+from src.application.use_cases.join_ride import (
+    JoinRideUseCase,
+    RideIsFullError,
+)
+from src.domain.entities import Ride, RideStatus
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.infrastructure.db.migrations import migrate
+from src.infrastructure.db.replicas import Replica, ReplicaRouter
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+
+def file_engine(path: Path) -> Engine:
+    return create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+
+
+def seed(path: Path, rides: int) -> None:
+    engine = file_engine(path)
+    migrate(engine)
+    now = datetime(2030, 1, 1)
+    with sessionmaker(bind=engine)() as session:
+        repo = RideSQLAlchemyRepository(session)
+        batch = [
+            Ride(
+                id=None,
+                driver_id=f"driver-{i % 50}",
+                origin=f"Place {i % 20}",
+                destination=f"Place {(i * 7) % 20}",
+                departure_time=now + timedelta(minutes=i),
+                seats_total=4,
+                seats_available=4,
+                status=RideStatus.OPEN,
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(rides)
+        ]
+        for start in range(0, rides, 500):
+            repo.create_rides(batch[start:start + 500])
+        session.commit()
+    engine.dispose()
+
+
+def build_router(primary: Path, replicas: List[Path]) -> ReplicaRouter:
+    router = ReplicaRouter(
+        sessionmaker(bind=file_engine(primary)),
+        [
+            Replica(f"replica-{n}", engine, sessionmaker(bind=engine))
+            for n, engine in enumerate(file_engine(path) for path in replicas)
+        ],
+    )
+    router.check()
+    return router
+
+
+def run(router: ReplicaRouter, primary: Path, rides: int, readers: int, writers: int, seconds: float) -> dict:
+    stop = threading.Event()
+    read_ms: List[float] = []
+    writes = {"joined": 0, "rejected": 0}
+    lock = threading.Lock()
+    write_sessions = sessionmaker(bind=file_engine(primary))
+
+    def reader(n: int) -> None:
+        samples = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            with router.read_session(f"reader-{n}") as session:
+                RideSQLAlchemyRepository(session).list_rides(status=RideStatus.OPEN, limit=50)
+            samples.append((time.perf_counter() - started) * 1000)
+        with lock:
+            read_ms.extend(samples)
+
+    def writer(n: int) -> None:
+        rng = random.Random(n)
+        joined = rejected = 0
+        while not stop.is_set():
+            user = f"writer-{n}-{rng.randrange(10**9)}"
+            router.mark_write(user)
+            with write_sessions() as session:
+                try:
+                    JoinRideUseCase(SQLAlchemyUnitOfWork(session)).execute(
+                        JoinRideCommand(ride_id=rng.randint(1, rides), passenger_id=user)
+                    )
+                    joined += 1
+                except (RideIsFullError, PassengerAlreadyJoinedError):
+                    rejected += 1
+        with lock:
+            writes["joined"] += joined
+            writes["rejected"] += rejected
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    read_ms.sort()
+    return {
+        "replicas": len(router.replicas),
+        "reads_per_s": round(len(read_ms) / seconds, 1),
+        "read_p50_ms": round(statistics.median(read_ms), 2) if read_ms else None,
+        "read_p99_ms": round(read_ms[int(len(read_ms) * 0.99)], 2) if read_ms else None,
+        "joins_per_s": round(writes["joined"] / seconds, 1),
+        "reads_by_replica": [replica.reads for replica in router.replicas],
+        "primary_reads": router.primary_reads,
+    }
+
+
+def routing_overhead_us(router: ReplicaRouter, iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        router.read_session(f"user-{i % 1000}").close()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def failover(primary: Path, replicas: List[Path], tmp: Path) -> Dict[str, object]:
+    router = build_router(primary, replicas + [tmp / "missing" / "replica.db"])
+    for n in range(30):
+        router.read_session(f"reader-{n}").close()
+    router.mark_write("recent-writer")
+    before = router.primary_reads
+    router.read_session("recent-writer").close()
+    return {
+        "healthy": [replica.healthy for replica in router.replicas],
+        "reads_by_replica": [replica.reads for replica in router.replicas],
+        "recent_writer_to_primary": router.primary_reads == before + 1,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=2000)
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        tmp = Path(directory)
+        primary = tmp / "primary.db"
+        seed(primary, args.rides)
+        replicas = []
+        for n in range(args.replicas):
+            replicas.append(tmp / f"replica-{n}.db")
+            shutil.copy(primary, replicas[-1])
+
+        for mode, paths in (("primary", []), ("replicas", replicas)):
+            router = build_router(primary, paths)
+            result = run(router, primary, args.rides, args.readers, args.writers, args.seconds)
+            print({"case": mode, **result})
+
+        router = build_router(primary, replicas)
+        print({"case": "read_session", "overhead_us": round(routing_overhead_us(router, 20_000), 2)})
+        print({"case": "failover", **failover(primary, replicas, tmp)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Costo de las métricas por request (middleware, hooks del engine y fases).
+
+Mide por separado, con y sin instrumentación:
+
+- por sentencia: `SELECT 1` sobre un engine SQLite en memoria, dentro de un
+  request simulado (RequestTiming en la ContextVar) y con los hooks de
+  `instrument_engine`;
+- por request: una ruta FastAPI mínima que hace `--statements` consultas y
+  serializa con `timed_phase`, llamada directo como app ASGI, con y sin
+  RequestMetricsMiddleware (y los hooks);
+- `render` de /metrics con `--routes` rutas y varios status cada una.
+
+    uv run python -m benchmarks.request_metrics_overhead --requests 3000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from fastapi import FastAPI, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.request_metrics import (
+    RequestMetrics,
+    RequestTiming,
+    end_request,
+    instrument_engine,
+    start_request,
+    timed_phase,
+)
+from src.interface.api.metrics_middleware import RequestMetricsMiddleware
+
+
+def new_engine(instrumented: bool):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    if instrumented:
+        instrument_engine(engine)
+    return engine
+
+
+def per_statement_us(instrumented: bool, iterations: int) -> float:
+    engine = new_engine(instrumented)
+    token = start_request(RequestTiming())
+    try:
+        with engine.connect() as conn:
+            select_one = text("SELECT 1")
+            started = time.perf_counter()
+            for _ in range(iterations):
+                conn.execute(select_one).scalar()
+            elapsed = time.perf_counter() - started
+    finally:
+        end_request(token)
+    return elapsed / iterations * 1e6
+
+
+def build_app(instrumented: bool, statements: int):
+    engine = new_engine(instrumented)
+    app = FastAPI()
+
+    # async def: sin threadpool, para que el ruido no tape la diferencia
+    @app.get("/rides/{ride_id}")
+    async def ride(ride_id: int) -> Response:
+        with engine.connect() as conn:
+            for _ in range(statements):
+                conn.execute(text("SELECT :id"), {"id": ride_id}).scalar()
+        with timed_phase("serialize"):
+            body = b'{"id": %d}' % ride_id
+        return Response(content=body, media_type="application/json")
+
+    if instrumented:
+        return RequestMetricsMiddleware(app, RequestMetrics())
+    return app
+
+
+async def call(app, ride_id: int) -> None:
+    """Un GET directo a la app ASGI, sin cliente HTTP de por medio."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/rides/{ride_id}",
+        "raw_path": f"/rides/{ride_id}".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        pass
+
+    await app(scope, receive, send)
+
+
+def per_request_us(requests: int, statements: int, rounds: int = 5) -> Tuple[float, float]:
+    """Mediana por request sin y con middleware, alternando tandas para repartir el ruido."""
+    apps = {False: build_app(False, statements), True: build_app(True, statements)}
+    samples: Dict[bool, List[float]] = {False: [], True: []}
+
+    async def batch(instrumented: bool) -> None:
+        app = apps[instrumented]
+        for i in range(requests // rounds):
+            started = time.perf_counter()
+            await call(app, i)
+            samples[instrumented].append((time.perf_counter() - started) * 1e6)
+
+    async def run() -> None:
+        for instrumented in (False, True):
+            for i in range(50):
+                await call(apps[instrumented], i)
+        for _ in range(rounds):
+            await batch(False)
+            await batch(True)
+
+    asyncio.run(run())
+    return statistics.median(samples[False]), statistics.median(samples[True])
+
+
+def render_ms(routes: int) -> float:
+    metrics = RequestMetrics()
+    timing = RequestTiming()
+    timing.db_statements, timing.db_seconds = 3, 0.002
+    timing.phases = {"auth": 0.0001, "serialize": 0.0002}
+    for r in range(routes):
+        for status_code in (200, 400, 404, 500):
+            metrics.observe("GET", f"/route/{r}", status_code, 0.01 * (r % 7), timing)
+    return timed(metrics.render, 20)
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--statements", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--routes", type=int, default=20)
+    args = parser.parse_args()
+
+    plain_stmt = per_statement_us(False, args.iterations)
+    hooked_stmt = per_statement_us(True, args.iterations)
+    print({
+        "case": "per_statement",
+        "plain_us": round(plain_stmt, 2),
+        "instrumented_us": round(hooked_stmt, 2),
+        "overhead_us": round(hooked_stmt - plain_stmt, 2),
+    })
+
+    plain_req, measured_req = per_request_us(args.requests, args.statements)
+    print({
+        "case": "per_request",
+        "statements": args.statements,
+        "plain_p50_us": round(plain_req, 1),
+        "instrumented_p50_us": round(measured_req, 1),
+        "overhead_us": round(measured_req - plain_req, 1),
+        "overhead_pct": round((measured_req - plain_req) / plain_req * 100, 1),
+    })
+
+    print({"case": "render", "series": args.routes * 4, "p50_ms": round(render_ms(args.routes), 3)})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Round trips a la base con y sin la caché de rides, en una mezcla de lecturas.
+
+Cada operación abre su propia sesión, como un request: las lecturas pasan por
+el repositorio cacheado (como en `get_sql_ride_repository`) y las uniones por
+la unidad de trabajo. La mezcla por defecto es 95% `list_rides` sobre pares
+origen/destino populares y 5% uniones (`reserve_seat`) sobre un conjunto
+caliente, que invalidan los listados.
+
+    uv run python -m benchmarks.ride_cache_read_mix --operations 5000
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from src.application.dto import JoinRideCommand
+from src.application.use_cases.join_ride import JoinRideUseCase
+from src.domain.clock import utcnow
+from src.domain.entities import Ride, RideStatus
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.db.session import SessionLocal, engine, init_db
+from src.infrastructure.repositories.cached_ride_repository import (
+    CachedRideRepository,
+    RideCache,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+PLACES = ["UPC Monterrico", "UPC San Isidro", "Miraflores", "Surco", "La Molina", "Barranco"]
+
+
+def seed(rides: int) -> list[int]:
+    now = utcnow()
+    ids = []
+    with SessionLocal() as session:
+        repo = RideSQLAlchemyRepository(session)
+        for i in range(rides):
+            ride = repo.create_ride(
+                Ride(
+                    id=None,
+                    driver_id=f"driver-{i % 50}",
+                    origin=PLACES[i % len(PLACES)],
+                    destination=PLACES[(i + 1) % len(PLACES)],
+                    departure_time=now + timedelta(hours=i),
+                    seats_total=1000,
+                    seats_available=1000,
+                    status=RideStatus.OPEN,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            ids.append(ride.id)
+        session.commit()
+    return ids
+
+
+def run(label: str, ride_ids: list[int], operations: int, cache: RideCache | None) -> dict:
+    rng = random.Random(42)
+    hot = ride_ids[:20]
+    statements = 0
+
+    def count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    try:
+        for i in range(operations):
+            with SessionLocal() as session:
+                if rng.random() < 0.95:
+                    repo = RideSQLAlchemyRepository(session)
+                    if cache is not None:
+                        repo = CachedRideRepository(repo, cache)
+                    origin = rng.choice(PLACES[:2])
+                    repo.list_rides(origin=origin, status=RideStatus.OPEN, limit=21)
+                else:
+                    JoinRideUseCase(SQLAlchemyUnitOfWork(session, cache)).execute(
+                        JoinRideCommand(ride_id=rng.choice(hot), passenger_id=f"{label}-{i}")
+                    )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": label,
+        "operations": operations,
+        "db_statements": statements,
+        "statements_per_op": round(statements / operations, 3),
+        "ops_per_s": round(operations / elapsed, 1),
+        "cache": cache.stats() if cache else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=500)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--ttl", type=float, default=30.0)
+    args = parser.parse_args()
+
+    init_db()
+    ride_ids = seed(args.rides)
+    print(run("uncached", ride_ids, args.operations, None))
+    print(run("cached", ride_ids, args.operations, RideCache(TTLCache(10_000, args.ttl))))
+
+
+if __name__ == "__main__":
+    main()
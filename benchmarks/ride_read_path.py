@@ -0,0 +1,136 @@
+"""
+Lectura de `--rides` rides: instancias ORM vs tuplas de columnas, y entidades con slots.
+
+Siembra la tabla hasta tener `--rides` rides (100k por defecto) y los lee todos
+de tres maneras, cada una en una sesión nueva:
+
+- orm: `select(RideModel)`, instancias en el identity map y `to_domain_ride`
+  campo por campo (el camino anterior de los listados);
+- columns: `select(*RIDE_COLUMNS)` y `ride_from_row` (el camino actual);
+- columns_dict: igual, pero hacia una copia de `Ride` sin slots, para aislar
+  lo que aporta `slots=True`.
+
+Para cada una reporta el tiempo (mediana de `--repeat` corridas), el pico de
+memoria durante la lectura y la memoria que queda retenida por la lista de
+rides resultante (tracemalloc, en una corrida aparte).
+
+    DATABASE_URL=postgresql+psycopg2://... uv run python -m benchmarks.ride_read_path --rides 100000
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from datetime import timedelta
+from typing import Callable, List
+
+from sqlalchemy import func, insert, select
+
+from src.domain.clock import utcnow
+from src.domain.entities import Ride, RideStatus
+from src.infrastructure.db.models import RideModel
+from src.infrastructure.db.session import SessionLocal, engine, init_db
+from src.infrastructure.repositories.ride_queries import (
+    RIDE_COLUMNS,
+    ride_from_row,
+    ride_values,
+    to_domain_ride,
+)
+
+# La misma entidad con __dict__ por instancia, como antes de slots=True
+DictRide = make_dataclass("DictRide", [(f.name, f.type, f) for f in fields(Ride)])
+
+
+def seed(rides: int) -> None:
+    with SessionLocal() as session:
+        present = session.scalar(select(func.count()).select_from(RideModel)) or 0
+    base = utcnow() + timedelta(days=1)
+    with engine.begin() as conn:
+        for start in range(present, rides, 5_000):
+            rows = []
+            for i in range(start, min(start + 5_000, rides)):
+                ride = Ride(
+                    id=None,
+                    driver_id=f"driver-{i % 500}",
+                    origin=f"Origen {i % 40}",
+                    destination="UPC Monterrico",
+                    departure_time=base + timedelta(minutes=i),
+                    seats_total=4,
+                    seats_available=4,
+                    status=RideStatus.OPEN,
+                    created_at=base,
+                    updated_at=base,
+                    origin_lat=-12.1 if i % 2 else None,
+                    origin_lng=-76.9 if i % 2 else None,
+                )
+                rows.append(ride_values(ride))
+            conn.execute(insert(RideModel), rows)
+
+
+def read_orm(limit: int) -> list:
+    with SessionLocal() as session:
+        models = session.scalars(select(RideModel).order_by(RideModel.id).limit(limit)).all()
+        return [to_domain_ride(m) for m in models]
+
+
+def read_columns(limit: int) -> list:
+    with SessionLocal() as session:
+        rows = session.execute(select(*RIDE_COLUMNS).order_by(RideModel.id).limit(limit)).all()
+        return [ride_from_row(r) for r in rows]
+
+
+def read_columns_dict(limit: int) -> list:
+    with SessionLocal() as session:
+        rows = session.execute(select(*RIDE_COLUMNS).order_by(RideModel.id).limit(limit)).all()
+        rides = []
+        for row in rows:
+            values = list(row)
+            values[7] = RideStatus(values[7].value)
+            rides.append(DictRide(*values))
+        return rides
+
+
+def measure(name: str, read: Callable[[int], List], limit: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        rides = read(limit)
+        timings.append((time.perf_counter() - started) * 1000)
+        del rides
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rides = read(limit)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "path": name,
+        "rides": len(rides),
+        "p50_ms": round(statistics.median(timings), 1),
+        "peak_mb": round((peak - before) / 1_048_576, 1),
+        "retained_bytes_per_ride": round((current - before) / len(rides)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rides)
+    for name, read in (
+        ("orm", read_orm),
+        ("columns", read_columns),
+        ("columns_dict", read_columns_dict),
+    ):
+        print(measure(name, read, args.rides, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Serialización de listas de rides: modelos Pydantic por fila vs TypeAdapter.
+
+Compara, para páginas de `--rows` rides, el camino anterior de las rutas
+(un `RideResponse` por fila dentro de `ListRidesResponse`, que
+FastAPI vuelve a validar contra `response_model` antes de codificar) con el
+de `ride_json` (TypeAdapter sobre las entidades y `Response` crudo):
+
+- en proceso: solo armar el cuerpo JSON;
+- por HTTP: una app mínima con una ruta por camino, vía TestClient.
+
+También comprueba que ambos caminos produzcan el mismo JSON (listas de rides
+y de rides con pasajeros).
+
+    uv run python -m benchmarks.ride_serialization --rows 1000 10000
+"""
+import argparse
+import json
+import statistics
+import time
+from dataclasses import fields
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.application.dto import RideCursor, RideManifest, RideManifestPage, RidePage
+from src.domain.entities import PassengerStatus, Ride, RidePassenger, RideStatus
+from src.interface.api.pagination import encode_cursor
+from src.interface.api.ride_json import manifest_page_response, ride_page_response
+from src.interface.api.schemas import (
+    DriverRidesResponse,
+    ListRidesResponse,
+    RideManifestResponse,
+    RidePassengerResponse,
+    RideResponse,
+)
+
+
+def new_page(rows: int) -> RidePage:
+    base = datetime(2030, 1, 1, 8, 0)
+    rides = [
+        Ride(
+            id=i,
+            driver_id=f"driver-{i % 97}",
+            origin=f"Origen {i % 40}",
+            destination="UPC Monterrico",
+            departure_time=base + timedelta(minutes=i),
+            seats_total=4,
+            seats_available=i % 5,
+            status=RideStatus.OPEN if i % 5 else RideStatus.FULL,
+            created_at=base,
+            updated_at=base,
+            origin_lat=-12.1 + i * 1e-5 if i % 2 else None,
+            origin_lng=-76.9 - i * 1e-5 if i % 2 else None,
+        )
+        for i in range(1, rows + 1)
+    ]
+    last = rides[-1]
+    return RidePage(rides=rides, next_cursor=RideCursor(last.departure_time, last.id))  # type: ignore[arg-type]
+
+
+def new_manifest_page(page: RidePage) -> RideManifestPage:
+    manifests = [
+        RideManifest(
+            ride=ride,
+            passengers=[
+                RidePassenger(
+                    id=ride.id * 4 + k,  # type: ignore[operator]
+                    ride_id=ride.id,  # type: ignore[arg-type]
+                    passenger_id=f"student-{k}",
+                    status=PassengerStatus.JOINED,
+                    joined_at=ride.created_at,
+                    left_at=None,
+                )
+                for k in range(ride.seats_total - ride.seats_available)
+            ],
+        )
+        for ride in page.rides
+    ]
+    return RideManifestPage(rides=manifests, next_cursor=page.next_cursor)
+
+
+def model_page(page: RidePage) -> ListRidesResponse:
+    """El cuerpo como lo armaban las rutas antes del TypeAdapter."""
+    return ListRidesResponse(
+        rides=[RideResponse.model_validate(r) for r in page.rides],
+        next_cursor=encode_cursor(page.next_cursor) if page.next_cursor else None,
+    )
+
+
+def _attributes(entity: object) -> dict:
+    # Copia superficial: asdict haría deepcopy de cada valor
+    return {f.name: getattr(entity, f.name) for f in fields(entity)}  # type: ignore[arg-type]
+
+
+def model_manifest_page(page: RideManifestPage) -> DriverRidesResponse:
+    return DriverRidesResponse(
+        rides=[
+            RideManifestResponse(
+                **_attributes(m.ride),
+                passengers=[RidePassengerResponse(**_attributes(p)) for p in m.passengers],
+            )
+            for m in page.rides
+        ],
+        next_cursor=encode_cursor(page.next_cursor) if page.next_cursor else None,
+    )
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def build_app(page: RidePage) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/models", response_model=ListRidesResponse)
+    def models() -> ListRidesResponse:
+        return model_page(page)
+
+    @app.get("/adapter", response_model=ListRidesResponse)
+    def adapter():
+        return ride_page_response(page)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        page = new_page(rows)
+        manifests = new_manifest_page(page)
+
+        same = json.loads(model_page(page).model_dump_json()) == json.loads(
+            ride_page_response(page).body
+        )
+        same_manifests = json.loads(model_manifest_page(manifests).model_dump_json()) == json.loads(
+            manifest_page_response(manifests).body
+        )
+
+        models_ms = timed(lambda: model_page(page).model_dump_json(), args.repeat)
+        adapter_ms = timed(lambda: ride_page_response(page), args.repeat)
+        manifest_models_ms = timed(
+            lambda: model_manifest_page(manifests).model_dump_json(), args.repeat
+        )
+        manifest_adapter_ms = timed(lambda: manifest_page_response(manifests), args.repeat)
+
+        with TestClient(build_app(page)) as client:
+            http_models_ms = timed(lambda: client.get("/models").content, args.repeat)
+            http_adapter_ms = timed(lambda: client.get("/adapter").content, args.repeat)
+            size = len(client.get("/adapter").content)
+
+        print({
+            "rows": rows,
+            "bytes": size,
+            "same_json": same and same_manifests,
+            "models_ms": round(models_ms, 1),
+            "adapter_ms": round(adapter_ms, 1),
+            "manifest_models_ms": round(manifest_models_ms, 1),
+            "manifest_adapter_ms": round(manifest_adapter_ms, 1),
+            "http_models_ms": round(http_models_ms, 1),
+            "http_adapter_ms": round(http_adapter_ms, 1),
+            "http_speedup": round(http_models_ms / http_adapter_ms, 2),
+        })
+
+
+if __name__ == "__main__":
+    main()
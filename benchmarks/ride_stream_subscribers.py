@@ -0,0 +1,140 @@
+"""
+Costo de los suscriptores de GET /rides/stream y latencia del fan-out.
+
+Abre `--subscribers` streams SSE ociosos en un solo event loop (el mismo
+generador que sirve la ruta, sin la capa HTTP), con filtros de origen
+repartidos entre `--places` lugares más un tercio sin filtro, y mide con
+tracemalloc la memoria por suscriptor. Después publica eventos desde otro hilo
+(como las rutas sync del threadpool) y mide el costo de `publish` y cuánto
+tarda en llegar todo a todos los suscriptores interesados.
+
+Al final comprueba la cola acotada: un suscriptor que no lee recibe un único
+`event: resync` con la cuenta de descartados y solo los últimos eventos.
+
+    uv run python -m benchmarks.ride_stream_subscribers --subscribers 5000
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.domain.entities import Ride, RideStatus
+from src.domain.events import RideEvent, RideEventType
+from src.infrastructure.ride_event_broker import RideEventBroker
+from src.interface.api.ride_stream import _event_stream, encode_event
+
+
+def new_ride(i: int, origin: str, destination: str) -> Ride:
+    now = datetime.now()
+    return Ride(
+        id=i, driver_id="bench", origin=origin, destination=destination,
+        departure_time=now, seats_total=4, seats_available=3,
+        status=RideStatus.OPEN, created_at=now, updated_at=now,
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    places = [f"Lugar {i}" for i in range(args.places)]
+    broker = RideEventBroker(encode_event, max_queue=args.queue, max_subscribers=args.subscribers)
+
+    # Cada evento sale de un lugar; le interesa a sus suscriptores y a los sin filtro
+    targets = [places[i % len(places)] for i in range(args.events)]
+    origins = [None if i % 3 == 0 else places[i % len(places)] for i in range(args.subscribers)]
+    expected_total = sum(1 for t in targets for o in origins if o is None or o == t)
+    counter = {"events": 0}
+    done = asyncio.Event()
+
+    async def consume(stream):
+        async for chunk in stream:
+            if chunk.startswith(b"id:"):
+                counter["events"] += chunk.count(b"\nevent: ride.")
+                if counter["events"] >= expected_total:
+                    done.set()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    streams = []
+    tasks = []
+    for origin in origins:
+        stream = _event_stream(broker.subscribe(origin=origin), args.heartbeat)
+        streams.append(stream)
+        tasks.append(asyncio.create_task(consume(stream)))
+    # Cada stream queda esperando en next_batch, como un cliente ocioso
+    await asyncio.sleep(0.1)
+    gc.collect()
+    idle = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    publish_us = []
+
+    def publisher() -> None:
+        for i, origin in enumerate(targets):
+            started = time.perf_counter()
+            broker.publish(RideEvent(RideEventType.JOINED, new_ride(i, origin, "UPC")))
+            publish_us.append((time.perf_counter() - started) * 1_000_000)
+            time.sleep(args.interval)
+
+    started = time.perf_counter()
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    await asyncio.wait_for(done.wait(), timeout=60)
+    elapsed = time.perf_counter() - started
+    thread.join()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for stream in streams:
+        await stream.aclose()
+
+    print({
+        "subscribers": args.subscribers,
+        "idle_bytes_per_subscriber": round(idle / args.subscribers),
+        "idle_total_mb": round(idle / 1_048_576, 2),
+    })
+    publish_us.sort()
+    print({
+        "events": args.events,
+        "deliveries": counter["events"],
+        "publish_p50_us": round(statistics.median(publish_us), 1),
+        "publish_max_us": round(publish_us[-1], 1),
+        "all_delivered_ms": round(elapsed * 1000, 1),
+        "subscribers_left": broker.subscribers,
+    })
+
+    # Suscriptor lento: no lee mientras se publican más eventos que su cola
+    subscription = broker.subscribe(origin=places[0])
+    stream = _event_stream(subscription, args.heartbeat)
+    await stream.__anext__()
+    for i in range(args.queue * 3):
+        broker.publish(RideEvent(RideEventType.JOINED, new_ride(i, places[0], "UPC")))
+    resync = await stream.__anext__()
+    batch = await stream.__anext__()
+    await stream.aclose()
+    print({
+        "slow_subscriber_published": args.queue * 3,
+        "resync": resync.decode().split("data: ")[1].strip(),
+        "delivered_after_resync": batch.count(b"\nevent: ride."),
+        "first_id": batch.split(b"\n", 1)[0].decode(),
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=5_000)
+    parser.add_argument("--places", type=int, default=50)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.001)
+    parser.add_argument("--queue", type=int, default=100)
+    parser.add_argument("--heartbeat", type=float, default=15.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
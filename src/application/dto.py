@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from src.domain.entities import RideStatus
+from src.domain.entities import Ride, RidePassenger, RideStatus
+from src.domain.geo import GeoArea
 
 @dataclass
 class CreateRideCommand:
@@ -11,6 +12,18 @@ class CreateRideCommand:
     destination: str
     departure_time: datetime
     seats_total: int
+    origin_lat: Optional[float] = None
+    origin_lng: Optional[float] = None
+    destination_lat: Optional[float] = None
+    destination_lng: Optional[float] = None
+
+
+@dataclass
+class BulkCreateResult:
+    """Resultado por item de un alta masiva; `index` es la posición en el lote."""
+    index: int
+    ride: Optional[Ride] = None
+    error: Optional[str] = None
 
 
 @dataclass
@@ -19,8 +32,80 @@ class JoinRideCommand:
     passenger_id: str
 
 
+@dataclass
+class LeaveRideCommand:
+    ride_id: int
+    passenger_id: str
+
+
+@dataclass(frozen=True)
+class RideCursor:
+    departure_time: datetime
+    ride_id: int
+
+
 @dataclass
 class ListRidesQuery:
     origin: Optional[str] = None
     destination: Optional[str] = None
+    origin_search: Optional[str] = None
+    destination_search: Optional[str] = None
     status: Optional[RideStatus] = None
+    departure_from: Optional[datetime] = None
+    departure_to: Optional[datetime] = None
+    origin_area: Optional[GeoArea] = None
+    destination_area: Optional[GeoArea] = None
+    cursor: Optional[RideCursor] = None
+    limit: Optional[int] = None
+
+
+@dataclass
+class PassengerRidesQuery:
+    """Rides en los que el pasajero sigue unido, por (departure_time, id)."""
+    passenger_id: str
+    cursor: Optional[RideCursor] = None
+    limit: Optional[int] = None
+
+
+@dataclass
+class DriverRidesQuery:
+    """Rides ofrecidos por el driver, por (departure_time, id)."""
+    driver_id: str
+    cursor: Optional[RideCursor] = None
+    limit: Optional[int] = None
+
+
+@dataclass
+class RideManifest:
+    """Un ride con sus pasajeros unidos."""
+    ride: Ride
+    passengers: List[RidePassenger]
+
+
+@dataclass
+class RideManifestPage:
+    rides: List[RideManifest]
+    next_cursor: Optional[RideCursor] = None
+
+
+@dataclass
+class PlaceSuggestion:
+    name: str
+    open_rides: int
+
+
+@dataclass
+class RidePage:
+    rides: List[Ride]
+    next_cursor: Optional[RideCursor] = None
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """Evento de ride leído del outbox; `id` sirve a los consumidores para deduplicar."""
+    id: int
+    event_type: str
+    ride_id: int
+    # JSON con el ride tal como quedó después del cambio
+    payload: str
+    created_at: datetime
@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.application.dto import RideManifest
+from src.domain.entities import Ride, RidePassenger, RideStatus
+from src.domain.geo import GeoArea
+
+
+class AsyncRideRepositoryPort(ABC):
+    """Versión asyncio de RideRepositoryPort (mismas operaciones y contratos)."""
+
+    @abstractmethod
+    async def create_ride(self, ride: Ride) -> Ride:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_passenger(
+        self, ride_id: int, passenger_id: str
+    ) -> Optional[RidePassenger]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        raise NotImplementedError
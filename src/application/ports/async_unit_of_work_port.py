@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.domain.events import RideEvent
+
+
+class AsyncUnitOfWorkPort(ABC):
+    rides: AsyncRideRepositoryPort
+
+    async def __aenter__(self) -> "AsyncUnitOfWorkPort":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.rollback()
+
+    @abstractmethod
+    def add_event(self, event: RideEvent) -> None:
+        """Registra un evento que se publica solo si la transacción se confirma."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def commit(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        raise NotImplementedError
@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from src.application.dto import OutboxMessage
+
+
+class OutboxSinkPort(ABC):
+    @abstractmethod
+    def send(self, messages: List[OutboxMessage]) -> None:
+        """
+        Entrega un lote en orden. Si lanza, el lote completo se reintenta
+        (entrega al menos una vez: el sink puede recibir duplicados).
+        """
+        raise NotImplementedError
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from src.application.dto import PlaceSuggestion
+from src.domain.entities import Ride
+
+
+class PlaceIndexPort(ABC):
+    """Nombres de lugar conocidos, para autocompletar sin ir a la base."""
+
+    @abstractmethod
+    def ride_opened(self, ride: Ride) -> None:
+        """Registra el origen y el destino de un ride recién creado (ya confirmado)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def suggest(self, text: str, limit: int) -> List[PlaceSuggestion]:
+        """Lugares que coinciden por prefijo o aproximadamente, los más ofertados primero."""
+        raise NotImplementedError
@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+
+from src.domain.events import RideEvent
+
+
+class RideEventPublisherPort(ABC):
+    @abstractmethod
+    def publish(self, event: RideEvent) -> None:
+        """Entrega un evento ya confirmado; no debe bloquear al caso de uso."""
+        raise NotImplementedError
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from src.application.dto import RideManifest
 from src.domain.entities import Ride, RidePassenger, RideStatus
+from src.domain.geo import GeoArea
 
 
 class RideRepositoryPort(ABC):
@@ -10,12 +12,24 @@ class RideRepositoryPort(ABC):
     def create_ride(self, ride: Ride) -> Ride:
         raise NotImplementedError
 
+    @abstractmethod
+    def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        """Inserta el lote con un INSERT multi-fila; devuelve los rides en el mismo orden."""
+        raise NotImplementedError
+
     @abstractmethod
     def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
         raise NotImplementedError
 
     @abstractmethod
-    def save_ride(self, ride: Ride) -> Ride:
+    def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        """
+        Pasa a COMPLETED el ride OPEN o FULL del driver, sin leerlo antes.
+        Devuelve None si el ride no existe, es de otro driver o ya no está
+        OPEN ni FULL.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -23,15 +37,71 @@ class RideRepositoryPort(ABC):
         self,
         origin: Optional[str] = None,
         destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
         status: Optional[RideStatus] = None,
         departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
     ) -> List[Ride]:
+        """
+        Lista rides ordenados por (departure_time, id).
+        `after` es el cursor keyset: solo devuelve filas estrictamente posteriores.
+        `origin_area` / `destination_area` filtran por cercanía; los rides sin
+        coordenadas no coinciden.
+        `origin_search` / `destination_search` coinciden por prefijo o de forma
+        aproximada (errores de tipeo) con el nombre del lugar.
+        """
         raise NotImplementedError
 
     @abstractmethod
     def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
         raise NotImplementedError
 
+    @abstractmethod
+    def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        """
+        Descuenta un asiento y registra al pasajero (el commit es de la unidad de trabajo).
+        Con `rejoin`, reactiva la fila del pasajero que había abandonado el ride.
+        Devuelve None si el ride no existe, no está OPEN o ya no tiene asientos.
+        Lanza PassengerAlreadyJoinedError si el pasajero ya estaba unido.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        """
+        Da de baja al pasajero y devuelve su asiento (un ride FULL vuelve a OPEN).
+        Devuelve None si el pasajero no estaba unido o el ride ya no está OPEN ni
+        FULL; en ese caso la unidad de trabajo debe hacer rollback.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        """Rides en los que el pasajero sigue unido, por (departure_time, id)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        """Rides del driver con sus pasajeros unidos, en O(1) sentencias por página."""
+        raise NotImplementedError
+
     @abstractmethod
     def get_passenger(
         self, ride_id: int, passenger_id: str
@@ -41,3 +111,25 @@ class RideRepositoryPort(ABC):
     @abstractmethod
     def list_passengers(self, ride_id: int) -> List[RidePassenger]:
         raise NotImplementedError
+
+    # Housekeeping: solo en el puerto sync, lo corre un hilo en segundo plano
+    @abstractmethod
+    def expire_rides(
+        self, departed_before: datetime, updated_at: datetime, limit: int
+    ) -> List[Ride]:
+        """
+        Pasa a CANCELLED hasta `limit` rides OPEN o FULL que salieron antes de
+        `departed_before` y los devuelve actualizados. Los rides que otra
+        transacción tiene tomados se saltean (quedan para el próximo lote).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def archive_rides(
+        self, departed_before: datetime, archived_at: datetime, limit: int
+    ) -> List[int]:
+        """
+        Mueve a las tablas de archivo hasta `limit` rides COMPLETED o CANCELLED
+        que salieron antes de `departed_before`, con sus pasajeros; devuelve sus ids.
+        """
+        raise NotImplementedError
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+
+from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.domain.events import RideEvent
+
+
+class UnitOfWorkPort(ABC):
+    """
+    Frontera transaccional de un caso de uso.
+
+    Los repositorios solo ejecutan sentencias; el caso de uso confirma una vez
+    con `commit()`. Lo que no se confirmó al salir del `with` se descarta.
+    """
+
+    rides: RideRepositoryPort
+
+    def __enter__(self) -> "UnitOfWorkPort":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.rollback()
+
+    @abstractmethod
+    def add_event(self, event: RideEvent) -> None:
+        """Registra un evento que se publica solo si la transacción se confirma."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def commit(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rollback(self) -> None:
+        raise NotImplementedError
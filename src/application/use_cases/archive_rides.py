@@ -0,0 +1,16 @@
+from datetime import datetime, timedelta
+
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+
+
+class ArchiveRidesUseCase:
+    """Archiva un lote de rides terminados que salieron hace más de `retention`."""
+
+    def __init__(self, uow: UnitOfWorkPort) -> None:
+        self._uow = uow
+
+    def execute(self, now: datetime, retention: timedelta, limit: int) -> int:
+        with self._uow:
+            archived = self._uow.rides.archive_rides(now - retention, now, limit)
+            self._uow.commit()
+        return len(archived)
@@ -1,17 +1,60 @@
-from datetime import datetime
+from typing import Generic, Optional, TypeVar
 
-from src.application.ports.ride_repository_port import RideRepositoryPort
-from src.domain.entities import RideStatus
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.application.use_cases.join_ride import RideNotFoundError
+from src.application.use_cases.leave_ride import RideClosedError
+from src.domain.clock import utcnow
+from src.domain.entities import Ride
+from src.domain.events import RideEvent, RideEventType
 
+U = TypeVar("U", UnitOfWorkPort, AsyncUnitOfWorkPort)
 
-class CompleteRideUseCase:
-    def __init__(self, ride_repository: RideRepositoryPort) -> None:
-        self._ride_repository = ride_repository
 
-    def execute(self, ride_id: int) -> None:
-        ride = self._ride_repository.get_ride_by_id(ride_id)
-        if ride is None:
-            raise ValueError("Ride not found")
-        ride.status = RideStatus.COMPLETED
-        ride.updated_at = datetime.utcnow()
-        self._ride_repository.save_ride(ride)
+class NotRideDriverError(Exception):
+    pass
+
+
+def _rejection(ride: Optional[Ride], driver_id: str) -> Exception:
+    """Motivo por el que complete_ride no aplicó, a partir del ride releído."""
+    if ride is None:
+        return RideNotFoundError("Ride not found")
+
+    if ride.driver_id != driver_id:
+        return NotRideDriverError("Only the ride's driver can complete it")
+
+    return RideClosedError("Ride is no longer open")
+
+
+class _CompleteRide(Generic[U]):
+    def __init__(self, uow: U) -> None:
+        self._uow = uow
+
+    def _record_completed(self, ride: Ride) -> None:
+        self._uow.add_event(RideEvent(RideEventType.COMPLETED, ride))
+
+
+class CompleteRideUseCase(_CompleteRide[UnitOfWorkPort]):
+    def execute(self, ride_id: int, driver_id: str) -> Ride:
+        with self._uow:
+            rides = self._uow.rides
+            ride = rides.complete_ride(ride_id, driver_id, utcnow())
+            if ride is not None:
+                self._record_completed(ride)
+                self._uow.commit()
+                return ride
+
+            raise _rejection(rides.get_ride_by_id(ride_id), driver_id)
+
+
+class AsyncCompleteRideUseCase(_CompleteRide[AsyncUnitOfWorkPort]):
+    async def execute(self, ride_id: int, driver_id: str) -> Ride:
+        async with self._uow:
+            rides = self._uow.rides
+            ride = await rides.complete_ride(ride_id, driver_id, utcnow())
+            if ride is not None:
+                self._record_completed(ride)
+                await self._uow.commit()
+                return ride
+
+            raise _rejection(await rides.get_ride_by_id(ride_id), driver_id)
@@ -1,26 +1,140 @@
-from datetime import datetime
+import logging
+from collections.abc import Iterator
+from typing import Generic, List, Optional, Tuple, TypeVar
 
-from src.application.dto import CreateRideCommand
-from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.application.dto import BulkCreateResult, CreateRideCommand
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.place_index_port import PlaceIndexPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.domain.clock import utcnow
 from src.domain.entities import Ride, RideStatus
+from src.domain.events import RideEvent, RideEventType
 
+logger = logging.getLogger(__name__)
 
-class CreateRideUseCase:
-    def __init__(self, ride_repository: RideRepositoryPort) -> None:
-        self._ride_repository = ride_repository
+U = TypeVar("U", UnitOfWorkPort, AsyncUnitOfWorkPort)
 
+
+def _new_ride(command: CreateRideCommand) -> Ride:
+    now = utcnow()
+    return Ride(
+        id=None,
+        driver_id=command.driver_id,
+        origin=command.origin,
+        destination=command.destination,
+        departure_time=command.departure_time,
+        seats_total=command.seats_total,
+        seats_available=command.seats_total,
+        status=RideStatus.OPEN,
+        created_at=now,
+        updated_at=now,
+        origin_lat=command.origin_lat,
+        origin_lng=command.origin_lng,
+        destination_lat=command.destination_lat,
+        destination_lng=command.destination_lng,
+    )
+
+
+def _index_places(place_index: Optional[PlaceIndexPort], rides: List[Ride]) -> None:
+    # Solo después del commit: el autocompletado no debe ofrecer rides revertidos
+    if place_index is not None:
+        for ride in rides:
+            place_index.ride_opened(ride)
+
+
+class _CreateRide(Generic[U]):
+    def __init__(self, uow: U, place_index: Optional[PlaceIndexPort] = None) -> None:
+        self._uow = uow
+        self._place_index = place_index
+
+
+class CreateRideUseCase(_CreateRide[UnitOfWorkPort]):
     def execute(self, command: CreateRideCommand) -> Ride:
-        now = datetime.utcnow()
-        ride = Ride(
-            id=None,
-            driver_id=command.driver_id,
-            origin=command.origin,
-            destination=command.destination,
-            departure_time=command.departure_time,
-            seats_total=command.seats_total,
-            seats_available=command.seats_total,
-            status=RideStatus.OPEN,
-            created_at=now,
-            updated_at=now,
+        with self._uow:
+            ride = self._uow.rides.create_ride(_new_ride(command))
+            self._uow.add_event(RideEvent(RideEventType.CREATED, ride))
+            self._uow.commit()
+        _index_places(self._place_index, [ride])
+        return ride
+
+
+class AsyncCreateRideUseCase(_CreateRide[AsyncUnitOfWorkPort]):
+    async def execute(self, command: CreateRideCommand) -> Ride:
+        async with self._uow:
+            ride = await self._uow.rides.create_ride(_new_ride(command))
+            self._uow.add_event(RideEvent(RideEventType.CREATED, ride))
+            await self._uow.commit()
+        _index_places(self._place_index, [ride])
+        return ride
+
+
+class _BulkCreate(Generic[U]):
+    """Chunks y resultados del alta masiva; las variantes sync y async solo difieren en la I/O."""
+
+    def __init__(
+        self,
+        uow: U,
+        chunk_size: int = 200,
+        place_index: Optional[PlaceIndexPort] = None,
+    ) -> None:
+        self._uow = uow
+        self._chunk_size = max(1, chunk_size)
+        self._place_index = place_index
+
+    def _chunks(self, commands: List[CreateRideCommand]) -> Iterator[Tuple[int, List[Ride]]]:
+        for start in range(0, len(commands), self._chunk_size):
+            yield start, [_new_ride(c) for c in commands[start:start + self._chunk_size]]
+
+    def _record_created(self, created: List[Ride]) -> None:
+        for ride in created:
+            self._uow.add_event(RideEvent(RideEventType.CREATED, ride))
+
+    def _created(self, start: int, created: List[Ride]) -> List[BulkCreateResult]:
+        _index_places(self._place_index, created)
+        return [BulkCreateResult(index=start + i, ride=ride) for i, ride in enumerate(created)]
+
+    @staticmethod
+    def _failed(start: int, rides: List[Ride], exc: Exception) -> List[BulkCreateResult]:
+        # Un chunk es una transacción: si falla, no se insertó ninguno de sus items
+        logger.warning(
+            "Bulk ride chunk failed",
+            extra={"offset": start, "size": len(rides), "error": type(exc).__name__},
         )
-        return self._ride_repository.create_ride(ride)
+        return [
+            BulkCreateResult(index=start + i, error="Could not store ride")
+            for i in range(len(rides))
+        ]
+
+
+class BulkCreateRidesUseCase(_BulkCreate[UnitOfWorkPort]):
+    """Crea rides en chunks: un INSERT multi-fila y un commit por chunk."""
+
+    def execute(self, commands: List[CreateRideCommand]) -> List[BulkCreateResult]:
+        results: List[BulkCreateResult] = []
+        for start, rides in self._chunks(commands):
+            try:
+                with self._uow:
+                    created = self._uow.rides.create_rides(rides)
+                    self._record_created(created)
+                    self._uow.commit()
+            except Exception as exc:
+                results.extend(self._failed(start, rides, exc))
+                continue
+            results.extend(self._created(start, created))
+        return results
+
+
+class AsyncBulkCreateRidesUseCase(_BulkCreate[AsyncUnitOfWorkPort]):
+    async def execute(self, commands: List[CreateRideCommand]) -> List[BulkCreateResult]:
+        results: List[BulkCreateResult] = []
+        for start, rides in self._chunks(commands):
+            try:
+                async with self._uow:
+                    created = await self._uow.rides.create_rides(rides)
+                    self._record_created(created)
+                    await self._uow.commit()
+            except Exception as exc:
+                results.extend(self._failed(start, rides, exc))
+                continue
+            results.extend(self._created(start, created))
+        return results
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.domain.events import RideEvent, RideEventType
+
+
+class ExpireRidesUseCase:
+    """
+    Cancela un lote de rides OPEN/FULL cuya salida pasó hace más de `grace` sin
+    que el driver los completara (nadie confirmó que el viaje ocurrió), con su
+    evento ride.expired. Sync: lo corre el housekeeping en su hilo.
+    """
+
+    def __init__(self, uow: UnitOfWorkPort) -> None:
+        self._uow = uow
+
+    def execute(self, now: datetime, grace: timedelta, limit: int) -> int:
+        with self._uow:
+            expired = self._uow.rides.expire_rides(now - grace, now, limit)
+            for ride in expired:
+                self._uow.add_event(RideEvent(RideEventType.EXPIRED, ride))
+            self._uow.commit()
+        return len(expired)
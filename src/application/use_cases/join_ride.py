@@ -1,13 +1,19 @@
-from datetime import datetime
+from typing import Generic, Optional, TypeVar
 
 from src.application.dto import JoinRideCommand
-from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.domain.clock import utcnow
 from src.domain.entities import (
     Ride,
     RidePassenger,
     RideStatus,
     PassengerStatus,
 )
+from src.domain.events import RideEvent, RideEventType
+from src.domain.exceptions import PassengerAlreadyJoinedError
+
+U = TypeVar("U", UnitOfWorkPort, AsyncUnitOfWorkPort)
 
 
 class RideNotFoundError(Exception):
@@ -18,48 +24,75 @@ class RideIsFullError(Exception):
     pass
 
 
-class PassengerAlreadyJoinedError(Exception):
-    pass
+def _ensure_not_joined(existing: Optional[RidePassenger]) -> None:
+    if existing is not None and existing.status == PassengerStatus.JOINED:
+        raise PassengerAlreadyJoinedError("Passenger already joined this ride")
+
+
+def _new_passenger(command: JoinRideCommand) -> RidePassenger:
+    return RidePassenger(
+        id=None,
+        ride_id=command.ride_id,
+        passenger_id=command.passenger_id,
+        status=PassengerStatus.JOINED,
+        joined_at=utcnow(),
+        left_at=None,
+    )
+
+
+def _rejection(ride: Optional[Ride]) -> Exception:
+    """Motivo por el que reserve_seat no aplicó, a partir del ride releído."""
+    if ride is None:
+        return RideNotFoundError("Ride not found")
+
+    if ride.status != RideStatus.OPEN:
+        return RideIsFullError("Ride is not open")
+
+    return RideIsFullError("Ride is full")
+
+
+class _JoinRide(Generic[U]):
+    def __init__(self, uow: U) -> None:
+        self._uow = uow
 
+    def _record_joined(self, ride: Ride) -> None:
+        self._uow.add_event(RideEvent(RideEventType.JOINED, ride))
+        if ride.status == RideStatus.FULL:
+            self._uow.add_event(RideEvent(RideEventType.FILLED, ride))
 
-class JoinRideUseCase:
-    def __init__(self, ride_repository: RideRepositoryPort) -> None:
-        self._ride_repository = ride_repository
 
+class JoinRideUseCase(_JoinRide[UnitOfWorkPort]):
     def execute(self, command: JoinRideCommand) -> Ride:
-        ride = self._ride_repository.get_ride_by_id(command.ride_id)
-        if ride is None:
-            raise RideNotFoundError("Ride not found")
-
-        if ride.status != RideStatus.OPEN:
-            raise RideIsFullError("Ride is not open")
-
-        if ride.seats_available <= 0:
-            raise RideIsFullError("Ride is full")
-
-        existing = self._ride_repository.get_passenger(
-            ride_id=ride.id, passenger_id=command.passenger_id  # type: ignore[arg-type]
-        )
-        if existing is not None and existing.status == PassengerStatus.JOINED:
-            raise PassengerAlreadyJoinedError("Passenger already joined this ride")
-
-        now = datetime.utcnow()
-        passenger = RidePassenger(
-            id=None,
-            ride_id=ride.id,  # type: ignore[arg-type]
-            passenger_id=command.passenger_id,
-            status=PassengerStatus.JOINED,
-            joined_at=now,
-            left_at=None,
-        )
-        self._ride_repository.add_passenger(passenger)
-
-        ride.seats_available -= 1
-
-        if ride.seats_available == 0:
-            ride.status = RideStatus.FULL
-
-        ride.updated_at = now
-
-        self._ride_repository.save_ride(ride)
-        return ride
+        with self._uow:
+            rides = self._uow.rides
+            existing = rides.get_passenger(
+                ride_id=command.ride_id, passenger_id=command.passenger_id
+            )
+            _ensure_not_joined(existing)
+
+            ride = rides.reserve_seat(_new_passenger(command), rejoin=existing is not None)
+            if ride is not None:
+                self._record_joined(ride)
+                self._uow.commit()
+                return ride
+
+            # La reserva no aplicó; solo en este camino consultamos el motivo
+            raise _rejection(rides.get_ride_by_id(command.ride_id))
+
+
+class AsyncJoinRideUseCase(_JoinRide[AsyncUnitOfWorkPort]):
+    async def execute(self, command: JoinRideCommand) -> Ride:
+        async with self._uow:
+            rides = self._uow.rides
+            existing = await rides.get_passenger(
+                ride_id=command.ride_id, passenger_id=command.passenger_id
+            )
+            _ensure_not_joined(existing)
+
+            ride = await rides.reserve_seat(_new_passenger(command), rejoin=existing is not None)
+            if ride is not None:
+                self._record_joined(ride)
+                await self._uow.commit()
+                return ride
+
+            raise _rejection(await rides.get_ride_by_id(command.ride_id))
@@ -0,0 +1,67 @@
+from typing import Generic, Optional, TypeVar
+
+from src.application.dto import LeaveRideCommand
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.application.use_cases.join_ride import RideNotFoundError
+from src.domain.clock import utcnow
+from src.domain.entities import Ride, RideStatus
+from src.domain.events import RideEvent, RideEventType
+
+U = TypeVar("U", UnitOfWorkPort, AsyncUnitOfWorkPort)
+
+
+class PassengerNotJoinedError(Exception):
+    pass
+
+
+class RideClosedError(Exception):
+    pass
+
+
+def _rejection(ride: Optional[Ride]) -> Exception:
+    """Motivo por el que release_seat no aplicó, a partir del ride releído."""
+    if ride is None:
+        return RideNotFoundError("Ride not found")
+
+    if ride.status not in (RideStatus.OPEN, RideStatus.FULL):
+        return RideClosedError("Ride is no longer open")
+
+    return PassengerNotJoinedError("Passenger has not joined this ride")
+
+
+class _LeaveRide(Generic[U]):
+    def __init__(self, uow: U) -> None:
+        self._uow = uow
+
+    def _record_left(self, ride: Ride) -> None:
+        self._uow.add_event(RideEvent(RideEventType.LEFT, ride))
+
+
+class LeaveRideUseCase(_LeaveRide[UnitOfWorkPort]):
+    def execute(self, command: LeaveRideCommand) -> Ride:
+        with self._uow:
+            rides = self._uow.rides
+            ride = rides.release_seat(command.ride_id, command.passenger_id, utcnow())
+            if ride is not None:
+                self._record_left(ride)
+                self._uow.commit()
+                return ride
+
+            # La baja del pasajero pudo aplicarse; la excepción hace rollback
+            raise _rejection(rides.get_ride_by_id(command.ride_id))
+
+
+class AsyncLeaveRideUseCase(_LeaveRide[AsyncUnitOfWorkPort]):
+    async def execute(self, command: LeaveRideCommand) -> Ride:
+        async with self._uow:
+            rides = self._uow.rides
+            ride = await rides.release_seat(
+                command.ride_id, command.passenger_id, utcnow()
+            )
+            if ride is not None:
+                self._record_left(ride)
+                await self._uow.commit()
+                return ride
+
+            raise _rejection(await rides.get_ride_by_id(command.ride_id))
@@ -1,20 +1,140 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Generic, List, NamedTuple, Optional, Tuple, TypeVar, Union
 
-from src.application.dto import ListRidesQuery
+from src.application.dto import (
+    DriverRidesQuery,
+    ListRidesQuery,
+    PassengerRidesQuery,
+    RideCursor,
+    RideManifest,
+    RideManifestPage,
+    RidePage,
+)
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
 from src.application.ports.ride_repository_port import RideRepositoryPort
 from src.domain.entities import Ride
 
+R = TypeVar("R", RideRepositoryPort, AsyncRideRepositoryPort)
 
-class ListRidesUseCase:
-    def __init__(self, ride_repository: RideRepositoryPort) -> None:
-        self._ride_repository = ride_repository
 
-    def execute(self, query: Optional[ListRidesQuery] = None) -> List[Ride]:
-        query = query or ListRidesQuery()
-        return self._ride_repository.list_rides(
+class _PageRequest(NamedTuple):
+    size: int
+    after: Optional[Tuple[datetime, int]]
+    # Una fila extra para saber si hay página siguiente sin un COUNT
+    limit: int
+
+
+class _RidePaginator:
+    """Tamaño de página y cursores; los casos de uso sync y async solo difieren en la lectura."""
+
+    def __init__(self, default_page_size: int, max_page_size: int) -> None:
+        self._default_page_size = default_page_size
+        self._max_page_size = max_page_size
+
+    def request(
+        self, query: Union[ListRidesQuery, PassengerRidesQuery, DriverRidesQuery]
+    ) -> _PageRequest:
+        size = min(query.limit or self._default_page_size, self._max_page_size)
+        cursor = query.cursor
+        after = (cursor.departure_time, cursor.ride_id) if cursor else None
+        return _PageRequest(size=size, after=after, limit=size + 1)
+
+    @staticmethod
+    def list_rides_args(query: ListRidesQuery, request: _PageRequest) -> dict:
+        return dict(
             origin=query.origin,
             destination=query.destination,
+            origin_search=query.origin_search,
+            destination_search=query.destination_search,
             status=query.status,
-            departure_from=None,
+            departure_from=query.departure_from,
+            departure_to=query.departure_to,
+            origin_area=query.origin_area,
+            destination_area=query.destination_area,
+            after=request.after,
+            limit=request.limit,
+        )
+
+    @staticmethod
+    def to_page(rides: List[Ride], request: _PageRequest) -> RidePage:
+        next_cursor = None
+        if len(rides) > request.size:
+            rides = rides[:request.size]
+            last = rides[-1]
+            next_cursor = RideCursor(
+                departure_time=last.departure_time,
+                ride_id=last.id,  # type: ignore[arg-type]
+            )
+        return RidePage(rides=rides, next_cursor=next_cursor)
+
+    @classmethod
+    def to_manifest_page(
+        cls, manifests: List[RideManifest], request: _PageRequest
+    ) -> RideManifestPage:
+        page = cls.to_page([m.ride for m in manifests], request)
+        return RideManifestPage(rides=manifests[:request.size], next_cursor=page.next_cursor)
+
+
+class _Listing(Generic[R]):
+    def __init__(
+        self,
+        ride_repository: R,
+        default_page_size: int = 50,
+        max_page_size: int = 200,
+    ) -> None:
+        self._ride_repository = ride_repository
+        self._paginator = _RidePaginator(default_page_size, max_page_size)
+
+
+class ListRidesUseCase(_Listing[RideRepositoryPort]):
+    def execute(self, query: Optional[ListRidesQuery] = None) -> RidePage:
+        query = query or ListRidesQuery()
+        request = self._paginator.request(query)
+        rides = self._ride_repository.list_rides(**self._paginator.list_rides_args(query, request))
+        return self._paginator.to_page(rides, request)
+
+
+class AsyncListRidesUseCase(_Listing[AsyncRideRepositoryPort]):
+    async def execute(self, query: Optional[ListRidesQuery] = None) -> RidePage:
+        query = query or ListRidesQuery()
+        request = self._paginator.request(query)
+        rides = await self._ride_repository.list_rides(
+            **self._paginator.list_rides_args(query, request)
+        )
+        return self._paginator.to_page(rides, request)
+
+
+class ListPassengerRidesUseCase(_Listing[RideRepositoryPort]):
+    def execute(self, query: PassengerRidesQuery) -> RidePage:
+        request = self._paginator.request(query)
+        rides = self._ride_repository.list_passenger_rides(
+            query.passenger_id, after=request.after, limit=request.limit
+        )
+        return self._paginator.to_page(rides, request)
+
+
+class AsyncListPassengerRidesUseCase(_Listing[AsyncRideRepositoryPort]):
+    async def execute(self, query: PassengerRidesQuery) -> RidePage:
+        request = self._paginator.request(query)
+        rides = await self._ride_repository.list_passenger_rides(
+            query.passenger_id, after=request.after, limit=request.limit
+        )
+        return self._paginator.to_page(rides, request)
+
+
+class ListDriverRidesUseCase(_Listing[RideRepositoryPort]):
+    def execute(self, query: DriverRidesQuery) -> RideManifestPage:
+        request = self._paginator.request(query)
+        manifests = self._ride_repository.list_driver_rides(
+            query.driver_id, after=request.after, limit=request.limit
+        )
+        return self._paginator.to_manifest_page(manifests, request)
+
+
+class AsyncListDriverRidesUseCase(_Listing[AsyncRideRepositoryPort]):
+    async def execute(self, query: DriverRidesQuery) -> RideManifestPage:
+        request = self._paginator.request(query)
+        manifests = await self._ride_repository.list_driver_rides(
+            query.driver_id, after=request.after, limit=request.limit
         )
+        return self._paginator.to_manifest_page(manifests, request)
@@ -0,0 +1,15 @@
+from typing import List
+
+from src.application.dto import PlaceSuggestion
+from src.application.ports.place_index_port import PlaceIndexPort
+
+
+class SuggestPlacesUseCase:
+    """Autocompletado de orígenes/destinos; responde desde memoria, sin I/O."""
+
+    def __init__(self, place_index: PlaceIndexPort, max_limit: int = 20) -> None:
+        self._place_index = place_index
+        self._max_limit = max_limit
+
+    def execute(self, text: str, limit: int = 10) -> List[PlaceSuggestion]:
+        return self._place_index.suggest(text, min(limit, self._max_limit))
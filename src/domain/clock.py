@@ -0,0 +1,12 @@
+"""
+Hora actual en UTC.
+
+Las columnas DateTime del modelo y las entidades guardan fechas naive en UTC,
+así que se descarta la zona tras calcularla con un reloj consciente de zona
+(``datetime.utcnow`` está obsoleto desde Python 3.12).
+"""
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
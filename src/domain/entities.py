@@ -16,7 +16,7 @@ class PassengerStatus(str, Enum):
     CANCELLED = "CANCELLED"
 
 
-@dataclass
+@dataclass(slots=True)
 class Ride:
     id: Optional[int]
     driver_id: str
@@ -28,9 +28,14 @@ class Ride:
     status: RideStatus
     created_at: datetime
     updated_at: datetime
+    # Coordenadas opcionales (WGS84) para la búsqueda por cercanía
+    origin_lat: Optional[float] = None
+    origin_lng: Optional[float] = None
+    destination_lat: Optional[float] = None
+    destination_lng: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RidePassenger:
     id: Optional[int]
     ride_id: int
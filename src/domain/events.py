@@ -0,0 +1,31 @@
+"""
+Eventos de dominio del ciclo de vida de un ride.
+
+Los casos de uso los registran en la unidad de trabajo y solo se publican si
+la transacción se confirma.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+
+from src.domain.entities import Ride
+
+
+class RideEventType(str, Enum):
+    CREATED = "ride.created"
+    JOINED = "ride.joined"
+    # Se llenó con la última unión (status FULL); llega junto con su ride.joined
+    FILLED = "ride.filled"
+    # Un pasajero abandonó: se liberó un asiento (y un ride FULL volvió a OPEN)
+    LEFT = "ride.left"
+    COMPLETED = "ride.completed"
+    # Salió sin que el driver lo completara: el housekeeping lo pasó a CANCELLED
+    EXPIRED = "ride.expired"
+
+
+@dataclass(frozen=True)
+class RideEvent:
+    type: RideEventType
+    # Estado del ride después del cambio
+    ride: Ride
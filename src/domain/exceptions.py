@@ -0,0 +1,8 @@
+"""
+Errores de reglas del dominio que detectan tanto los casos de uso como los
+repositorios (p. ej. la restricción única de pasajeros por ride).
+"""
+
+
+class PassengerAlreadyJoinedError(Exception):
+    pass
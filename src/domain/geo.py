@@ -0,0 +1,71 @@
+"""
+Áreas de búsqueda geográfica (radio o rectángulo) sobre coordenadas WGS84.
+
+Las distancias usan la aproximación equirectangular: a escala de ciudad el
+error es despreciable y se puede evaluar en SQL con aritmética simple, sin
+funciones trigonométricas por fila (SQLite no las trae por defecto).
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Union
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    def __post_init__(self) -> None:
+        if not (-90 <= self.min_lat <= self.max_lat <= 90):
+            raise ValueError("Invalid latitude range")
+        if not (-180 <= self.min_lng <= self.max_lng <= 180):
+            raise ValueError("Invalid longitude range")
+
+    def bounding_box(self) -> BoundingBox:
+        return self
+
+
+@dataclass(frozen=True)
+class GeoRadius:
+    lat: float
+    lng: float
+    radius_km: float
+
+    def __post_init__(self) -> None:
+        if not (-90 <= self.lat <= 90 and -180 <= self.lng <= 180):
+            raise ValueError("Invalid coordinates")
+        if self.radius_km <= 0:
+            raise ValueError("Radius must be positive")
+
+    @property
+    def lng_scale(self) -> float:
+        """Km por grado de longitud relativos a uno de latitud, en el centro."""
+        return max(math.cos(math.radians(self.lat)), 1e-6)
+
+    def bounding_box(self) -> BoundingBox:
+        dlat = self.radius_km / KM_PER_DEGREE
+        dlng = dlat / self.lng_scale
+        # Sin cruzar el antimeridiano: el rectángulo se recorta a [-180, 180]
+        return BoundingBox(
+            min_lat=max(self.lat - dlat, -90.0),
+            min_lng=max(self.lng - dlng, -180.0),
+            max_lat=min(self.lat + dlat, 90.0),
+            max_lng=min(self.lng + dlng, 180.0),
+        )
+
+    def contains(self, lat: float, lng: float) -> bool:
+        return distance_km(self.lat, self.lng, lat, lng, self.lng_scale) <= self.radius_km
+
+
+GeoArea = Union[BoundingBox, GeoRadius]
+
+
+def distance_km(lat1: float, lng1: float, lat2: float, lng2: float, lng_scale: float) -> float:
+    return KM_PER_DEGREE * math.hypot(lat2 - lat1, (lng2 - lng1) * lng_scale)
@@ -0,0 +1,434 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada migración se aplica una sola vez y queda registrada en la tabla
+`schema_migrations`. Las migraciones son idempotentes: usan `checkfirst` /
+`IF EXISTS` (o el inspector, para columnas), de modo que sirven igual para una
+base nueva que para una creada con versiones previas (la 0001 es el esquema
+que creaba `init_db` antes de que hubiera migraciones).
+
+Ninguna migración lee los modelos: cada una declara acá las tablas, columnas e
+índices tal como eran cuando se escribió. Los modelos describen el esquema
+final y cambian; una migración vieja tiene que seguir haciendo lo mismo.
+
+Cada migración corre en su propia transacción, junto con su registro. Las
+marcadas `online` construyen índices sobre tablas que pueden ser grandes: en
+PostgreSQL corren fuera de una transacción, con CREATE INDEX CONCURRENTLY, para
+no bloquear las escrituras mientras se construyen. Si una se corta a la mitad,
+la próxima corrida la repite entera (descarta los índices que quedaron
+inválidos y vuelve a crearlos).
+"""
+import logging
+from collections.abc import Callable
+from typing import NamedTuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+from src.domain.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+_migrations_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _migrations_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Clave arbitraria para serializar réplicas que migran a la vez en PostgreSQL
+_ADVISORY_LOCK_KEY = 7_341_002
+
+# Mismos nombres de tipo que Enum(RideStatusDB) / Enum(PassengerStatusDB)
+_RIDE_STATUS = ("OPEN", "FULL", "COMPLETED", "CANCELLED")
+_PASSENGER_STATUS = ("JOINED", "CANCELLED")
+
+
+def _ride_status() -> Enum:
+    return Enum(*_RIDE_STATUS, name="ridestatusdb")
+
+
+def _passenger_status() -> Enum:
+    return Enum(*_PASSENGER_STATUS, name="passengerstatusdb")
+
+
+def _online(conn: Connection) -> bool:
+    # Fuera de una transacción (ver `migrate`): solo PostgreSQL
+    return conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def _drop_index_if_exists(conn: Connection, name: str) -> None:
+    concurrently = " CONCURRENTLY" if _online(conn) else ""
+    conn.execute(text(f"DROP INDEX{concurrently} IF EXISTS {name}"))
+
+
+def _index(table_name: str, name: str, *columns: str, **kwargs) -> Index:
+    # Índice sobre una tabla de referencia con solo esas columnas: CREATE INDEX
+    # no necesita más que los nombres
+    table = Table(table_name, MetaData(), *(Column(c) for c in columns))
+    return Index(name, *(table.c[c] for c in columns), **kwargs)
+
+
+def _create_indexes(conn: Connection, *indexes: Index) -> None:
+    online = _online(conn)
+    for index in indexes:
+        if online:
+            # Un CREATE INDEX CONCURRENTLY cortado deja el índice inválido: con
+            # checkfirst no se reconstruiría nunca
+            invalid = conn.execute(
+                text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {"name": index.name},
+            ).first()
+            if invalid:
+                _drop_index_if_exists(conn, str(index.name))
+            index.dialect_options["postgresql"]["concurrently"] = True
+        index.create(conn, checkfirst=True)
+
+
+def _add_column_if_missing(conn: Connection, table_name: str, column: Column) -> None:
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    if column.name not in existing:
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"))
+
+
+def _0001_initial_schema(conn: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "rides",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("driver_id", String, index=True, nullable=False),
+        Column("origin", String, index=True, nullable=False),
+        Column("destination", String, index=True, nullable=False),
+        Column("departure_time", DateTime, nullable=False),
+        Column("seats_total", Integer, nullable=False),
+        Column("seats_available", Integer, nullable=False),
+        Column("status", _ride_status(), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+    )
+    Table(
+        "ride_passengers",
+        metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("ride_id", Integer, ForeignKey("rides.id"), nullable=False),
+        Column("passenger_id", String, index=True, nullable=False),
+        Column("status", _passenger_status(), nullable=False),
+        Column("joined_at", DateTime, nullable=False),
+        Column("left_at", DateTime, nullable=True),
+    )
+    metadata.create_all(conn)
+
+
+def _0002_query_shaped_indexes(conn: Connection) -> None:
+    # Índices redundantes de la versión inicial (id ya es PK; origin y
+    # destination quedan cubiertos por los compuestos)
+    for name in (
+        "ix_rides_id",
+        "ix_rides_origin",
+        "ix_rides_destination",
+        "ix_ride_passengers_id",
+    ):
+        _drop_index_if_exists(conn, name)
+    _create_indexes(
+        conn,
+        _index("rides", "ix_rides_departure_time_id", "departure_time", "id"),
+        _index("rides", "ix_rides_origin_departure", "origin", "departure_time", "id"),
+        _index("rides", "ix_rides_destination_departure", "destination", "departure_time", "id"),
+        _index(
+            "rides",
+            "ix_rides_origin_destination_departure",
+            "origin",
+            "destination",
+            "departure_time",
+            "id",
+        ),
+        _index("rides", "ix_rides_status_departure", "status", "departure_time", "id"),
+        _index(
+            "rides",
+            "ix_rides_open_departure",
+            "departure_time",
+            "id",
+            postgresql_where=text("status = 'OPEN'"),
+            sqlite_where=text("status = 'OPEN'"),
+        ),
+    )
+    _remove_duplicate_passengers(conn)
+    _create_indexes(
+        conn,
+        _index(
+            "ride_passengers",
+            "uq_ride_passengers_ride_passenger",
+            "ride_id",
+            "passenger_id",
+            unique=True,
+        ),
+    )
+
+
+def _remove_duplicate_passengers(conn: Connection) -> None:
+    """
+    El join de la versión inicial (leer y después insertar) pudo guardar al
+    mismo pasajero dos veces en un ride, descontando dos asientos. Antes del
+    índice único queda una fila por (ride, pasajero): la JOINED si hay, si no la
+    más vieja; y los rides OPEN/FULL afectados recuentan sus asientos.
+    """
+    ride_ids = list(
+        conn.execute(
+            text(
+                "SELECT ride_id FROM ride_passengers GROUP BY ride_id, passenger_id "
+                "HAVING count(*) > 1"
+            )
+        ).scalars()
+    )
+    if not ride_ids:
+        return
+    removed = conn.execute(
+        text(
+            "DELETE FROM ride_passengers WHERE id IN ("
+            " SELECT p.id FROM ride_passengers p WHERE EXISTS ("
+            "  SELECT 1 FROM ride_passengers k"
+            "  WHERE k.ride_id = p.ride_id AND k.passenger_id = p.passenger_id AND ("
+            "   (k.status = 'JOINED' AND p.status <> 'JOINED')"
+            "   OR (k.status = p.status AND k.id < p.id))))"
+        )
+    ).rowcount
+    joined = (
+        "(SELECT count(*) FROM ride_passengers p "
+        "WHERE p.ride_id = rides.id AND p.status = 'JOINED')"
+    )
+    seats = f"CASE WHEN seats_total > {joined} THEN seats_total - {joined} ELSE 0 END"
+    live = "id = :ride_id AND status IN ('OPEN', 'FULL')"
+    for ride_id in sorted(set(ride_ids)):
+        params = {"ride_id": ride_id}
+        conn.execute(text(f"UPDATE rides SET seats_available = {seats} WHERE {live}"), params)
+        # Dos UPDATE y no un CASE: en PostgreSQL el CASE da text, no el enum
+        conn.execute(text(f"UPDATE rides SET status = 'FULL' WHERE {live} AND seats_available = 0"), params)
+        conn.execute(text(f"UPDATE rides SET status = 'OPEN' WHERE {live} AND seats_available > 0"), params)
+    logger.warning(
+        "Removed duplicate ride passengers before adding their unique index",
+        extra={"rows": removed, "rides": len(set(ride_ids))},
+    )
+
+
+def _0003_ride_coordinates(conn: Connection) -> None:
+    for column in (
+        Column("origin_lat", Float),
+        Column("origin_lng", Float),
+        Column("origin_geohash", String(12)),
+        Column("destination_lat", Float),
+        Column("destination_lng", Float),
+        Column("destination_geohash", String(12)),
+    ):
+        _add_column_if_missing(conn, "rides", column)
+    _create_indexes(
+        conn,
+        _index("rides", "ix_rides_origin_geohash", "origin_geohash"),
+        _index("rides", "ix_rides_destination_geohash", "destination_geohash"),
+    )
+
+
+def _0004_place_trigram_indexes(conn: Connection) -> None:
+    # Solo PostgreSQL: índices GIN de trigramas para ILIKE '%..%' y `%>` sobre
+    # origin/destination. En otros motores la búsqueda aproximada usa el índice
+    # de lugares en memoria. pg_trgm es una extensión "trusted" desde PG 13:
+    # basta con privilegio CREATE sobre la base.
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for column in ("origin", "destination"):
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_rides_{column}_trgm "
+                f"ON rides USING gin ({column} gin_trgm_ops)"
+            )
+        )
+
+
+def _0005_ride_outbox(conn: Connection) -> None:
+    Table(
+        "ride_outbox",
+        MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("event_type", String(32), nullable=False),
+        Column("ride_id", Integer, nullable=False),
+        Column("payload", Text, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    ).create(conn, checkfirst=True)
+
+
+def _0006_passenger_rides_index(conn: Connection) -> None:
+    # El índice simple sobre passenger_id queda cubierto por el compuesto
+    _drop_index_if_exists(conn, "ix_ride_passengers_passenger_id")
+    _create_indexes(
+        conn,
+        _index(
+            "ride_passengers",
+            "ix_ride_passengers_passenger_status_ride",
+            "passenger_id",
+            "status",
+            "ride_id",
+        ),
+    )
+
+
+def _0007_driver_rides_index(conn: Connection) -> None:
+    # El índice simple sobre driver_id queda cubierto por el compuesto
+    _drop_index_if_exists(conn, "ix_rides_driver_id")
+    _create_indexes(
+        conn, _index("rides", "ix_rides_driver_departure", "driver_id", "departure_time", "id")
+    )
+
+
+def _0008_idempotency_keys(conn: Connection) -> None:
+    Table(
+        "idempotency_keys",
+        MetaData(),
+        Column("scope", String(255), primary_key=True),
+        Column("key", String(255), primary_key=True),
+        Column("request_hash", String(64), nullable=False),
+        Column("status_code", Integer, nullable=True),
+        Column("body", LargeBinary, nullable=True),
+        Column("created_at", DateTime, nullable=False),
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    ).create(conn, checkfirst=True)
+
+
+def _0009_ride_archive(conn: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "rides_archive",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("driver_id", String, nullable=False),
+        Column("origin", String, nullable=False),
+        Column("destination", String, nullable=False),
+        Column("departure_time", DateTime, nullable=False),
+        Column("seats_total", Integer, nullable=False),
+        Column("seats_available", Integer, nullable=False),
+        Column("status", _ride_status(), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+        Column("origin_lat", Float, nullable=True),
+        Column("origin_lng", Float, nullable=True),
+        Column("origin_geohash", String(12), nullable=True),
+        Column("destination_lat", Float, nullable=True),
+        Column("destination_lng", Float, nullable=True),
+        Column("destination_geohash", String(12), nullable=True),
+        Column("archived_at", DateTime, nullable=False),
+        Index("ix_rides_archive_driver_departure", "driver_id", "departure_time"),
+    )
+    Table(
+        "ride_passengers_archive",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("ride_id", Integer, nullable=False),
+        Column("passenger_id", String, nullable=False),
+        Column("status", _passenger_status(), nullable=False),
+        Column("joined_at", DateTime, nullable=False),
+        Column("left_at", DateTime, nullable=True),
+        Column("archived_at", DateTime, nullable=False),
+        Index("ix_ride_passengers_archive_ride", "ride_id"),
+        Index("ix_ride_passengers_archive_passenger", "passenger_id"),
+    )
+    # El tipo enum de PostgreSQL ya existe (0001): checkfirst no lo recrea
+    metadata.create_all(conn)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+    # En PostgreSQL, fuera de una transacción (índices con CONCURRENTLY)
+    online: bool = False
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "initial_schema", _0001_initial_schema),
+    Migration(2, "query_shaped_indexes", _0002_query_shaped_indexes, online=True),
+    Migration(3, "ride_coordinates", _0003_ride_coordinates),
+    Migration(4, "place_trigram_indexes", _0004_place_trigram_indexes),
+    Migration(5, "ride_outbox", _0005_ride_outbox),
+    Migration(6, "passenger_rides_index", _0006_passenger_rides_index),
+    Migration(7, "driver_rides_index", _0007_driver_rides_index),
+    Migration(8, "idempotency_keys", _0008_idempotency_keys),
+    Migration(9, "ride_archive", _0009_ride_archive),
+]
+
+
+def applied_versions(conn: Connection) -> set[int]:
+    if not inspect(conn).has_table(schema_migrations.name):
+        return set()
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        schema_migrations.insert().values(
+            version=migration.version, name=migration.name, applied_at=utcnow()
+        )
+    )
+
+
+def migrate(engine: Engine) -> list[int]:
+    """Aplica las migraciones pendientes en orden y devuelve las versiones aplicadas."""
+    applied: list[int] = []
+    with engine.connect() as conn:
+        postgres = conn.dialect.name == "postgresql"
+        if postgres:
+            # De sesión y no de transacción: las migraciones online corren fuera
+            # de una, y otra réplica no debe empezar a migrar entretanto
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            conn.commit()
+        try:
+            with conn.begin():
+                _migrations_metadata.create_all(conn)
+                done = applied_versions(conn)
+            for migration in MIGRATIONS:
+                if migration.version in done:
+                    continue
+                if migration.online and postgres:
+                    isolation_level = conn.get_isolation_level()
+                    conn.execution_options(isolation_level="AUTOCOMMIT")
+                    try:
+                        migration.upgrade(conn)
+                        conn.commit()
+                    finally:
+                        conn.execution_options(isolation_level=isolation_level)
+                    with conn.begin():
+                        _record(conn, migration)
+                else:
+                    with conn.begin():
+                        migration.upgrade(conn)
+                        _record(conn, migration)
+                applied.append(migration.version)
+        finally:
+            if postgres:
+                conn.rollback()
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+                conn.commit()
+    return applied
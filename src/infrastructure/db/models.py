@@ -1,16 +1,21 @@
-from datetime import datetime
 from enum import Enum as PyEnum
 
 from sqlalchemy import (
     Column,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
+    Text,
+    text,
 )
 from sqlalchemy.orm import relationship
 
+from src.domain.clock import utcnow
 from src.infrastructure.db.base import Base
 
 
@@ -29,33 +34,168 @@ class PassengerStatusDB(str, PyEnum):
 class RideModel(Base):
     __tablename__ = "rides"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    driver_id = Column(String, index=True, nullable=False)
-    origin = Column(String, index=True, nullable=False)
-    destination = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    driver_id = Column(String, nullable=False)
+    origin = Column(String, nullable=False)
+    destination = Column(String, nullable=False)
     departure_time = Column(DateTime, nullable=False)
     seats_total = Column(Integer, nullable=False)
     seats_available = Column(Integer, nullable=False)
     status = Column(Enum(RideStatusDB), default=RideStatusDB.OPEN, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
     updated_at = Column(
         DateTime,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        default=utcnow,
+        onupdate=utcnow,
         nullable=False,
     )
 
+    # Coordenadas opcionales y su geohash (índice espacial sobre B-tree)
+    origin_lat = Column(Float, nullable=True)
+    origin_lng = Column(Float, nullable=True)
+    origin_geohash = Column(String(12), nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lng = Column(Float, nullable=True)
+    destination_geohash = Column(String(12), nullable=True)
+
     passengers = relationship("RidePassengerModel", back_populates="ride")
 
+    # Todos los índices de list_rides terminan en (departure_time, id) para
+    # servir el filtro, el orden y el cursor keyset con un solo recorrido.
+    __table_args__ = (
+        Index("ix_rides_departure_time_id", "departure_time", "id"),
+        Index("ix_rides_origin_departure", "origin", "departure_time", "id"),
+        Index("ix_rides_destination_departure", "destination", "departure_time", "id"),
+        Index(
+            "ix_rides_origin_destination_departure",
+            "origin",
+            "destination",
+            "departure_time",
+            "id",
+        ),
+        Index("ix_rides_status_departure", "status", "departure_time", "id"),
+        Index("ix_rides_driver_departure", "driver_id", "departure_time", "id"),
+        Index(
+            "ix_rides_open_departure",
+            "departure_time",
+            "id",
+            postgresql_where=text("status = 'OPEN'"),
+            sqlite_where=text("status = 'OPEN'"),
+        ),
+        # Búsqueda por área: rangos de prefijo de geohash
+        Index("ix_rides_origin_geohash", "origin_geohash"),
+        Index("ix_rides_destination_geohash", "destination_geohash"),
+    )
+
 
 class RidePassengerModel(Base):
     __tablename__ = "ride_passengers"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     ride_id = Column(Integer, ForeignKey("rides.id"), nullable=False)
-    passenger_id = Column(String, index=True, nullable=False)
+    passenger_id = Column(String, nullable=False)
     status = Column(Enum(PassengerStatusDB), nullable=False)
-    joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    joined_at = Column(DateTime, default=utcnow, nullable=False)
     left_at = Column(DateTime, nullable=True)
 
     ride = relationship("RideModel", back_populates="passengers")
+
+    __table_args__ = (
+        # Cubre get_passenger / list_passengers y evita uniones duplicadas
+        Index(
+            "uq_ride_passengers_ride_passenger",
+            "ride_id",
+            "passenger_id",
+            unique=True,
+        ),
+        # "Mis rides": los del pasajero que siguen JOINED, sin tocar la tabla
+        Index(
+            "ix_ride_passengers_passenger_status_ride",
+            "passenger_id",
+            "status",
+            "ride_id",
+        ),
+    )
+
+
+class RideArchiveModel(Base):
+    """
+    Rides COMPLETED/CANCELLED ya viejos, movidos fuera de `rides` por el
+    housekeeping con sus mismos ids. Solo para consultas históricas: sin los
+    índices de list_rides.
+    """
+    __tablename__ = "rides_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    driver_id = Column(String, nullable=False)
+    origin = Column(String, nullable=False)
+    destination = Column(String, nullable=False)
+    departure_time = Column(DateTime, nullable=False)
+    seats_total = Column(Integer, nullable=False)
+    seats_available = Column(Integer, nullable=False)
+    status = Column(Enum(RideStatusDB), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    origin_lat = Column(Float, nullable=True)
+    origin_lng = Column(Float, nullable=True)
+    origin_geohash = Column(String(12), nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lng = Column(Float, nullable=True)
+    destination_geohash = Column(String(12), nullable=True)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rides_archive_driver_departure", "driver_id", "departure_time"),
+    )
+
+
+class RidePassengerArchiveModel(Base):
+    __tablename__ = "ride_passengers_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    ride_id = Column(Integer, nullable=False)
+    passenger_id = Column(String, nullable=False)
+    status = Column(Enum(PassengerStatusDB), nullable=False)
+    joined_at = Column(DateTime, nullable=False)
+    left_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ride_passengers_archive_ride", "ride_id"),
+        Index("ix_ride_passengers_archive_passenger", "passenger_id"),
+    )
+
+
+class RideOutboxModel(Base):
+    """
+    Eventos de rides escritos en la misma transacción que el cambio; el relay
+    los entrega al sink y los borra. Sin FK a rides: el evento describe el ride
+    tal como quedó y no debe impedir archivarlo.
+    """
+    __tablename__ = "ride_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(32), nullable=False)
+    ride_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+
+class IdempotencyKeyModel(Base):
+    """
+    Respuesta guardada por Idempotency-Key, por usuario. Mientras el request
+    original corre, la fila existe sin status_code (reservada).
+    """
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(255), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+
+    __table_args__ = (
+        # Purga de claves vencidas
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
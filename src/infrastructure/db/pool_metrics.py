@@ -0,0 +1,63 @@
+"""
+Pools de conexiones instrumentados.
+
+Miden cuánto espera cada checkout por una conexión libre y cuántos agotan
+POOL_TIMEOUT, y exponen el estado del pool para dimensionarlo con datos.
+"""
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from src.infrastructure.metrics import Histogram
+
+
+class _WaitTimingMixin:
+    # Que el logging del pool siga bajo "sqlalchemy.pool" y no bajo "src"
+    _sqla_logger_namespace = "sqlalchemy.pool"
+    wait_seconds = Histogram()
+    timeouts = 0
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            type(self).timeouts += 1
+            raise
+        finally:
+            type(self).wait_seconds.observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    wait_seconds = Histogram()
+    timeouts = 0
+
+
+class InstrumentedAsyncAdaptedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    wait_seconds = Histogram()
+    timeouts = 0
+
+
+def pool_stats(pool: Pool) -> dict:
+    stats: dict = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout_s=pool.timeout(),
+        )
+    if isinstance(pool, _WaitTimingMixin):
+        stats.update(
+            timeouts=type(pool).timeouts,
+            wait_seconds=type(pool).wait_seconds.snapshot(),
+        )
+    return stats
+
+
+def engine_pool_stats(engine: Engine) -> dict:
+    return pool_stats(engine.pool)
@@ -0,0 +1,191 @@
+"""
+Ruteo de lecturas a réplicas (DATABASE_REPLICA_URLS).
+
+Las lecturas fuera de una transacción de escritura (GET /rides y las listas
+por pasajero y driver, el recuento del índice de lugares) piden su sesión a
+`ReplicaRouter`: round-robin entre las réplicas sanas y, si no hay ninguna, el
+primario. Las unidades de trabajo siguen usando siempre el primario.
+
+Salud: un hilo consulta cada réplica cada `check_seconds` (en PostgreSQL,
+además, que su WAL receiver esté recibiendo del primario y su atraso de
+replicación contra `max_lag_seconds`); un error de
+desconexión en una lectura la saca de la rotación hasta el próximo chequeo
+bueno.
+
+Leer lo propio: un usuario que abre una escritura lee del primario durante
+`sticky_seconds`, contados desde el inicio de ese request, para no ver en la
+lista el estado previo a su join mientras la réplica se pone al día. Por lo
+mismo, lo leído de una réplica no llena la caché compartida de rides: quedaría
+guardado bajo la generación posterior a la escritura (ver `from_replica`).
+"""
+import itertools
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.infrastructure.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Si el WAL receiver está recibiendo del primario y los segundos de atraso: 0
+# si ya aplicó todo lo recibido (un primario sin escrituras recientes no cuenta
+# como atrasado). Sin receiver (cortado, reconectando, o la réplica promovida)
+# recibido = aplicado también da 0, pero la réplica no avanza más: no está sana.
+# Sin pg_read_all_stats la vista solo muestra el pid, así que un status nulo
+# cuenta como streaming.
+_PG_REPLICATION = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_stat_wal_receiver "
+    "WHERE COALESCE(status, 'streaming') = 'streaming'), "
+    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+_PING = text("SELECT 1")
+
+
+@dataclass(eq=False)
+class Replica:
+    name: str
+    engine: Engine
+    session_factory: Callable[[], Session]
+    # La misma réplica en el stack asyncio (DB_ASYNC)
+    async_session_factory: Optional[Callable[[], AsyncSession]] = None
+    # Fuera de la rotación hasta el primer chequeo
+    healthy: bool = False
+    lag_seconds: Optional[float] = None
+    reads: int = 0
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: Callable[[], Session],
+        replicas: Sequence[Replica] = (),
+        async_primary: Optional[Callable[[], AsyncSession]] = None,
+        check_seconds: float = 5.0,
+        max_lag_seconds: float = 0.0,
+        sticky_seconds: float = 5.0,
+        sticky_size: int = 100_000,
+    ) -> None:
+        self._primary = primary
+        self._async_primary = async_primary
+        self.replicas: List[Replica] = list(replicas)
+        self._check_seconds = check_seconds
+        self._max_lag_seconds = max_lag_seconds
+        self._writers = TTLCache[bool](sticky_size, sticky_seconds) if sticky_seconds > 0 else None
+        self._turn = itertools.count()
+        self.primary_reads = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._on_error(replica))
+
+    def mark_write(self, user_id: str) -> None:
+        if self._writers is not None and self.replicas:
+            self._writers.set(user_id, True)
+
+    def _pick(self, user_id: Optional[str]) -> Optional[Replica]:
+        if user_id is not None and self._writers is not None and self._writers.get(user_id):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        replica = healthy[next(self._turn) % len(healthy)]
+        replica.reads += 1
+        return replica
+
+    def read_session(self, user_id: Optional[str] = None) -> Session:
+        """Sesión para lecturas: una réplica sana, o el primario."""
+        replica = self._pick(user_id)
+        if replica is None:
+            self.primary_reads += 1
+            return self._primary()
+        session = replica.session_factory()
+        session.info["replica"] = replica.name
+        return session
+
+    def async_read_session(self, user_id: Optional[str] = None) -> AsyncSession:
+        if self._async_primary is None:
+            raise RuntimeError("Async DB stack is disabled (set DB_ASYNC=true)")
+        replica = self._pick(user_id)
+        if replica is None or replica.async_session_factory is None:
+            self.primary_reads += 1
+            return self._async_primary()
+        session = replica.async_session_factory()
+        session.info["replica"] = replica.name
+        return session
+
+    @staticmethod
+    def from_replica(session: Union[Session, AsyncSession]) -> bool:
+        """Si la sesión lee de una réplica (y puede ver datos atrasados)."""
+        return "replica" in session.info
+
+    # ---------- Salud ----------
+    def _on_error(self, replica: Replica) -> Callable[..., None]:
+        def on_error(context) -> None:  # type: ignore[no-untyped-def]
+            if context.is_disconnect and replica.healthy:
+                replica.healthy = False
+                logger.warning("Read replica disconnected; routing reads elsewhere", extra={"replica": replica.name})
+
+        return on_error
+
+    def check(self) -> None:
+        """Un chequeo de todas las réplicas (lo corre el hilo de `start`)."""
+        for replica in self.replicas:
+            healthy, lag, receiving = False, None, True
+            try:
+                with replica.engine.connect() as conn:
+                    if replica.engine.dialect.name == "postgresql":
+                        receiving, lag = conn.execute(_PG_REPLICATION).one()
+                        lag = float(lag)
+                    else:
+                        conn.execute(_PING)
+                healthy = receiving and (
+                    not self._max_lag_seconds or lag is None or lag <= self._max_lag_seconds
+                )
+            except Exception as exc:
+                if replica.healthy:
+                    logger.warning("Read replica check failed", extra={"replica": replica.name, "error": str(exc)})
+            if replica.healthy and not receiving:
+                logger.warning("Read replica not streaming from the primary", extra={"replica": replica.name})
+            elif replica.healthy and not healthy and lag is not None:
+                logger.warning("Read replica lagging", extra={"replica": replica.name, "lag_seconds": lag})
+            elif healthy and not replica.healthy:
+                logger.info("Read replica back in rotation", extra={"replica": replica.name})
+            replica.healthy, replica.lag_seconds = healthy, lag
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._check_seconds):
+            self.check()
+
+    def start(self) -> None:
+        if not self.replicas:
+            return
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "reads": replica.reads,
+                }
+                for replica in self.replicas
+            ],
+        }
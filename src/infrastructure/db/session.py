@@ -1,13 +1,49 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, Session
 
 from src.config import settings
-from src.infrastructure.db.base import Base
+from src.infrastructure.db.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+)
+from src.infrastructure.db.replicas import Replica
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """Parámetros de pool y de conexión comunes a los engines sync y async."""
+    options: dict = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    # SQLite en memoria usa su propio pool de un solo hilo; el resto, QueuePool
+    if not (backend == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(
+            poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
 
 
 engine = create_engine(
     settings.DATABASE_URL,
     future=True,
+    **_engine_options(settings.DATABASE_URL),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -17,12 +53,65 @@ def get_db_session() -> Session:
     return SessionLocal()
 
 
+def _replica_engines(urls: list[str], is_async: bool = False) -> list:
+    if is_async:
+        return [create_async_engine(url, **_engine_options(url, is_async=True)) for url in urls]
+    return [create_engine(url, future=True, **_engine_options(url)) for url in urls]
+
+
+# Réplicas de lectura (opcionales); las rutea ReplicaRouter (ver dependencies.py)
+replica_engines = _replica_engines(settings.DATABASE_REPLICA_URLS)
+
+
+# Stack asyncio: solo se crea si DB_ASYNC está activo (requiere asyncpg)
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        **_engine_options(settings.ASYNC_DATABASE_URL, is_async=True),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+async_replica_engines: list[AsyncEngine] = []
+if settings.DB_ASYNC and settings.ASYNC_DATABASE_REPLICA_URLS:
+    if len(settings.ASYNC_DATABASE_REPLICA_URLS) != len(settings.DATABASE_REPLICA_URLS):
+        raise ValueError("ASYNC_DATABASE_REPLICA_URLS must list the same replicas as DATABASE_REPLICA_URLS")
+    async_replica_engines = _replica_engines(settings.ASYNC_DATABASE_REPLICA_URLS, is_async=True)
+
+
+def read_replicas() -> list[Replica]:
+    """Una Replica por URL, con su engine sync (chequeos) y, si hay, el async."""
+    return [
+        Replica(
+            name=f"replica-{position}",
+            engine=replica_engine,
+            session_factory=sessionmaker(autocommit=False, autoflush=False, bind=replica_engine),
+            async_session_factory=(
+                async_sessionmaker(async_replica_engines[position], autoflush=False, expire_on_commit=False)
+                if async_replica_engines
+                else None
+            ),
+        )
+        for position, replica_engine in enumerate(replica_engines)
+    ]
+
+
+def get_async_db_session() -> AsyncSession:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async DB stack is disabled (set DB_ASYNC=true)")
+    return AsyncSessionLocal()
+
+
 def init_db() -> None:
     """
-    Crea las tablas en la base de datos (solo para dev; en prod usar migraciones).
+    Aplica las migraciones de esquema pendientes (tablas e índices).
     """
-    # Asegúrate de que los modelos están importados antes de crear las tablas
-    import src.infrastructure.db.models  # noqa: F401
+    from src.infrastructure.db.migrations import migrate
 
-    Base.metadata.create_all(bind=engine)
+    migrate(engine)
 
@@ -0,0 +1,85 @@
+"""
+Geohash: codificación de coordenadas y celdas que cubren un rectángulo.
+
+Cada ride guarda la celda geohash de su origen y destino (precisión fija) en
+una columna con índice B-tree. Un área se busca por igualdad contra la lista de
+celdas que la cubren: los planners estiman bien un IN sobre un índice (filas
+por valor), cosa que no pasa con rangos de prefijo en SQLite.
+"""
+import math
+from typing import List, Optional
+
+from src.domain.geo import BoundingBox
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# ~1.2 km x 0.6 km; el filtro fino va por latitud/longitud
+STORED_PRECISION = 6
+# ~ un radio de 3 km. Un área más grande no es selectiva: conviene más recorrer
+# el índice por fecha y cortar con el LIMIT que juntar y ordenar sus celdas
+MAX_CELLS = 64
+
+
+def encode(lat: float, lng: float, precision: int = STORED_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # los bits pares son de longitud
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """Alto y ancho en grados de una celda de la precisión dada."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2**lat_bits, 360.0 / 2**lng_bits
+
+
+def _steps(low: float, high: float, size: float, origin: float) -> range:
+    first = math.floor((low - origin) / size)
+    last = math.floor((high - origin) / size)
+    return range(first, last + 1)
+
+
+def _cell_count(box: BoundingBox, precision: int) -> int:
+    height, width = cell_size(precision)
+    return len(_steps(box.min_lat, box.max_lat, height, -90.0)) * len(
+        _steps(box.min_lng, box.max_lng, width, -180.0)
+    )
+
+
+def _cells(box: BoundingBox, precision: int) -> List[str]:
+    height, width = cell_size(precision)
+    cells = set()
+    for i in _steps(box.min_lat, box.max_lat, height, -90.0):
+        lat = min(-90.0 + (i + 0.5) * height, 90.0)
+        for j in _steps(box.min_lng, box.max_lng, width, -180.0):
+            lng = min(-180.0 + (j + 0.5) * width, 180.0)
+            cells.add(encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def covering_cells(box: BoundingBox, max_cells: int = MAX_CELLS) -> Optional[List[str]]:
+    """Celdas guardadas que cubren el rectángulo, o None si son más de `max_cells`."""
+    if _cell_count(box, STORED_PRECISION) > max_cells:
+        return None
+    return _cells(box, STORED_PRECISION)
+
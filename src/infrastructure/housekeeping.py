@@ -0,0 +1,137 @@
+"""
+Housekeeping de rides en segundo plano.
+
+En cada ciclo (al arrancar y luego cada `interval_seconds`):
+
+- vence los rides OPEN/FULL cuya salida pasó hace más de `expire_grace_seconds`:
+  pasan a CANCELLED con su evento ride.expired (COMPLETED queda para los que
+  el driver completó);
+- archiva los COMPLETED/CANCELLED que salieron hace más de
+  `archive_after_seconds` (0 no archiva): el ride y sus filas de
+  ride_passengers pasan a rides_archive / ride_passengers_archive y dejan de
+  pesar en las tablas e índices que recorren los listados;
+- borra las claves de Idempotency-Key vencidas, si se le pasa `purge_idempotency_keys`.
+
+Todo va en lotes de `batch_size` rides, cada uno en su propia transacción
+corta y con `batch_pause_seconds` entre lotes: los locks de fila duran un lote
+y los requests se intercalan entre lotes en vez de esperar una purga entera.
+Un ciclo hace como mucho `max_batches` lotes por tarea; lo que quede sigue en
+el próximo. En PostgreSQL los lotes saltan (SKIP LOCKED) las filas que un
+request tiene tomadas, así que varias réplicas de la app pueden correrlo a la
+vez sin esperarse.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.application.use_cases.archive_rides import ArchiveRidesUseCase
+from src.application.use_cases.expire_rides import ExpireRidesUseCase
+from src.domain.clock import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class HousekeepingScheduler:
+    def __init__(
+        self,
+        unit_of_work: Callable[[], AbstractContextManager[UnitOfWorkPort]],
+        interval_seconds: float = 300.0,
+        expire_grace_seconds: float = 3600.0,
+        archive_after_seconds: float = 30 * 86400.0,
+        batch_size: int = 500,
+        batch_pause_seconds: float = 0.05,
+        max_batches: int = 200,
+        purge_idempotency_keys: Optional[Callable[[datetime, int], int]] = None,
+    ) -> None:
+        self._unit_of_work = unit_of_work
+        self._purge_idempotency_keys = purge_idempotency_keys
+        self._interval_seconds = interval_seconds
+        self._expire_grace = timedelta(seconds=expire_grace_seconds)
+        self._archive_after = (
+            timedelta(seconds=archive_after_seconds) if archive_after_seconds > 0 else None
+        )
+        self._batch_size = batch_size
+        self._batch_pause_seconds = batch_pause_seconds
+        self._max_batches = max_batches
+        self._counters: Counter[str] = Counter()
+        self._last_run: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _drain(self, batch: Callable[[], int]) -> int:
+        total = 0
+        for _ in range(self._max_batches):
+            done = batch()
+            total += done
+            # Un lote incompleto: no queda nada (o solo filas tomadas por otros)
+            if done < self._batch_size or self._stopped.wait(self._batch_pause_seconds):
+                break
+        return total
+
+    def _drain_rides(self, step: Callable[[UnitOfWorkPort], int]) -> int:
+        def batch() -> int:
+            with self._unit_of_work() as uow:
+                return step(uow)
+
+        return self._drain(batch)
+
+    def run_once(self, now: Optional[datetime] = None) -> dict:
+        """Un ciclo completo; devuelve cuántos rides venció y archivó y cuántas claves purgó."""
+        now = now or utcnow()
+        started = time.perf_counter()
+        expired = self._drain_rides(
+            lambda uow: ExpireRidesUseCase(uow).execute(now, self._expire_grace, self._batch_size)
+        )
+        archived = 0
+        if self._archive_after is not None and not self._stopped.is_set():
+            archived = self._drain_rides(
+                lambda uow: ArchiveRidesUseCase(uow).execute(now, self._archive_after, self._batch_size)
+            )
+        purged_keys = 0
+        if self._purge_idempotency_keys is not None and not self._stopped.is_set():
+            purged_keys = self._drain(lambda: self._purge_idempotency_keys(now, self._batch_size))
+        result = {
+            "expired": expired,
+            "archived": archived,
+            "purged_idempotency_keys": purged_keys,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        with self._lock:
+            self._counters.update(
+                runs=1, expired=expired, archived=archived, purged_idempotency_keys=purged_keys
+            )
+            self._last_run = {"at": now.isoformat(), **result}
+        if expired or archived or purged_keys:
+            logger.info("Housekeeping run", extra=result)
+        return result
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                with self._lock:
+                    self._counters["failures"] += 1
+                logger.exception("Housekeeping run failed; retrying next cycle")
+            if self._stopped.wait(self._interval_seconds):
+                return
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="housekeeping", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "last_run": self._last_run}
@@ -0,0 +1,462 @@
+"""
+Idempotency-Key: respuestas guardadas por (usuario, clave) para repetir reintentos.
+
+El primer request con una clave la reserva en `idempotency_keys` (una fila sin
+status_code), ejecuta el caso de uso y guarda el status y el cuerpo de la
+respuesta. Un reintento con la misma clave y el mismo request recibe esa
+respuesta sin volver a ejecutar nada; con otro request, un error.
+
+Las respuestas guardadas también quedan en una caché TTL en proceso (son
+inmutables). Los duplicados concurrentes dentro del proceso esperan al request
+en curso en vez de ir a la base; los de otra réplica encuentran la fila
+reservada y reciben "en curso" hasta que termine.
+
+Si la ruta sabe armar su respuesta a partir del ride confirmado (`committed`),
+la unidad de trabajo de SQLAlchemy la guarda en la misma transacción que el
+cambio (`completion_stmt`): una reserva que sigue sin status_code pasado
+`lock_seconds` es de un request que no confirmó nada, y un reintento puede
+volver a ejecutar sin duplicar el ride. Las demás respuestas (los 4xx, que no
+confirman nada) se guardan en una transacción propia. Los errores 5xx y las
+excepciones no se guardan (se libera la clave para reintentar), salvo que la
+respuesta ya haya quedado confirmada con el cambio.
+
+Las claves vencidas (más viejas que `ttl_seconds`) se reusan al repetirlas y el
+housekeeping borra el resto por lotes (`IdempotencyStore.purge_expired`).
+"""
+import asyncio
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple, Union
+
+from sqlalchemy import Update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.domain.clock import utcnow
+from src.domain.entities import Ride
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.repositories.ride_queries import (
+    complete_idempotency_key_stmt,
+    delete_idempotency_key_stmt,
+    get_idempotency_key_stmt,
+    insert_idempotency_key_stmt,
+    purge_idempotency_keys_stmt,
+    take_over_idempotency_key_stmt,
+)
+
+logger = logging.getLogger(__name__)
+
+# Intentos de reservar si la fila desaparece o cambia entre el INSERT y la lectura
+_CLAIM_ATTEMPTS = 3
+
+_TAKE_OVER = object()
+
+
+class IdempotencyKeyReusedError(Exception):
+    pass
+
+
+class IdempotencyInProgressError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class IdempotentResponse:
+    status_code: int
+    body: bytes
+    request_hash: str
+
+
+# Respuesta de un request idempotente armada desde el ride que confirmó
+CommittedResponse = Callable[[Ride], Tuple[int, bytes]]
+
+
+@dataclass
+class _Execution:
+    scope: str
+    key: str
+    committed: CommittedResponse
+    stored: bool = False
+
+
+# La clave del request que está ejecutando el guard en este contexto (el hilo
+# del threadpool o la tarea del event loop), para su unidad de trabajo
+_execution: ContextVar[Optional[_Execution]] = ContextVar("idempotent_execution", default=None)
+
+
+def completion_stmt(ride: Ride) -> Optional[Update]:
+    """
+    Para la unidad de trabajo, antes de confirmar `ride`: el UPDATE que guarda la
+    respuesta del request idempotente en curso, o None si no hay ninguno.
+    """
+    execution = _execution.get()
+    if execution is None or execution.stored:
+        return None
+    status_code, body = execution.committed(ride)
+    return complete_idempotency_key_stmt(execution.scope, execution.key, status_code, body)
+
+
+def completion_committed() -> None:
+    """La unidad de trabajo confirmó el UPDATE de `completion_stmt`."""
+    execution = _execution.get()
+    if execution is not None:
+        execution.stored = True
+
+
+def _resolve(row, request_hash: str, now: datetime, ttl_seconds: float, lock_seconds: float):
+    """Con la clave ya guardada: la respuesta a repetir, o _TAKE_OVER si se puede reusar."""
+    age = (now - row.created_at).total_seconds()
+    if age >= ttl_seconds:
+        return _TAKE_OVER
+    if row.request_hash != request_hash:
+        raise IdempotencyKeyReusedError("Idempotency-Key was already used with a different request")
+    if row.status_code is not None:
+        return IdempotentResponse(row.status_code, row.body, row.request_hash)
+    if age >= lock_seconds:
+        # Reservada por un request que nunca terminó (proceso caído)
+        return _TAKE_OVER
+    raise IdempotencyInProgressError("A request with this Idempotency-Key is in progress")
+
+
+def _replay(response: IdempotentResponse, request_hash: str) -> IdempotentResponse:
+    if response.request_hash != request_hash:
+        raise IdempotencyKeyReusedError("Idempotency-Key was already used with a different request")
+    return response
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: float = 86_400,
+        lock_seconds: float = 60,
+    ) -> None:
+        self._session_factory = session_factory
+        self._ttl_seconds = ttl_seconds
+        self._lock_seconds = lock_seconds
+
+    def claim(self, scope: str, key: str, request_hash: str) -> Optional[IdempotentResponse]:
+        """None si este request queda a cargo de ejecutar; si no, la respuesta guardada."""
+        for _ in range(_CLAIM_ATTEMPTS):
+            now = utcnow()
+            with self._session_factory() as session:
+                try:
+                    with session.begin():
+                        session.execute(insert_idempotency_key_stmt(scope, key, request_hash, now))
+                    return None
+                except IntegrityError:
+                    pass
+                with session.begin():
+                    row = session.execute(get_idempotency_key_stmt(scope, key)).one_or_none()
+                    if row is None:
+                        continue
+                    outcome = _resolve(row, request_hash, now, self._ttl_seconds, self._lock_seconds)
+                    if outcome is not _TAKE_OVER:
+                        return outcome
+                    taken = session.execute(
+                        take_over_idempotency_key_stmt(scope, key, request_hash, row.created_at, now)
+                    ).rowcount
+                    if taken:
+                        return None
+        raise IdempotencyInProgressError("A request with this Idempotency-Key is in progress")
+
+    def complete(self, scope: str, key: str, status_code: int, body: bytes) -> None:
+        with self._session_factory() as session, session.begin():
+            session.execute(complete_idempotency_key_stmt(scope, key, status_code, body))
+
+    def release(self, scope: str, key: str) -> None:
+        with self._session_factory() as session, session.begin():
+            session.execute(delete_idempotency_key_stmt(scope, key))
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        """Borra un lote de claves vencidas (lo corre el housekeeping); cuántas borró."""
+        created_before = now - timedelta(seconds=self._ttl_seconds)
+        with self._session_factory() as session, session.begin():
+            return session.execute(purge_idempotency_keys_stmt(created_before, limit)).rowcount
+
+
+class AsyncIdempotencyStore:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        ttl_seconds: float = 86_400,
+        lock_seconds: float = 60,
+    ) -> None:
+        self._session_factory = session_factory
+        self._ttl_seconds = ttl_seconds
+        self._lock_seconds = lock_seconds
+
+    async def claim(self, scope: str, key: str, request_hash: str) -> Optional[IdempotentResponse]:
+        for _ in range(_CLAIM_ATTEMPTS):
+            now = utcnow()
+            async with self._session_factory() as session:
+                try:
+                    async with session.begin():
+                        await session.execute(
+                            insert_idempotency_key_stmt(scope, key, request_hash, now)
+                        )
+                    return None
+                except IntegrityError:
+                    pass
+                async with session.begin():
+                    row = (await session.execute(get_idempotency_key_stmt(scope, key))).one_or_none()
+                    if row is None:
+                        continue
+                    outcome = _resolve(row, request_hash, now, self._ttl_seconds, self._lock_seconds)
+                    if outcome is not _TAKE_OVER:
+                        return outcome
+                    taken = (
+                        await session.execute(
+                            take_over_idempotency_key_stmt(scope, key, request_hash, row.created_at, now)
+                        )
+                    ).rowcount
+                    if taken:
+                        return None
+        raise IdempotencyInProgressError("A request with this Idempotency-Key is in progress")
+
+    async def complete(self, scope: str, key: str, status_code: int, body: bytes) -> None:
+        async with self._session_factory() as session, session.begin():
+            await session.execute(complete_idempotency_key_stmt(scope, key, status_code, body))
+
+    async def release(self, scope: str, key: str) -> None:
+        async with self._session_factory() as session, session.begin():
+            await session.execute(delete_idempotency_key_stmt(scope, key))
+
+
+@dataclass
+class _KeyRow:
+    request_hash: str
+    status_code: Optional[int]
+    body: Optional[bytes]
+    created_at: datetime
+
+
+class InMemoryIdempotencyStore:
+    """
+    Las claves en un dict del proceso (REPOSITORY_BACKEND=memory), sin tabla.
+
+    Solo coordina requests de este proceso. El dict mantiene el orden de
+    reserva, así que las claves vencidas se purgan desde el principio.
+    """
+
+    def __init__(self, ttl_seconds: float = 86_400, lock_seconds: float = 60) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._lock_seconds = lock_seconds
+        self._rows: Dict[Tuple[str, str], _KeyRow] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, scope: str, key: str, request_hash: str) -> Optional[IdempotentResponse]:
+        now = utcnow()
+        with self._lock:
+            self._purge(now)
+            row = self._rows.get((scope, key))
+            if row is not None:
+                outcome = _resolve(row, request_hash, now, self._ttl_seconds, self._lock_seconds)
+                if outcome is not _TAKE_OVER:
+                    return outcome
+                del self._rows[(scope, key)]
+            self._rows[(scope, key)] = _KeyRow(request_hash, None, None, now)
+            return None
+
+    def complete(self, scope: str, key: str, status_code: int, body: bytes) -> None:
+        with self._lock:
+            row = self._rows.get((scope, key))
+            if row is not None:
+                row.status_code, row.body = status_code, body
+
+    def release(self, scope: str, key: str) -> None:
+        with self._lock:
+            self._rows.pop((scope, key), None)
+
+    def _purge(self, now: datetime) -> None:
+        while self._rows:
+            scoped_key, row = next(iter(self._rows.items()))
+            if (now - row.created_at).total_seconds() < self._ttl_seconds:
+                return
+            del self._rows[scoped_key]
+
+
+class AsyncInMemoryIdempotencyStore:
+    """InMemoryIdempotencyStore para AsyncIdempotencyGuard: no hay I/O que esperar."""
+
+    def __init__(self, store: InMemoryIdempotencyStore) -> None:
+        self._store = store
+
+    async def claim(self, scope: str, key: str, request_hash: str) -> Optional[IdempotentResponse]:
+        return self._store.claim(scope, key, request_hash)
+
+    async def complete(self, scope: str, key: str, status_code: int, body: bytes) -> None:
+        self._store.complete(scope, key, status_code, body)
+
+    async def release(self, scope: str, key: str) -> None:
+        self._store.release(scope, key)
+
+
+class IdempotencyGuard:
+    """Caché y coalescencia en proceso sobre IdempotencyStore (rutas sync, threadpool)."""
+
+    def __init__(
+        self,
+        store: Union[IdempotencyStore, InMemoryIdempotencyStore],
+        cache: TTLCache[IdempotentResponse],
+        wait_seconds: float = 10,
+    ) -> None:
+        self._store = store
+        self.cache = cache
+        self._wait_seconds = wait_seconds
+        self._in_flight: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        scope: str,
+        key: str,
+        request_hash: str,
+        execute: Callable[[], Tuple[int, bytes]],
+        committed: Optional[CommittedResponse] = None,
+    ) -> Tuple[IdempotentResponse, bool]:
+        """Devuelve (respuesta, repetida); `execute` solo corre si nadie lo hizo antes."""
+        cache_key = (scope, key)
+        while True:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return _replay(cached, request_hash), True
+            with self._lock:
+                in_flight = self._in_flight.get(cache_key)
+                if in_flight is None:
+                    in_flight = self._in_flight[cache_key] = threading.Event()
+                    break
+            # Duplicado concurrente: espera al que está en curso y vuelve a mirar
+            # la caché (o toma el relevo si aquel falló)
+            if not in_flight.wait(self._wait_seconds):
+                raise IdempotencyInProgressError("A request with this Idempotency-Key is in progress")
+
+        try:
+            stored = self._store.claim(scope, key, request_hash)
+            if stored is not None:
+                self.cache.set(cache_key, stored)
+                return stored, True
+            return self._execute(scope, key, request_hash, execute, committed), False
+        finally:
+            with self._lock:
+                del self._in_flight[cache_key]
+            in_flight.set()
+
+    def _execute(
+        self,
+        scope: str,
+        key: str,
+        request_hash: str,
+        execute: Callable[[], Tuple[int, bytes]],
+        committed: Optional[CommittedResponse],
+    ) -> IdempotentResponse:
+        execution = _Execution(scope, key, committed) if committed is not None else None
+        token = _execution.set(execution)
+        try:
+            status_code, body = execute()
+        except BaseException:
+            if execution is None or not execution.stored:
+                self._store.release(scope, key)
+            raise
+        finally:
+            _execution.reset(token)
+        response = IdempotentResponse(status_code, body, request_hash)
+        if status_code >= 500:
+            self._store.release(scope, key)
+            return response
+        if execution is not None and execution.stored:
+            # Ya quedó guardada en la transacción del caso de uso
+            self.cache.set((scope, key), response)
+            return response
+        try:
+            self._store.complete(scope, key, status_code, body)
+        except Exception:
+            # El caso de uso ya confirmó: se responde igual y la caché cubre los
+            # reintentos a este proceso
+            logger.exception("Could not store the idempotent response")
+        self.cache.set((scope, key), response)
+        return response
+
+
+class AsyncIdempotencyGuard:
+    """Como IdempotencyGuard, para el stack asyncio (un solo event loop)."""
+
+    def __init__(
+        self,
+        store: Union[AsyncIdempotencyStore, AsyncInMemoryIdempotencyStore],
+        cache: TTLCache[IdempotentResponse],
+        wait_seconds: float = 10,
+    ) -> None:
+        self._store = store
+        self.cache = cache
+        self._wait_seconds = wait_seconds
+        self._in_flight: Dict[Hashable, asyncio.Event] = {}
+
+    async def run(
+        self,
+        scope: str,
+        key: str,
+        request_hash: str,
+        execute: Callable[[], Awaitable[Tuple[int, bytes]]],
+        committed: Optional[CommittedResponse] = None,
+    ) -> Tuple[IdempotentResponse, bool]:
+        cache_key = (scope, key)
+        while True:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return _replay(cached, request_hash), True
+            in_flight = self._in_flight.get(cache_key)
+            if in_flight is None:
+                in_flight = self._in_flight[cache_key] = asyncio.Event()
+                break
+            try:
+                await asyncio.wait_for(in_flight.wait(), self._wait_seconds)
+            except asyncio.TimeoutError:
+                raise IdempotencyInProgressError("A request with this Idempotency-Key is in progress")
+
+        try:
+            stored = await self._store.claim(scope, key, request_hash)
+            if stored is not None:
+                self.cache.set(cache_key, stored)
+                return stored, True
+            return await self._execute(scope, key, request_hash, execute, committed), False
+        finally:
+            del self._in_flight[cache_key]
+            in_flight.set()
+
+    async def _execute(
+        self,
+        scope: str,
+        key: str,
+        request_hash: str,
+        execute: Callable[[], Awaitable[Tuple[int, bytes]]],
+        committed: Optional[CommittedResponse],
+    ) -> IdempotentResponse:
+        execution = _Execution(scope, key, committed) if committed is not None else None
+        token = _execution.set(execution)
+        try:
+            status_code, body = await execute()
+        except BaseException:
+            if execution is None or not execution.stored:
+                await self._store.release(scope, key)
+            raise
+        finally:
+            _execution.reset(token)
+        response = IdempotentResponse(status_code, body, request_hash)
+        if status_code >= 500:
+            await self._store.release(scope, key)
+            return response
+        if execution is not None and execution.stored:
+            self.cache.set((scope, key), response)
+            return response
+        try:
+            await self._store.complete(scope, key, status_code, body)
+        except Exception:
+            logger.exception("Could not store the idempotent response")
+        self.cache.set((scope, key), response)
+        return response
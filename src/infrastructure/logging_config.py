@@ -0,0 +1,79 @@
+"""
+Logging estructurado y no bloqueante.
+
+Los handlers de los requests solo encolan el registro (`QueueHandler`); un hilo
+en segundo plano (`QueueListener`) lo formatea como JSON y lo escribe en stdout.
+La cola es acotada: si se llena, el registro se descarta y se cuenta, en vez de
+frenar el request. El nivel sale de `Settings.DEBUG` (DEBUG o INFO), así que los
+`logger.debug(...)` del camino caliente no cuestan nada en producción.
+"""
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Atributos propios de LogRecord; el resto viene de `extra=` y va al JSON
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items() if key not in _RESERVED
+        )
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que descarta (y cuenta) en vez de bloquear con la cola llena."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def configure_logging(debug: bool, queue_size: int = 10_000) -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=queue_size)
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter())
+    _listener = QueueListener(log_queue, writer, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [DroppingQueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+    # DEBUG solo para el código de la app, no para librerías (pool, asyncio...)
+    logging.getLogger("src").setLevel(logging.DEBUG if debug else logging.INFO)
+    # uvicorn trae sus propios handlers; los encaminamos por la misma cola
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+
+def shutdown_logging() -> None:
+    """Vacía la cola y detiene el hilo escritor."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
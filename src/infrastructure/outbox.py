@@ -0,0 +1,141 @@
+"""
+Relay del outbox transaccional de eventos de rides (tabla `ride_outbox`).
+
+La unidad de trabajo escribe los eventos en la misma transacción que el
+cambio; este relay los lee en lotes ordenados por id, los entrega al sink y
+los borra en una sola transacción. Si el sink falla o el proceso cae antes del
+commit, las filas siguen ahí y el lote se reintenta: la entrega es al menos una
+vez y los consumidores deduplican por `id`.
+
+Con varias réplicas cada una corre su relay: `FOR UPDATE SKIP LOCKED` reparte
+los lotes sin que se esperen (el orden global entre lotes deja de ser
+estricto). Los locks se mantienen mientras el sink entrega el lote.
+
+El relay se despierta con `notify()` cuando este proceso confirma eventos,
+espera `linger_seconds` para juntar un lote más lleno y drena hasta vaciar; sin
+avisos, sondea cada `poll_seconds` (eventos de otras réplicas o reintentos).
+"""
+import json
+import logging
+import os
+import threading
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.application.dto import OutboxMessage
+from src.application.ports.outbox_sink_port import OutboxSinkPort
+from src.infrastructure.repositories.ride_queries import (
+    claim_outbox_batch_stmt,
+    delete_outbox_stmt,
+    to_outbox_message,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryOutboxSink(OutboxSinkPort):
+    """Acumula los mensajes en memoria (desarrollo y benchmarks)."""
+
+    def __init__(self) -> None:
+        self.messages: List[OutboxMessage] = []
+        self._lock = threading.Lock()
+
+    def send(self, messages: List[OutboxMessage]) -> None:
+        with self._lock:
+            self.messages.extend(messages)
+
+
+class JsonLinesOutboxSink(OutboxSinkPort):
+    """Agrega una línea JSON por evento a un archivo, con fsync por lote."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    def send(self, messages: List[OutboxMessage]) -> None:
+        # El payload ya es JSON: se incrusta sin volver a parsearlo
+        lines = "".join(
+            f'{{"id": {m.id}, "type": {json.dumps(m.event_type)}, "ride_id": {m.ride_id}, '
+            f'"created_at": "{m.created_at.isoformat()}", "ride": {m.payload}}}\n'
+            for m in messages
+        )
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def build_outbox_sink(kind: str, path: str) -> OutboxSinkPort:
+    if kind == "memory":
+        return InMemoryOutboxSink()
+    if kind == "file":
+        return JsonLinesOutboxSink(path)
+    raise ValueError(f"Unknown outbox sink: {kind!r} (expected 'file' or 'memory')")
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        sink: OutboxSinkPort,
+        batch_size: int = 100,
+        linger_seconds: float = 0.2,
+        poll_seconds: float = 5.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self.sink = sink
+        self._batch_size = batch_size
+        self._linger_seconds = linger_seconds
+        self._poll_seconds = poll_seconds
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self) -> None:
+        """Avisa que hay eventos nuevos confirmados; no bloquea."""
+        self._wakeup.set()
+
+    def relay_batch(self) -> int:
+        """Entrega y borra un lote; devuelve cuántos eventos entregó."""
+        with self._session_factory() as session, session.begin():
+            rows = session.scalars(claim_outbox_batch_stmt(self._batch_size)).all()
+            if not rows:
+                return 0
+            messages = [to_outbox_message(row) for row in rows]
+            self.sink.send(messages)
+            session.execute(delete_outbox_stmt([m.id for m in messages]))
+        return len(messages)
+
+    def drain(self) -> int:
+        total = 0
+        while True:
+            relayed = self.relay_batch()
+            total += relayed
+            if relayed < self._batch_size:
+                return total
+
+    def _run(self) -> None:
+        # Al detenerse hace un último drenado: lo confirmado durante el linger
+        # sale antes del apagado en vez de esperar al próximo arranque
+        while True:
+            woken = self._wakeup.wait(self._poll_seconds)
+            if woken and self._linger_seconds > 0:
+                self._stopped.wait(self._linger_seconds)
+            self._wakeup.clear()
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Outbox relay failed; the batch will be retried")
+                self._stopped.wait(self._poll_seconds)
+            if self._stopped.is_set():
+                return
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
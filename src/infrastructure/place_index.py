@@ -0,0 +1,275 @@
+"""
+Índice en proceso de nombres de lugar (orígenes y destinos) para autocompletar.
+
+Los nombres se normalizan (minúsculas, sin tildes, espacios colapsados) y se
+indexan por palabra: el vocabulario se busca por prefijo con bisect y por
+trigramas al estilo de pg_trgm (errores de tipeo). Cada lugar lleva la cuenta
+de rides OPEN que lo usan, para ordenar primero los más ofertados.
+
+Al arrancar se cargan todos los nombres de lugar de la base, de rides en
+cualquier estado: sin pg_trgm las búsquedas aproximadas de GET /rides se
+resuelven contra este índice, y un lugar que ya no tiene rides OPEN tiene que
+seguir encontrándose. Después crece al crear rides (`ride_opened`, después del
+commit) y un hilo en segundo plano lo recuenta contra la base (o el store en
+memoria) cada cierto tiempo: así recoge los rides que se llenaron o completaron
+y los creados por otras réplicas. Entre recuentos las cuentas son aproximadas.
+"""
+import bisect
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.application.dto import PlaceSuggestion
+from src.application.ports.place_index_port import PlaceIndexPort
+from src.domain.entities import Ride
+from src.infrastructure.repositories.ride_queries import open_place_counts_stmt, place_names_stmt
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# Similitud de trigramas entre palabras (como el umbral por defecto de
+# similarity() en pg_trgm)
+DEFAULT_SIMILARITY_THRESHOLD = 0.3
+
+# Resultados memorizados; se vacían con cualquier cambio del índice
+_MAX_MEMO_ENTRIES = 4096
+
+def normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(word: str) -> Set[str]:
+    # Como pg_trgm: la palabra con dos espacios delante y uno detrás
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class _Place:
+    key: str
+    # Variantes tal como están en la base ("UPC Monterrico", "upc monterrico")
+    variants: Counter = field(default_factory=Counter)
+
+    @property
+    def name(self) -> str:
+        return max(self.variants, key=self.variants.__getitem__)
+
+
+class TrigramPlaceIndex(PlaceIndexPort):
+    """
+    Cada término de la consulta se busca en el vocabulario de palabras (por
+    prefijo y, si hace falta, por trigramas) y los lugares son la intersección
+    de los conjuntos de cada término. El vocabulario es mucho más chico que la
+    lista de lugares, así que la parte difusa no crece con ella.
+    """
+
+    def __init__(self, similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> None:
+        self._threshold = similarity_threshold
+        self._places: Dict[str, _Place] = {}
+        # Rides OPEN por lugar, aparte para ordenar con dict.__getitem__ (en C)
+        self._open_rides: Dict[str, int] = {}
+        # Claves ordenadas: los prefijos del nombre completo son un rango contiguo
+        self._keys: List[str] = []
+        self._word_places: Dict[str, Set[str]] = {}
+        # Vocabulario ordenado: los prefijos son un rango contiguo
+        self._words: List[str] = []
+        self._word_grams: Dict[str, Set[str]] = {}
+        self._memo: Dict[Tuple[str, int], List[_Place]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def _add(self, name: str, open_rides: int) -> None:
+        key = normalize(name)
+        if not key:
+            return
+        place = self._places.get(key)
+        if place is None:
+            place = self._places[key] = _Place(key=key)
+            self._open_rides[key] = 0
+            bisect.insort(self._keys, key)
+            for word in set(_WORD.findall(key)):
+                places = self._word_places.get(word)
+                if places is None:
+                    places = self._word_places[word] = set()
+                    bisect.insort(self._words, word)
+                    for gram in trigrams(word):
+                        self._word_grams.setdefault(gram, set()).add(word)
+                places.add(key)
+        place.variants[name] += open_rides
+        self._open_rides[key] += open_rides
+        self._memo.clear()
+
+    def ride_opened(self, ride: Ride) -> None:
+        with self._lock:
+            self._add(ride.origin, 1)
+            self._add(ride.destination, 1)
+
+    def add_places(self, names: Iterable[str]) -> None:
+        """Agrega lugares sin rides OPEN (los de rides llenos, completados, etc.)."""
+        with self._lock:
+            for name in names:
+                self._add(name, 0)
+
+    def replace_counts(self, counts: Dict[str, int]) -> None:
+        """Fija las cuentas de rides OPEN; los lugares ya conocidos quedan en 0."""
+        with self._lock:
+            for place in self._places.values():
+                self._open_rides[place.key] = 0
+                for variant in place.variants:
+                    place.variants[variant] = 0
+            for name, open_rides in counts.items():
+                self._add(name, open_rides)
+            self._memo.clear()
+
+    @staticmethod
+    def _prefix_range(items: List[str], prefix: str) -> List[str]:
+        start = bisect.bisect_left(items, prefix)
+        return items[start:bisect.bisect_left(items, prefix + "\uffff", start)]
+
+    def _similar_words(self, term: str) -> List[str]:
+        grams = trigrams(term)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._word_grams.get(gram, ()))
+        # Jaccard, como similarity() de pg_trgm (trigrams(w) solo depende de len)
+        return [
+            word
+            for word, count in shared.items()
+            if count / (len(grams) + len(word) + 1 - count) >= self._threshold
+        ]
+
+    def _places_for(self, words: List[str]) -> Set[str]:
+        if not words:
+            return set()
+        return set().union(*(self._word_places[w] for w in words))
+
+    def _ranked(self, text: str, limit: int) -> List[_Place]:
+        query = normalize(text)
+        terms = _WORD.findall(query)
+        if not terms or limit <= 0:
+            return []
+        with self._lock:
+            memo_key = (query, limit)
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                return cached
+
+            # Prefijo del nombre completo > prefijo de palabras > difuso; dentro
+            # de cada nivel, más rides abiertos primero
+            by_open_rides = self._open_rides.__getitem__
+            full = self._prefix_range(self._keys, query)
+            ranked = heapq.nlargest(limit, full, key=by_open_rides)
+            if len(ranked) < limit:
+                # Cada término como prefijo de alguna palabra del lugar
+                per_term = [
+                    self._places_for(self._prefix_range(self._words, term))
+                    for term in terms
+                ]
+                prefixed = set.intersection(*per_term).difference(full)
+                ranked += heapq.nlargest(limit - len(ranked), prefixed, key=by_open_rides)
+            if not ranked:
+                # Sin coincidencias por prefijo, los términos pueden tener errores
+                # de tipeo: se amplía cada uno con las palabras parecidas
+                fuzzy = set.intersection(*(
+                    matched | self._places_for(self._similar_words(term))
+                    for term, matched in zip(terms, per_term)
+                ))
+                ranked = heapq.nlargest(limit, fuzzy, key=by_open_rides)
+
+            result = [self._places[k] for k in ranked]
+            if len(self._memo) >= _MAX_MEMO_ENTRIES:
+                self._memo.clear()
+            self._memo[memo_key] = result
+            return result
+
+    def suggest(self, text: str, limit: int) -> List[PlaceSuggestion]:
+        return [
+            PlaceSuggestion(name=place.name, open_rides=self._open_rides[place.key])
+            for place in self._ranked(text, limit)
+        ]
+
+    def matching_names(self, text: str, limit: int) -> List[str]:
+        """Todas las variantes guardadas de los mejores lugares (para un IN en SQL)."""
+        return [
+            variant
+            for place in self._ranked(text, limit)
+            for variant in place.variants
+        ]
+
+
+def sql_open_place_counts(session_factory: Callable[[], Session]) -> Callable[[], Dict[str, int]]:
+    """Recuento de rides OPEN por lugar contra la base, para PlaceIndexRefresher."""
+
+    def load() -> Dict[str, int]:
+        with session_factory() as session:
+            return dict(session.execute(open_place_counts_stmt()).tuples().all())
+
+    return load
+
+
+def sql_place_names(session_factory: Callable[[], Session]) -> Callable[[], List[str]]:
+    """Todos los nombres de lugar de la base, para la carga inicial de PlaceIndexRefresher."""
+
+    def load() -> List[str]:
+        with session_factory() as session:
+            return list(session.scalars(place_names_stmt()))
+
+    return load
+
+
+class PlaceIndexRefresher:
+    """
+    Carga los lugares al arrancar y recuenta periódicamente los rides OPEN por
+    lugar en un hilo aparte.
+    """
+
+    def __init__(
+        self,
+        index: TrigramPlaceIndex,
+        load_counts: Callable[[], Dict[str, int]],
+        refresh_seconds: float = 60.0,
+        load_names: Optional[Callable[[], Iterable[str]]] = None,
+    ) -> None:
+        self._index = index
+        self._load_counts = load_counts
+        self._load_names = load_names
+        self._refresh_seconds = refresh_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        self._index.replace_counts(self._load_counts())
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._refresh_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Place index refresh failed; keeping previous counts")
+
+    def start(self) -> None:
+        try:
+            if self._load_names is not None:
+                self._index.add_places(self._load_names())
+            self.refresh()
+        except Exception:
+            logger.exception("Initial place index load failed; retrying in background")
+        self._thread = threading.Thread(target=self._run, name="place-index-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
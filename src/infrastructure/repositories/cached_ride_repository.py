@@ -0,0 +1,351 @@
+"""
+Decorador de caché read-through para los listados de rides (`list_rides`).
+
+Los listados se sirven desde una LRU con TTL en proceso. Toda escritura que
+cambia un ride los invalida, pero recién cuando la unidad de trabajo confirma
+(`publish`); si hace rollback, la invalidación pendiente se descarta
+(`discard`). Los listados por pasajero y por driver, y las lecturas de un ride
+suelto, van siempre a la base.
+
+Dentro de una unidad de trabajo (`read_through=False`) las lecturas van siempre
+a la base: lo que decide una escritura no puede salir de una copia vencida. Con
+`fill=False` (lecturas de una réplica) se sirven los aciertos pero un fallo no
+se guarda: la réplica puede estar atrás de la última escritura confirmada.
+
+Los listados se invalidan por generación: la clave de cada listado incluye el
+token de generación vigente, y una escritura solo reemplaza ese token. Así no
+hay que recorrer ni borrar claves. Una escritura invalida todos los listados:
+cualquier búsqueda (por texto aproximado, área o estado) puede incluir el ride
+que cambió.
+"""
+import dataclasses
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Hashable
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from src.application.dto import RideManifest
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.domain.entities import Ride, RidePassenger, RideStatus
+from src.domain.geo import GeoArea
+from src.infrastructure.cache import TTLCache
+
+_LIST_GENERATION_KEY = ("rides", "list-generation")
+
+R = TypeVar("R", RideRepositoryPort, AsyncRideRepositoryPort)
+
+
+class RideCache:
+    """Claves, copias e invalidación; compartido por todos los requests del proceso."""
+
+    def __init__(self, backend: TTLCache[Any]) -> None:
+        self.backend = backend
+        self._counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        backend = self.backend.stats()
+        stats.update(evictions=backend.evictions, expirations=backend.expirations, size=backend.size)
+        return stats
+
+    @staticmethod
+    def _copy(ride: Ride) -> Ride:
+        # Los casos de uso mutan el ride; nunca entregamos la instancia cacheada
+        return dataclasses.replace(ride)
+
+    def _list_generation(self) -> str:
+        generation = self.backend.get(_LIST_GENERATION_KEY)
+        if generation is None:
+            # Si el token se perdió (TTL/LRU), uno nuevo deja huérfanos los listados viejos
+            generation = uuid.uuid4().hex
+            self.backend.set(_LIST_GENERATION_KEY, generation)
+        return generation
+
+    def list_key(self, **filters: Any) -> Hashable:
+        return ("rides", self._list_generation(), tuple(sorted(filters.items())))
+
+    def get_list(self, key: Hashable) -> Optional[List[Ride]]:
+        rides = self.backend.get(key)
+        if rides is None:
+            self._count("list_misses")
+            return None
+        self._count("list_hits")
+        return [self._copy(r) for r in rides]
+
+    def put_list(self, key: Hashable, rides: List[Ride]) -> None:
+        self.backend.set(key, [self._copy(r) for r in rides])
+
+    def invalidate_lists(self) -> None:
+        self._count("list_invalidations")
+        self.backend.set(_LIST_GENERATION_KEY, uuid.uuid4().hex)
+
+
+class _CachedRides(Generic[R]):
+    """
+    Lo común a las variantes sync y async: el listado cacheado y si la
+    transacción en curso cambió algún ride. Las subclases solo hacen la I/O.
+    """
+
+    def __init__(
+        self,
+        inner: R,
+        cache: RideCache,
+        read_through: bool = True,
+        fill: bool = True,
+    ) -> None:
+        self._inner = inner
+        self._cache = cache
+        self._read_through = read_through
+        self._fill = fill
+        self._changed = False
+
+    def _cached_list(self, filters: dict) -> Tuple[Optional[Hashable], Optional[List[Ride]]]:
+        """(clave, listado cacheado); sin clave, el listado no pasa por la caché."""
+        if not self._read_through:
+            return None, None
+        key = self._cache.list_key(**filters)
+        return key, self._cache.get_list(key)
+
+    def _remember_list(self, key: Optional[Hashable], rides: List[Ride]) -> None:
+        if key is not None and self._fill:
+            self._cache.put_list(key, rides)
+
+    def _ride_changed(self) -> None:
+        self._changed = True
+
+    def publish(self) -> None:
+        if self._changed:
+            self._cache.invalidate_lists()
+            self._changed = False
+
+    def discard(self) -> None:
+        self._changed = False
+
+
+class CachedRideRepository(_CachedRides[RideRepositoryPort], RideRepositoryPort):
+    def create_ride(self, ride: Ride) -> Ride:
+        created = self._inner.create_ride(ride)
+        self._ride_changed()
+        return created
+
+    def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        created = self._inner.create_rides(rides)
+        if created:
+            self._ride_changed()
+        return created
+
+    def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        return self._inner.get_ride_by_id(ride_id)
+
+    def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        ride = self._inner.complete_ride(ride_id, driver_id, updated_at)
+        if ride is not None:
+            self._ride_changed()
+        return ride
+
+    def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        filters = dict(
+            origin=origin,
+            destination=destination,
+            origin_search=origin_search,
+            destination_search=destination_search,
+            status=status,
+            departure_from=departure_from,
+            departure_to=departure_to,
+            origin_area=origin_area,
+            destination_area=destination_area,
+            after=after,
+            limit=limit,
+        )
+        key, rides = self._cached_list(filters)
+        if rides is None:
+            rides = self._inner.list_rides(**filters)
+            self._remember_list(key, rides)
+        return rides
+
+    def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        added = self._inner.add_passenger(passenger)
+        self._ride_changed()
+        return added
+
+    def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        ride = self._inner.reserve_seat(passenger, rejoin)
+        if ride is not None:
+            self._ride_changed()
+        return ride
+
+    def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        ride = self._inner.release_seat(ride_id, passenger_id, left_at)
+        if ride is not None:
+            self._ride_changed()
+        return ride
+
+    def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        # Por usuario: no se cachea
+        return self._inner.list_passenger_rides(passenger_id, after=after, limit=limit)
+
+    def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        # Incluye pasajeros, que la caché no sigue: siempre va a la base
+        return self._inner.list_driver_rides(driver_id, after=after, limit=limit)
+
+    def get_passenger(self, ride_id: int, passenger_id: str) -> Optional[RidePassenger]:
+        return self._inner.get_passenger(ride_id, passenger_id)
+
+    def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        return self._inner.list_passengers(ride_id)
+
+    def expire_rides(
+        self, departed_before: datetime, updated_at: datetime, limit: int
+    ) -> List[Ride]:
+        expired = self._inner.expire_rides(departed_before, updated_at, limit)
+        if expired:
+            self._ride_changed()
+        return expired
+
+    def archive_rides(
+        self, departed_before: datetime, archived_at: datetime, limit: int
+    ) -> List[int]:
+        archived = self._inner.archive_rides(departed_before, archived_at, limit)
+        if archived:
+            self._ride_changed()
+        return archived
+
+
+class AsyncCachedRideRepository(
+    _CachedRides[AsyncRideRepositoryPort], AsyncRideRepositoryPort
+):
+    async def create_ride(self, ride: Ride) -> Ride:
+        created = await self._inner.create_ride(ride)
+        self._ride_changed()
+        return created
+
+    async def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        created = await self._inner.create_rides(rides)
+        if created:
+            self._ride_changed()
+        return created
+
+    async def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        return await self._inner.get_ride_by_id(ride_id)
+
+    async def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        ride = await self._inner.complete_ride(ride_id, driver_id, updated_at)
+        if ride is not None:
+            self._ride_changed()
+        return ride
+
+    async def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        filters = dict(
+            origin=origin,
+            destination=destination,
+            origin_search=origin_search,
+            destination_search=destination_search,
+            status=status,
+            departure_from=departure_from,
+            departure_to=departure_to,
+            origin_area=origin_area,
+            destination_area=destination_area,
+            after=after,
+            limit=limit,
+        )
+        key, rides = self._cached_list(filters)
+        if rides is None:
+            rides = await self._inner.list_rides(**filters)
+            self._remember_list(key, rides)
+        return rides
+
+    async def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        added = await self._inner.add_passenger(passenger)
+        self._ride_changed()
+        return added
+
+    async def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        ride = await self._inner.reserve_seat(passenger, rejoin)
+        if ride is not None:
+            self._ride_changed()
+        return ride
+
+    async def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        ride = await self._inner.release_seat(ride_id, passenger_id, left_at)
+        if ride is not None:
+            self._ride_changed()
+        return ride
+
+    async def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        # Por usuario: no se cachea
+        return await self._inner.list_passenger_rides(passenger_id, after=after, limit=limit)
+
+    async def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        # Incluye pasajeros, que la caché no sigue: siempre va a la base
+        return await self._inner.list_driver_rides(driver_id, after=after, limit=limit)
+
+    async def get_passenger(
+        self, ride_id: int, passenger_id: str
+    ) -> Optional[RidePassenger]:
+        return await self._inner.get_passenger(ride_id, passenger_id)
+
+    async def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        return await self._inner.list_passengers(ride_id)
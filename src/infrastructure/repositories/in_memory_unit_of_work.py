@@ -0,0 +1,81 @@
+"""
+Unidades de trabajo sobre el store en memoria (REPOSITORY_BACKEND=memory).
+
+Toman el lock del store al entrar y lo sueltan al salir: una transacción a la
+vez, como SERIALIZABLE. `rollback()` deshace los cambios anotados desde el
+último commit. Los eventos se publican después del commit como en las de
+SQLAlchemy; no hay outbox (no hay tabla donde insertarlos).
+"""
+from typing import Optional
+
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.ride_event_publisher_port import RideEventPublisherPort
+from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.infrastructure.repositories.ride_in_memory_repository import (
+    InMemoryRideStore,
+    RideInMemoryAsyncRepository,
+    RideInMemoryRepository,
+)
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import _PendingEvents
+
+
+class InMemoryUnitOfWork(_PendingEvents, UnitOfWorkPort):
+    def __init__(
+        self,
+        store: InMemoryRideStore,
+        events: Optional[RideEventPublisherPort] = None,
+    ) -> None:
+        super().__init__(events, None)
+        self._store = store
+        self.rides: RideRepositoryPort = RideInMemoryRepository(store)
+
+    def __enter__(self) -> "InMemoryUnitOfWork":
+        self._store.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._discard_events()
+        finally:
+            self._store.end()
+
+    def commit(self) -> None:
+        self._store.commit()
+        self._publish_events()
+
+    def rollback(self) -> None:
+        self._store.rollback()
+        self._discard_events()
+
+
+class InMemoryAsyncUnitOfWork(_PendingEvents, AsyncUnitOfWorkPort):
+    # Ninguna operación del store cede el event loop: el lock nunca se espera
+    # desde el loop mientras lo tiene otra corrutina
+    def __init__(
+        self,
+        store: InMemoryRideStore,
+        events: Optional[RideEventPublisherPort] = None,
+    ) -> None:
+        super().__init__(events, None)
+        self._store = store
+        self.rides: AsyncRideRepositoryPort = RideInMemoryAsyncRepository(store)
+
+    async def __aenter__(self) -> "InMemoryAsyncUnitOfWork":
+        self._store.begin()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._discard_events()
+        finally:
+            self._store.end()
+
+    async def commit(self) -> None:
+        self._store.commit()
+        self._publish_events()
+
+    async def rollback(self) -> None:
+        self._store.rollback()
+        self._discard_events()
@@ -0,0 +1,876 @@
+"""
+Repositorios de rides en memoria (REPOSITORY_BACKEND=memory), sync y async.
+
+Para tests y simulaciones sin base de datos: todos los requests del proceso
+comparten un `InMemoryRideStore`, con los mismos contratos que los
+repositorios SQLAlchemy (cursor keyset por (departure_time, id), reserva de
+asiento sin overbooking, una fila por ride y pasajero).
+
+Índices secundarios: listas ordenadas (en bloques) de claves (departure_time, id) para todos
+los rides y por origen, destino, estado, driver y celda de coordenadas (grilla
+de ~1 km), más los rides en los que cada pasajero sigue unido. `list_rides`
+elige la fuente más chica entre sus filtros, salta al cursor con bisect y se
+detiene al llenar la página, en vez de recorrer la tabla.
+
+Transacciones: la unidad de trabajo toma el lock (reentrante) del store durante
+todo su bloque, así que son serializables; cada cambio anota cómo deshacerse y
+el rollback los aplica en orden inverso. Fuera de una unidad de trabajo cada
+operación es atómica por sí sola. Las entidades se copian al entrar y al salir:
+lo que un caso de uso modifique de lo que leyó no llega al store.
+"""
+import bisect
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Callable, Hashable, Iterator
+from dataclasses import fields
+from datetime import datetime, timezone
+from itertools import chain, islice, product, takewhile
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.application.dto import RideManifest
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.domain.entities import PassengerStatus, Ride, RidePassenger, RideStatus
+from src.domain.geo import GeoArea, GeoRadius
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.infrastructure.place_index import TrigramPlaceIndex
+from src.infrastructure.repositories.ride_queries import PlaceSearch, place_search
+
+Key = Tuple[datetime, int]
+
+# Dialecto para place_search: sin pg_trgm, como SQLite
+_DIALECT = "memory"
+
+# Lado de la celda de la grilla de coordenadas, en grados (~1 km). Un filtro
+# por área usa la grilla solo si su bounding box cubre pocas celdas
+GRID_DEGREES = 0.01
+_MAX_GRID_CELLS = 400
+
+# Desde este tamaño, create_rides ordena el lote una vez y lo mezcla en cada
+# índice en vez de insertar las claves de a una
+_BULK_SORT_MIN = 32
+
+_ride_values = attrgetter(*(f.name for f in fields(Ride)))
+_passenger_values = attrgetter(*(f.name for f in fields(RidePassenger)))
+
+
+def _copy_ride(ride: Ride) -> Ride:
+    return Ride(*_ride_values(ride))
+
+
+def _copy_passenger(passenger: RidePassenger) -> RidePassenger:
+    return RidePassenger(*_passenger_values(passenger))
+
+
+class SortedKeys:
+    """
+    Claves ordenadas en bloques de hasta 2*CHUNK (como SortedList): insertar o
+    borrar mueve un bloque, no toda la lista. Con una lista plana, cada ride
+    que pasa de OPEN a FULL corría en memoria el índice entero de OPEN.
+    """
+
+    __slots__ = ("_chunks", "_maxes", "_len")
+
+    CHUNK = 512
+
+    def __init__(self, ordered: Iterable[Key] = ()) -> None:
+        keys = list(ordered)
+        self._chunks = [keys[i:i + self.CHUNK] for i in range(0, len(keys), self.CHUNK)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Key]:
+        return chain.from_iterable(self._chunks)
+
+    def add(self, key: Key) -> None:
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+        position = bisect.bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            position -= 1
+            self._chunks[position].append(key)
+            self._maxes[position] = key
+        else:
+            bisect.insort(self._chunks[position], key)
+        self._len += 1
+        chunk = self._chunks[position]
+        if len(chunk) > 2 * self.CHUNK:
+            half = chunk[self.CHUNK:]
+            del chunk[self.CHUNK:]
+            self._chunks.insert(position + 1, half)
+            self._maxes[position] = chunk[-1]
+            self._maxes.insert(position + 1, half[-1])
+
+    def discard(self, key: Key) -> None:
+        position = bisect.bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return
+        chunk = self._chunks[position]
+        index = bisect.bisect_left(chunk, key)
+        if chunk[index] != key:
+            return
+        del chunk[index]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[position]
+            del self._maxes[position]
+        elif index == len(chunk):
+            self._maxes[position] = chunk[-1]
+
+    def update(self, ordered: List[Key]) -> None:
+        """Agrega claves ya ordenadas; un lote grande se mezcla y se reparte de nuevo."""
+        if len(ordered) * 8 < self._len:
+            for key in ordered:
+                self.add(key)
+            return
+        SortedKeys.__init__(self, heapq.merge(self, ordered))
+
+    def after(self, bound: Optional[Key]) -> Iterator[Key]:
+        """Las claves estrictamente mayores que `bound` (todas si es None), en orden."""
+        if bound is None:
+            return iter(self)
+        position = bisect.bisect_right(self._maxes, bound)
+        if position == len(self._chunks):
+            return iter(())
+        chunk = self._chunks[position]
+        return chain(
+            islice(chunk, bisect.bisect_right(chunk, bound), None),
+            chain.from_iterable(self._chunks[position + 1:]),
+        )
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Como la columna DateTime (sin zona): una fecha con zona se guarda y se
+    # compara en UTC sin tzinfo; mezclar ambas en un índice lanza TypeError
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _key(ride: Ride) -> Key:
+    return (ride.departure_time, ride.id)  # type: ignore[return-value]
+
+
+def _cell(lat: Optional[float], lng: Optional[float]) -> Optional[Tuple[int, int]]:
+    if lat is None or lng is None:
+        return None
+    return (math.floor(lat / GRID_DEGREES), math.floor(lng / GRID_DEGREES))
+
+
+def _origin_cell(ride: Ride) -> Optional[Tuple[int, int]]:
+    return _cell(ride.origin_lat, ride.origin_lng)
+
+
+def _destination_cell(ride: Ride) -> Optional[Tuple[int, int]]:
+    return _cell(ride.destination_lat, ride.destination_lng)
+
+
+Index = Dict[Hashable, SortedKeys]
+
+
+# Los índices sin valor (None: ride sin coordenadas) no guardan la clave
+def _index_add(index: Index, value: Hashable, key: Key) -> None:
+    if value is not None:
+        keys = index.get(value)
+        if keys is None:
+            keys = index[value] = SortedKeys()
+        keys.add(key)
+
+
+def _index_remove(index: Index, value: Hashable, key: Key) -> None:
+    keys = index.get(value)
+    if keys is None:
+        return
+    keys.discard(key)
+    if not keys:
+        del index[value]
+
+
+def _in_area(lat: Optional[float], lng: Optional[float], area: GeoArea) -> bool:
+    if lat is None or lng is None:
+        return False
+    box = area.bounding_box()
+    if not (box.min_lat <= lat <= box.max_lat and box.min_lng <= lng <= box.max_lng):
+        return False
+    return not isinstance(area, GeoRadius) or area.contains(lat, lng)
+
+
+def _lower_bound(after: Optional[Key], departure_from: Optional[datetime]) -> Optional[Key]:
+    """La clave a partir de la cual (excluida) se recorre un índice."""
+    if departure_from is None:
+        return after
+    # Los ids empiezan en 1: (fecha, 0) queda antes de todos los de esa fecha
+    floor = (departure_from, 0)
+    return floor if after is None or after < floor else after
+
+
+def _place_matcher(search: Optional[PlaceSearch]) -> Optional[Callable[[str], bool]]:
+    if search is None:
+        return None
+    if search.names is not None:
+        return frozenset(search.names).__contains__
+    # Como el ILIKE 'texto%' de SQLite
+    prefix = search.text.lower()
+    return lambda value: value.lower().startswith(prefix)
+
+
+class InMemoryRideStore:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._undo: Optional[List[Callable[[], None]]] = None
+        self._rides: Dict[int, Ride] = {}
+        self._passengers: Dict[int, RidePassenger] = {}
+        self._next_ride_id = 1
+        self._next_passenger_id = 1
+
+        self._all = SortedKeys()
+        self._by_origin: Index = {}
+        self._by_destination: Index = {}
+        self._by_status: Index = {}
+        self._by_driver: Index = {}
+        self._by_origin_cell: Index = {}
+        self._by_destination_cell: Index = {}
+        # (índice, valor del ride en ese índice)
+        self._indexes: Tuple[Tuple[Index, Callable[[Ride], Hashable]], ...] = (
+            (self._by_origin, attrgetter("origin")),
+            (self._by_destination, attrgetter("destination")),
+            (self._by_status, attrgetter("status")),
+            (self._by_driver, attrgetter("driver_id")),
+            (self._by_origin_cell, _origin_cell),
+            (self._by_destination_cell, _destination_cell),
+        )
+        # ride_id -> passenger_id -> id de la fila (única por ride y pasajero)
+        self._ride_passengers: Dict[int, Dict[str, int]] = {}
+        # passenger_id -> claves de los rides en los que está JOINED
+        self._passenger_rides: Index = {}
+        # Lo que archivó el housekeeping, fuera de los índices (las tablas de archivo)
+        self._archived_rides: Dict[int, Ride] = {}
+        self._archived_passengers: Dict[int, RidePassenger] = {}
+
+    def __len__(self) -> int:
+        return len(self._rides)
+
+    # ---------- Transacciones ----------
+    def begin(self) -> None:
+        self._lock.acquire()
+        self._undo = []
+
+    def commit(self) -> None:
+        if self._undo is not None:
+            self._undo = []
+
+    def rollback(self) -> None:
+        undo, self._undo = self._undo, None
+        if undo is None:
+            return
+        # Sin log mientras se deshace: los pasos no se anotan a sí mismos
+        for step in reversed(undo):
+            step()
+        self._undo = []
+
+    def end(self) -> None:
+        try:
+            self.rollback()
+        finally:
+            self._undo = None
+            self._lock.release()
+
+    def _record(self, step: Callable[[], None]) -> None:
+        if self._undo is not None:
+            self._undo.append(step)
+
+    # ---------- Cambios (con el lock tomado) ----------
+    def _index_ride(self, ride: Ride) -> None:
+        key = _key(ride)
+        self._all.add(key)
+        for index, value_of in self._indexes:
+            _index_add(index, value_of(ride), key)
+
+    def _unindex_ride(self, ride: Ride) -> None:
+        key = _key(ride)
+        self._all.discard(key)
+        for index, value_of in self._indexes:
+            _index_remove(index, value_of(ride), key)
+
+    def _insert_ride(self, ride: Ride, index: bool = True) -> Ride:
+        stored = _copy_ride(ride)
+        stored.id = self._next_ride_id
+        stored.departure_time = _naive_utc(stored.departure_time)  # type: ignore[assignment]
+        self._next_ride_id += 1
+        self._rides[stored.id] = stored
+        # Anotado antes de indexar: si indexar falla a mitad, el rollback lo
+        # saca igual (quitar una clave que no está no hace nada)
+        self._record(lambda: self._delete_ride(stored.id))  # type: ignore[arg-type]
+        if index:
+            self._index_ride(stored)
+        return stored
+
+    def _index_rides(self, rides: List[Ride]) -> None:
+        """Indexa un lote: se ordena una vez y cada índice recibe sus claves ya ordenadas."""
+        ordered = sorted(rides, key=_key)
+        keys = [_key(ride) for ride in ordered]
+        self._all.update(keys)
+        for index, value_of in self._indexes:
+            grouped: Dict[Hashable, List[Key]] = defaultdict(list)
+            for value, key in zip(map(value_of, ordered), keys):
+                if value is not None:
+                    grouped[value].append(key)
+            for value, value_keys in grouped.items():
+                target = index.get(value)
+                if target is None:
+                    index[value] = SortedKeys(value_keys)
+                else:
+                    target.update(value_keys)
+
+    def _delete_ride(self, ride_id: int) -> None:
+        self._unindex_ride(self._rides.pop(ride_id))
+        self._ride_passengers.pop(ride_id, None)
+
+    def _replace_ride(self, ride: Ride) -> None:
+        old = self._rides[ride.id]  # type: ignore[index]
+        old_key, new_key = _key(old), _key(ride)
+        moved = old_key != new_key
+        # Solo se mueven las entradas cuyo valor cambió: una reserva de asiento
+        # no toca los índices salvo cuando el ride pasa a FULL
+        if moved:
+            self._unindex_ride(old)
+            self._index_ride(ride)
+            for passenger_id in self._joined_passenger_ids(ride.id):  # type: ignore[arg-type]
+                _index_remove(self._passenger_rides, passenger_id, old_key)
+                _index_add(self._passenger_rides, passenger_id, new_key)
+        else:
+            for index, value_of in self._indexes:
+                before, after = value_of(old), value_of(ride)
+                if before != after:
+                    _index_remove(index, before, old_key)
+                    _index_add(index, after, new_key)
+        self._rides[ride.id] = ride  # type: ignore[index]
+        self._record(lambda: self._replace_ride(old))
+
+    def _joined_passenger_ids(self, ride_id: int) -> List[str]:
+        return [
+            passenger_id
+            for passenger_id, row_id in self._ride_passengers.get(ride_id, {}).items()
+            if self._passengers[row_id].status == PassengerStatus.JOINED
+        ]
+
+    def _insert_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        ride = self._rides.get(passenger.ride_id)
+        if ride is None:
+            raise ValueError("Ride not found")
+        members = self._ride_passengers.setdefault(passenger.ride_id, {})
+        if passenger.passenger_id in members:
+            raise PassengerAlreadyJoinedError("Passenger already joined this ride")
+        stored = _copy_passenger(passenger)
+        stored.id = self._next_passenger_id
+        self._next_passenger_id += 1
+        self._passengers[stored.id] = stored
+        self._record(lambda: self._delete_passenger(stored.id))  # type: ignore[arg-type]
+        members[stored.passenger_id] = stored.id
+        if stored.status == PassengerStatus.JOINED:
+            _index_add(self._passenger_rides, stored.passenger_id, _key(ride))
+        return stored
+
+    def _delete_passenger(self, row_id: int) -> None:
+        stored = self._passengers.pop(row_id)
+        members = self._ride_passengers.get(stored.ride_id)
+        if members is not None:
+            members.pop(stored.passenger_id, None)
+        if stored.status == PassengerStatus.JOINED:
+            _index_remove(self._passenger_rides, stored.passenger_id, _key(self._rides[stored.ride_id]))
+
+    def _replace_passenger(self, passenger: RidePassenger) -> None:
+        old = self._passengers[passenger.id]  # type: ignore[index]
+        was_joined = old.status == PassengerStatus.JOINED
+        is_joined = passenger.status == PassengerStatus.JOINED
+        if was_joined != is_joined:
+            key = _key(self._rides[passenger.ride_id])
+            if is_joined:
+                _index_add(self._passenger_rides, passenger.passenger_id, key)
+            else:
+                _index_remove(self._passenger_rides, passenger.passenger_id, key)
+        self._passengers[passenger.id] = passenger  # type: ignore[index]
+        self._record(lambda: self._replace_passenger(old))
+
+    def _archive_ride(self, ride_id: int) -> None:
+        ride = self._rides[ride_id]
+        rows = [self._passengers[row_id] for row_id in self._ride_passengers.get(ride_id, {}).values()]
+        for row in rows:
+            self._delete_passenger(row.id)  # type: ignore[arg-type]
+            self._archived_passengers[row.id] = row  # type: ignore[index]
+        self._delete_ride(ride_id)
+        self._archived_rides[ride_id] = ride
+        self._record(lambda: self._unarchive_ride(ride, rows))
+
+    def _unarchive_ride(self, ride: Ride, rows: List[RidePassenger]) -> None:
+        del self._archived_rides[ride.id]  # type: ignore[arg-type]
+        self._rides[ride.id] = ride  # type: ignore[index]
+        self._index_ride(ride)
+        members = self._ride_passengers.setdefault(ride.id, {})  # type: ignore[arg-type]
+        for row in rows:
+            del self._archived_passengers[row.id]  # type: ignore[arg-type]
+            self._passengers[row.id] = row  # type: ignore[index]
+            members[row.passenger_id] = row.id  # type: ignore[assignment]
+            if row.status == PassengerStatus.JOINED:
+                _index_add(self._passenger_rides, row.passenger_id, _key(ride))
+
+    def _housekeeping_batch(
+        self, statuses: Tuple[RideStatus, ...], departed_before: datetime, limit: int
+    ) -> List[int]:
+        # Cada índice por estado ya está por fecha: se corta en la primera
+        # salida posterior al límite, y el lote se arma antes de modificar nada
+        bound = (_naive_utc(departed_before), 0)
+        merged = heapq.merge(*(self._by_status.get(status, ()) for status in statuses))
+        return [ride_id for _, ride_id in islice(takewhile(lambda key: key < bound, merged), limit)]
+
+    def _passenger_row(self, ride_id: int, passenger_id: str) -> Optional[RidePassenger]:
+        row_id = self._ride_passengers.get(ride_id, {}).get(passenger_id)
+        return self._passengers[row_id] if row_id is not None else None
+
+    def _page(self, keys: Optional[SortedKeys], after: Optional[Key], limit: Optional[int]) -> List[Ride]:
+        if keys is None:
+            return []
+        return [_copy_ride(self._rides[ride_id]) for _, ride_id in islice(keys.after(after), limit)]
+
+    def _area_lists(self, index: Index, area: GeoArea) -> Optional[List[SortedKeys]]:
+        """Listas de las celdas del bounding box del área; None si son demasiadas."""
+        box = area.bounding_box()
+        low = _cell(box.min_lat, box.min_lng)
+        high = _cell(box.max_lat, box.max_lng)
+        lat_cells = range(low[0], high[0] + 1)  # type: ignore[index]
+        lng_cells = range(low[1], high[1] + 1)  # type: ignore[index]
+        if len(lat_cells) * len(lng_cells) > _MAX_GRID_CELLS:
+            return None
+        return [index[cell] for cell in product(lat_cells, lng_cells) if cell in index]
+
+    # ---------- Operaciones del repositorio ----------
+    def create_ride(self, ride: Ride) -> Ride:
+        with self._lock:
+            return _copy_ride(self._insert_ride(ride))
+
+    def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        with self._lock:
+            if len(rides) < _BULK_SORT_MIN:
+                return [_copy_ride(self._insert_ride(ride)) for ride in rides]
+            stored = [self._insert_ride(ride, index=False) for ride in rides]
+            self._index_rides(stored)
+            return [_copy_ride(ride) for ride in stored]
+
+    def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        with self._lock:
+            ride = self._rides.get(ride_id)
+            return _copy_ride(ride) if ride is not None else None
+
+    def complete_ride(self, ride_id: int, driver_id: str, updated_at: datetime) -> Optional[Ride]:
+        with self._lock:
+            ride = self._rides.get(ride_id)
+            if (
+                ride is None
+                or ride.driver_id != driver_id
+                or ride.status not in (RideStatus.OPEN, RideStatus.FULL)
+            ):
+                return None
+            updated = _copy_ride(ride)
+            updated.status = RideStatus.COMPLETED
+            updated.updated_at = updated_at
+            self._replace_ride(updated)
+            return _copy_ride(updated)
+
+    def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[PlaceSearch] = None,
+        destination_search: Optional[PlaceSearch] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Key] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        origin_matches = _place_matcher(origin_search)
+        destination_matches = _place_matcher(destination_search)
+        departure_from, departure_to = _naive_utc(departure_from), _naive_utc(departure_to)
+        with self._lock:
+            # Cada fuente es un conjunto de listas ordenadas que cubre todos los
+            # rides que pueden coincidir; se recorre la de menos claves
+            empty = SortedKeys()
+            sources: List[List[SortedKeys]] = [[self._all]]
+            if origin:
+                sources.append([self._by_origin.get(origin, empty)])
+            if destination:
+                sources.append([self._by_destination.get(destination, empty)])
+            if status:
+                sources.append([self._by_status.get(status, empty)])
+            # Búsqueda resuelta a nombres exactos (índice de lugares): sus listas
+            for search, index in (
+                (origin_search, self._by_origin),
+                (destination_search, self._by_destination),
+            ):
+                if search is not None and search.names is not None:
+                    sources.append([index[name] for name in set(search.names) if name in index])
+            for area, index in (
+                (origin_area, self._by_origin_cell),
+                (destination_area, self._by_destination_cell),
+            ):
+                if area is not None:
+                    cells = self._area_lists(index, area)
+                    if cells is not None:
+                        sources.append(cells)
+            lists = min(sources, key=lambda source: sum(map(len, source)))
+            bound = _lower_bound(after, departure_from)
+            tails = [keys.after(bound) for keys in lists]
+            candidates = tails[0] if len(tails) == 1 else heapq.merge(*tails)
+
+            page: List[Ride] = []
+            for departure_time, ride_id in candidates:
+                if limit is not None and len(page) >= limit:
+                    break
+                if departure_to is not None and departure_time > departure_to:
+                    break
+                ride = self._rides[ride_id]
+                if origin and ride.origin != origin:
+                    continue
+                if destination and ride.destination != destination:
+                    continue
+                if status and ride.status != status:
+                    continue
+                if origin_matches is not None and not origin_matches(ride.origin):
+                    continue
+                if destination_matches is not None and not destination_matches(ride.destination):
+                    continue
+                if origin_area is not None and not _in_area(ride.origin_lat, ride.origin_lng, origin_area):
+                    continue
+                if destination_area is not None and not _in_area(
+                    ride.destination_lat, ride.destination_lng, destination_area
+                ):
+                    continue
+                page.append(_copy_ride(ride))
+            return page
+
+    def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        with self._lock:
+            return _copy_passenger(self._insert_passenger(passenger))
+
+    def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        with self._lock:
+            ride = self._rides.get(passenger.ride_id)
+            if ride is None or ride.status != RideStatus.OPEN or ride.seats_available <= 0:
+                return None
+            existing = self._passenger_row(passenger.ride_id, passenger.passenger_id)
+            # Se valida antes de tocar nada: fuera de una unidad de trabajo no hay rollback
+            if (existing is not None) != rejoin or (
+                existing is not None and existing.status != PassengerStatus.CANCELLED
+            ):
+                raise PassengerAlreadyJoinedError("Passenger already joined this ride")
+
+            updated = _copy_ride(ride)
+            updated.seats_available -= 1
+            if updated.seats_available == 0:
+                updated.status = RideStatus.FULL
+            updated.updated_at = passenger.joined_at
+            self._replace_ride(updated)
+            if existing is not None:
+                rejoined = _copy_passenger(existing)
+                rejoined.status = PassengerStatus.JOINED
+                rejoined.joined_at = passenger.joined_at
+                rejoined.left_at = None
+                self._replace_passenger(rejoined)
+            else:
+                self._insert_passenger(passenger)
+            return _copy_ride(updated)
+
+    def release_seat(self, ride_id: int, passenger_id: str, left_at: datetime) -> Optional[Ride]:
+        with self._lock:
+            existing = self._passenger_row(ride_id, passenger_id)
+            if existing is None or existing.status != PassengerStatus.JOINED:
+                return None
+            ride = self._rides.get(ride_id)
+            if ride is None or ride.status not in (RideStatus.OPEN, RideStatus.FULL):
+                return None
+
+            cancelled = _copy_passenger(existing)
+            cancelled.status = PassengerStatus.CANCELLED
+            cancelled.left_at = left_at
+            self._replace_passenger(cancelled)
+            updated = _copy_ride(ride)
+            updated.seats_available += 1
+            updated.status = RideStatus.OPEN
+            updated.updated_at = left_at
+            self._replace_ride(updated)
+            return _copy_ride(updated)
+
+    def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Key] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        with self._lock:
+            return self._page(self._passenger_rides.get(passenger_id), after, limit)
+
+    def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Key] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        with self._lock:
+            return [
+                RideManifest(
+                    ride=ride,
+                    passengers=[
+                        _copy_passenger(self._passengers[row_id])
+                        for row_id in self._ride_passengers.get(ride.id, {}).values()  # type: ignore[arg-type]
+                        if self._passengers[row_id].status == PassengerStatus.JOINED
+                    ],
+                )
+                for ride in self._page(self._by_driver.get(driver_id), after, limit)
+            ]
+
+    def get_passenger(self, ride_id: int, passenger_id: str) -> Optional[RidePassenger]:
+        with self._lock:
+            passenger = self._passenger_row(ride_id, passenger_id)
+            return _copy_passenger(passenger) if passenger is not None else None
+
+    def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        with self._lock:
+            return [
+                _copy_passenger(self._passengers[row_id])
+                for row_id in self._ride_passengers.get(ride_id, {}).values()
+            ]
+
+    def expire_rides(self, departed_before: datetime, updated_at: datetime, limit: int) -> List[Ride]:
+        with self._lock:
+            expired = []
+            for ride_id in self._housekeeping_batch(
+                (RideStatus.OPEN, RideStatus.FULL), departed_before, limit
+            ):
+                updated = _copy_ride(self._rides[ride_id])
+                updated.status = RideStatus.CANCELLED
+                updated.updated_at = updated_at
+                self._replace_ride(updated)
+                expired.append(_copy_ride(updated))
+            return expired
+
+    def archive_rides(self, departed_before: datetime, limit: int) -> List[int]:
+        with self._lock:
+            ride_ids = self._housekeeping_batch(
+                (RideStatus.COMPLETED, RideStatus.CANCELLED), departed_before, limit
+            )
+            for ride_id in ride_ids:
+                self._archive_ride(ride_id)
+            return ride_ids
+
+    def open_place_counts(self) -> Dict[str, int]:
+        """Rides OPEN por nombre de lugar (origen y destino), para PlaceIndexRefresher."""
+        counts: Counter = Counter()
+        with self._lock:
+            for _, ride_id in self._by_status.get(RideStatus.OPEN, ()):
+                ride = self._rides[ride_id]
+                counts[ride.origin] += 1
+                counts[ride.destination] += 1
+        return dict(counts)
+
+
+class RideInMemoryRepository(RideRepositoryPort):
+    def __init__(
+        self,
+        store: InMemoryRideStore,
+        place_index: Optional[TrigramPlaceIndex] = None,
+    ) -> None:
+        self._store = store
+        self._place_index = place_index
+
+    def _place_search(self, text: Optional[str]) -> Optional[PlaceSearch]:
+        return place_search(text, _DIALECT, self._place_index)
+
+    def create_ride(self, ride: Ride) -> Ride:
+        return self._store.create_ride(ride)
+
+    def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        return self._store.create_rides(rides)
+
+    def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        return self._store.get_ride_by_id(ride_id)
+
+    def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        return self._store.complete_ride(ride_id, driver_id, updated_at)
+
+    def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        return self._store.list_rides(
+            origin=origin,
+            destination=destination,
+            origin_search=self._place_search(origin_search),
+            destination_search=self._place_search(destination_search),
+            status=status,
+            departure_from=departure_from,
+            departure_to=departure_to,
+            origin_area=origin_area,
+            destination_area=destination_area,
+            after=after,
+            limit=limit,
+        )
+
+    def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        return self._store.add_passenger(passenger)
+
+    def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        return self._store.reserve_seat(passenger, rejoin=rejoin)
+
+    def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        return self._store.release_seat(ride_id, passenger_id, left_at)
+
+    def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        return self._store.list_passenger_rides(passenger_id, after=after, limit=limit)
+
+    def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        return self._store.list_driver_rides(driver_id, after=after, limit=limit)
+
+    def get_passenger(
+        self,
+        ride_id: int,
+        passenger_id: str,
+    ) -> Optional[RidePassenger]:
+        return self._store.get_passenger(ride_id, passenger_id)
+
+    def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        return self._store.list_passengers(ride_id)
+
+    def expire_rides(
+        self, departed_before: datetime, updated_at: datetime, limit: int
+    ) -> List[Ride]:
+        return self._store.expire_rides(departed_before, updated_at, limit)
+
+    def archive_rides(
+        self, departed_before: datetime, archived_at: datetime, limit: int
+    ) -> List[int]:
+        return self._store.archive_rides(departed_before, limit)
+
+
+class RideInMemoryAsyncRepository(AsyncRideRepositoryPort):
+    """Las mismas operaciones sin I/O: ninguna cede el event loop."""
+
+    def __init__(
+        self,
+        store: InMemoryRideStore,
+        place_index: Optional[TrigramPlaceIndex] = None,
+    ) -> None:
+        self._repo = RideInMemoryRepository(store, place_index)
+
+    async def create_ride(self, ride: Ride) -> Ride:
+        return self._repo.create_ride(ride)
+
+    async def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        return self._repo.create_rides(rides)
+
+    async def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        return self._repo.get_ride_by_id(ride_id)
+
+    async def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        return self._repo.complete_ride(ride_id, driver_id, updated_at)
+
+    async def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        return self._repo.list_rides(
+            origin=origin,
+            destination=destination,
+            origin_search=origin_search,
+            destination_search=destination_search,
+            status=status,
+            departure_from=departure_from,
+            departure_to=departure_to,
+            origin_area=origin_area,
+            destination_area=destination_area,
+            after=after,
+            limit=limit,
+        )
+
+    async def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        return self._repo.add_passenger(passenger)
+
+    async def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        return self._repo.reserve_seat(passenger, rejoin=rejoin)
+
+    async def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        return self._repo.release_seat(ride_id, passenger_id, left_at)
+
+    async def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        return self._repo.list_passenger_rides(passenger_id, after=after, limit=limit)
+
+    async def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        return self._repo.list_driver_rides(driver_id, after=after, limit=limit)
+
+    async def get_passenger(
+        self,
+        ride_id: int,
+        passenger_id: str,
+    ) -> Optional[RidePassenger]:
+        return self._repo.get_passenger(ride_id, passenger_id)
+
+    async def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        return self._repo.list_passengers(ride_id)
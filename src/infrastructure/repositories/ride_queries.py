@@ -0,0 +1,696 @@
+"""
+Sentencias y mapeos compartidos por los repositorios SQLAlchemy (sync y async).
+
+Solo construyen SQL y traducen filas; ejecutarlas es responsabilidad de cada
+repositorio y confirmar la transacción, de la unidad de trabajo.
+"""
+import json
+from dataclasses import dataclass, fields
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from sqlalchemy import (
+    Delete,
+    Executable,
+    Insert,
+    Row,
+    Select,
+    Update,
+    and_,
+    case,
+    delete,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import selectinload
+
+from src.domain.entities import (
+    Ride,
+    RidePassenger,
+    RideStatus,
+    PassengerStatus,
+)
+from src.application.dto import OutboxMessage, RideManifest
+from src.domain.clock import utcnow
+from src.domain.events import RideEvent
+from src.domain.geo import GeoArea, GeoRadius, KM_PER_DEGREE
+from src.infrastructure import geohash
+from src.infrastructure.db.models import (
+    IdempotencyKeyModel,
+    RideArchiveModel,
+    RideModel,
+    RideOutboxModel,
+    RidePassengerArchiveModel,
+    RidePassengerModel,
+    RideStatusDB,
+    PassengerStatusDB,
+)
+
+if TYPE_CHECKING:
+    from src.infrastructure.place_index import TrigramPlaceIndex
+
+# Lugares del índice en memoria que se traducen a un IN (sin pg_trgm)
+PLACE_SEARCH_MAX_NAMES = 50
+
+
+# Las lecturas seleccionan estas columnas, en el orden de los campos de la
+# entidad, y mapean cada tupla directo al dominio: sin instancias ORM ni
+# identity map de por medio
+RIDE_COLUMNS = (
+    RideModel.id,
+    RideModel.driver_id,
+    RideModel.origin,
+    RideModel.destination,
+    RideModel.departure_time,
+    RideModel.seats_total,
+    RideModel.seats_available,
+    RideModel.status,
+    RideModel.created_at,
+    RideModel.updated_at,
+    RideModel.origin_lat,
+    RideModel.origin_lng,
+    RideModel.destination_lat,
+    RideModel.destination_lng,
+)
+
+PASSENGER_COLUMNS = (
+    RidePassengerModel.id,
+    RidePassengerModel.ride_id,
+    RidePassengerModel.passenger_id,
+    RidePassengerModel.status,
+    RidePassengerModel.joined_at,
+    RidePassengerModel.left_at,
+)
+
+_RIDE_STATUS = {s: RideStatus(s.value) for s in RideStatusDB}
+_PASSENGER_STATUS = {s: PassengerStatus(s.value) for s in PassengerStatusDB}
+
+
+def ride_from_row(row: Row) -> Ride:
+    (
+        ride_id, driver_id, origin, destination, departure_time, seats_total,
+        seats_available, status, created_at, updated_at,
+        origin_lat, origin_lng, destination_lat, destination_lng,
+    ) = row
+    return Ride(
+        ride_id, driver_id, origin, destination, departure_time, seats_total,
+        seats_available, _RIDE_STATUS[status], created_at, updated_at,
+        origin_lat, origin_lng, destination_lat, destination_lng,
+    )
+
+
+def passenger_from_row(row: Row) -> RidePassenger:
+    passenger_row_id, ride_id, passenger_id, status, joined_at, left_at = row
+    return RidePassenger(
+        passenger_row_id, ride_id, passenger_id, _PASSENGER_STATUS[status], joined_at, left_at
+    )
+
+
+def to_domain_ride(model: RideModel) -> Ride:
+    return Ride(
+        id=model.id,
+        driver_id=model.driver_id,
+        origin=model.origin,
+        destination=model.destination,
+        departure_time=model.departure_time,
+        seats_total=model.seats_total,
+        seats_available=model.seats_available,
+        status=RideStatus(model.status.value),
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+        origin_lat=model.origin_lat,
+        origin_lng=model.origin_lng,
+        destination_lat=model.destination_lat,
+        destination_lng=model.destination_lng,
+    )
+
+
+def _geohash(lat: Optional[float], lng: Optional[float]) -> Optional[str]:
+    if lat is None or lng is None:
+        return None
+    return geohash.encode(lat, lng)
+
+
+def _location_values(ride: Ride) -> dict:
+    return dict(
+        origin_lat=ride.origin_lat,
+        origin_lng=ride.origin_lng,
+        origin_geohash=_geohash(ride.origin_lat, ride.origin_lng),
+        destination_lat=ride.destination_lat,
+        destination_lng=ride.destination_lng,
+        destination_geohash=_geohash(ride.destination_lat, ride.destination_lng),
+    )
+
+
+def to_domain_passenger(model: RidePassengerModel) -> RidePassenger:
+    return RidePassenger(
+        id=model.id,
+        ride_id=model.ride_id,
+        passenger_id=model.passenger_id,
+        status=PassengerStatus(model.status.value),
+        joined_at=model.joined_at,
+        left_at=model.left_at,
+    )
+
+
+def ride_values(ride: Ride) -> dict:
+    return dict(
+        driver_id=ride.driver_id,
+        origin=ride.origin,
+        destination=ride.destination,
+        departure_time=ride.departure_time,
+        seats_total=ride.seats_total,
+        seats_available=ride.seats_available,
+        status=RideStatusDB(ride.status.value),
+        created_at=ride.created_at,
+        updated_at=ride.updated_at,
+        **_location_values(ride),
+    )
+
+
+def passenger_values(passenger: RidePassenger) -> dict:
+    return dict(
+        ride_id=passenger.ride_id,
+        passenger_id=passenger.passenger_id,
+        status=PassengerStatusDB(passenger.status.value),
+        joined_at=passenger.joined_at,
+        left_at=passenger.left_at,
+    )
+
+
+def insert_ride_stmt(ride: Ride) -> Insert:
+    return insert(RideModel).values(**ride_values(ride)).returning(RideModel)
+
+
+def insert_rides_stmt() -> Insert:
+    # Con una lista de parámetros, SQLAlchemy lo ejecuta como INSERT multi-fila
+    # ("insertmanyvalues"). sort_by_parameter_order garantiza que RETURNING venga
+    # en el orden del lote; en PostgreSQL usa el id serial como centinela, en
+    # SQLite (sin centinela) cae a una fila por sentencia.
+    return insert(RideModel).returning(RideModel, sort_by_parameter_order=True)
+
+
+def insert_passenger_stmt(passenger: RidePassenger) -> Insert:
+    return (
+        insert(RidePassengerModel)
+        .values(**passenger_values(passenger))
+        .returning(RidePassengerModel)
+    )
+
+
+def get_ride_stmt(ride_id: int) -> Select:
+    return select(*RIDE_COLUMNS).where(RideModel.id == ride_id)
+
+
+def _area_filter(lat_col, lng_col, geohash_col, area: GeoArea):
+    box = area.bounding_box()
+    conditions = [
+        lat_col.between(box.min_lat, box.max_lat),
+        lng_col.between(box.min_lng, box.max_lng),
+    ]
+    # Las celdas llevan al índice de geohash; sin ellas (área grande) el
+    # planner recorre el índice por fecha y las coordenadas filtran
+    cells = geohash.covering_cells(box)
+    if cells is not None:
+        conditions.insert(0, geohash_col.in_(cells))
+    if isinstance(area, GeoRadius):
+        # Distancia equirectangular al cuadrado, en grados de latitud
+        dlat = lat_col - area.lat
+        dlng = (lng_col - area.lng) * area.lng_scale
+        conditions.append(dlat * dlat + dlng * dlng <= (area.radius_km / KM_PER_DEGREE) ** 2)
+    return and_(*conditions)
+
+
+@dataclass(frozen=True)
+class PlaceSearch:
+    """Búsqueda por prefijo/aproximada de un nombre de lugar, según el motor."""
+    text: str
+    trigram: bool = False
+    # Sin pg_trgm: variantes exactas resueltas por el índice en memoria
+    names: Optional[Tuple[str, ...]] = None
+
+
+def place_search(
+    text: Optional[str],
+    dialect_name: str,
+    place_index: "Optional[TrigramPlaceIndex]" = None,
+) -> Optional[PlaceSearch]:
+    if not text:
+        return None
+    if dialect_name == "postgresql":
+        return PlaceSearch(text, trigram=True)
+    if place_index is not None:
+        names = place_index.matching_names(text, PLACE_SEARCH_MAX_NAMES)
+        return PlaceSearch(text, names=tuple(names))
+    return PlaceSearch(text)
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _place_search_filter(column, search: PlaceSearch):
+    if search.trigram:
+        # Ambas condiciones las resuelve el índice GIN de trigramas (migración 0004)
+        return or_(
+            column.ilike(f"%{_escape_like(search.text)}%", escape="\\"),
+            column.op("%>")(search.text),
+        )
+    if search.names is not None:
+        # Igualdad: la sirven los índices por (origin|destination, departure_time)
+        return column.in_(search.names) if search.names else false()
+    return column.ilike(f"{_escape_like(search.text)}%", escape="\\")
+
+
+def list_rides_stmt(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    origin_search: Optional[PlaceSearch] = None,
+    destination_search: Optional[PlaceSearch] = None,
+    status: Optional[RideStatus] = None,
+    departure_from: Optional[datetime] = None,
+    departure_to: Optional[datetime] = None,
+    origin_area: Optional[GeoArea] = None,
+    destination_area: Optional[GeoArea] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    filters = []
+    if origin:
+        filters.append(RideModel.origin == origin)
+    if destination:
+        filters.append(RideModel.destination == destination)
+    if origin_search:
+        filters.append(_place_search_filter(RideModel.origin, origin_search))
+    if destination_search:
+        filters.append(_place_search_filter(RideModel.destination, destination_search))
+    if status:
+        # Literal en el SQL para que el planner pueda usar el índice parcial OPEN
+        filters.append(
+            RideModel.status
+            == literal(
+                RideStatusDB(status.value),
+                RideModel.status.type,
+                literal_execute=True,
+            )
+        )
+    if departure_from:
+        filters.append(RideModel.departure_time >= departure_from)
+    if departure_to:
+        filters.append(RideModel.departure_time <= departure_to)
+    if origin_area:
+        filters.append(
+            _area_filter(
+                RideModel.origin_lat,
+                RideModel.origin_lng,
+                RideModel.origin_geohash,
+                origin_area,
+            )
+        )
+    if destination_area:
+        filters.append(
+            _area_filter(
+                RideModel.destination_lat,
+                RideModel.destination_lng,
+                RideModel.destination_geohash,
+                destination_area,
+            )
+        )
+    if after:
+        # Keyset: el índice sobre (departure_time, id) salta directo al cursor
+        filters.append(tuple_(RideModel.departure_time, RideModel.id) > tuple_(*after))
+
+    stmt = select(*RIDE_COLUMNS).order_by(RideModel.departure_time, RideModel.id)
+    if filters:
+        stmt = stmt.where(and_(*filters))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def open_place_counts_stmt() -> Select:
+    # Rides OPEN por nombre de lugar, contando origen y destino
+    open_rides = RideModel.status == RideStatusDB.OPEN
+    places = union_all(
+        select(RideModel.origin.label("place")).where(open_rides),
+        select(RideModel.destination.label("place")).where(open_rides),
+    ).subquery()
+    return select(places.c.place, func.count()).group_by(places.c.place)
+
+
+def place_names_stmt() -> Select:
+    # Todos los nombres de lugar, de rides en cualquier estado; UNION deduplica y
+    # cada mitad recorre el índice que empieza por origin o por destination
+    return union(select(RideModel.origin), select(RideModel.destination))
+
+
+def reserve_seat_stmt(passenger: RidePassenger) -> Update:
+    # UPDATE condicional: la propia fila de rides serializa a los pasajeros
+    # concurrentes, así que no hay lectura-modificación-escritura ni overbooking.
+    return (
+        update(RideModel)
+        .where(
+            RideModel.id == passenger.ride_id,
+            RideModel.status == RideStatusDB.OPEN,
+            RideModel.seats_available > 0,
+        )
+        .values(
+            seats_available=RideModel.seats_available - 1,
+            status=case(
+                (RideModel.seats_available == 1, RideStatusDB.FULL),
+                else_=RideModel.status,
+            ),
+            updated_at=passenger.joined_at,
+        )
+        .returning(RideModel)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def rejoin_passenger_stmt(passenger: RidePassenger) -> Update:
+    # Volver a un ride que se abandonó reactiva la misma fila (única por ride y
+    # pasajero); si no hay fila CANCELLED, otro request ya lo unió
+    return (
+        update(RidePassengerModel)
+        .where(
+            RidePassengerModel.ride_id == passenger.ride_id,
+            RidePassengerModel.passenger_id == passenger.passenger_id,
+            RidePassengerModel.status == PassengerStatusDB.CANCELLED,
+        )
+        .values(
+            status=PassengerStatusDB.JOINED,
+            joined_at=passenger.joined_at,
+            left_at=None,
+        )
+        .returning(RidePassengerModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def cancel_passenger_stmt(ride_id: int, passenger_id: str, left_at: datetime) -> Update:
+    # Solo una baja gana: la segunda ya no ve la fila JOINED
+    return (
+        update(RidePassengerModel)
+        .where(
+            RidePassengerModel.ride_id == ride_id,
+            RidePassengerModel.passenger_id == passenger_id,
+            RidePassengerModel.status == PassengerStatusDB.JOINED,
+        )
+        .values(status=PassengerStatusDB.CANCELLED, left_at=left_at)
+        .returning(RidePassengerModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# Estados vigentes (se completan o el housekeeping los vence) y terminados (se archivan)
+_LIVE_STATUSES = (RideStatusDB.OPEN, RideStatusDB.FULL)
+_FINISHED_STATUSES = (RideStatusDB.COMPLETED, RideStatusDB.CANCELLED)
+
+
+def release_seat_stmt(ride_id: int, updated_at: datetime) -> Update:
+    # Incremento atómico (sin leer antes); un ride FULL vuelve a OPEN. Un ride
+    # completado o cancelado no devuelve asientos.
+    return (
+        update(RideModel)
+        .where(
+            RideModel.id == ride_id,
+            RideModel.status.in_([RideStatusDB.OPEN, RideStatusDB.FULL]),
+        )
+        .values(
+            seats_available=RideModel.seats_available + 1,
+            status=RideStatusDB.OPEN,
+            updated_at=updated_at,
+        )
+        .returning(RideModel)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def complete_ride_stmt(ride_id: int, driver_id: str, updated_at: datetime) -> Update:
+    # UPDATE condicional solo del estado, sin cargar el ride: una reserva o baja
+    # concurrente conserva sus asientos y un driver ajeno no coincide
+    return (
+        update(RideModel)
+        .where(
+            RideModel.id == ride_id,
+            RideModel.driver_id == driver_id,
+            RideModel.status.in_(_LIVE_STATUSES),
+        )
+        .values(status=RideStatusDB.COMPLETED, updated_at=updated_at)
+        .returning(RideModel)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def _housekeeping_batch(statuses, departed_before: datetime, limit: int) -> Select:
+    # Sin ORDER BY: con el IN sobre el estado, ordenar por fecha obligaría a
+    # leer todas las filas candidatas; así cada estado es un rango del índice
+    # (status, departure_time, id) que se corta en `limit`. SKIP LOCKED salta
+    # los rides que un request tiene tomados en vez de esperarlos.
+    return (
+        select(RideModel.id)
+        .where(RideModel.status.in_(statuses), RideModel.departure_time < departed_before)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def expire_rides_stmt(departed_before: datetime, updated_at: datetime, limit: int) -> Update:
+    # FOR UPDATE vuelve a evaluar el estado sobre la versión vigente de la fila
+    # al tomarla, así que un complete_ride concurrente no se pisa; el UPDATE
+    # exterior va solo por PK (repetir el filtro de estado hace que SQLite
+    # recorra todos los rides OPEN en cada lote)
+    batch = _housekeeping_batch(_LIVE_STATUSES, departed_before, limit).scalar_subquery()
+    return (
+        update(RideModel)
+        .where(RideModel.id.in_(batch))
+        .values(status=RideStatusDB.CANCELLED, updated_at=updated_at)
+        .returning(*RIDE_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def archivable_rides_stmt(departed_before: datetime, limit: int) -> Select:
+    return _housekeeping_batch(_FINISHED_STATUSES, departed_before, limit)
+
+
+def archive_rides_stmts(ride_ids: List[int], archived_at: datetime) -> List[Executable]:
+    """Copia el lote y sus pasajeros a las tablas de archivo y lo borra (en orden)."""
+    ride_columns = [c.name for c in RideModel.__table__.columns]
+    passenger_columns = [c.name for c in RidePassengerModel.__table__.columns]
+    stamp = literal(archived_at, RideArchiveModel.archived_at.type)
+    return [
+        insert(RideArchiveModel).from_select(
+            ride_columns + ["archived_at"],
+            select(*(RideModel.__table__.c[name] for name in ride_columns), stamp)
+            .where(RideModel.id.in_(ride_ids)),
+        ),
+        insert(RidePassengerArchiveModel).from_select(
+            passenger_columns + ["archived_at"],
+            select(*(RidePassengerModel.__table__.c[name] for name in passenger_columns), stamp)
+            .where(RidePassengerModel.ride_id.in_(ride_ids)),
+        ),
+        delete(RidePassengerModel)
+        .where(RidePassengerModel.ride_id.in_(ride_ids))
+        .execution_options(synchronize_session=False),
+        delete(RideModel)
+        .where(RideModel.id.in_(ride_ids))
+        .execution_options(synchronize_session=False),
+    ]
+
+
+def passenger_rides_stmt(
+    passenger_id: str,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    # Un solo SELECT con JOIN: el índice (passenger_id, status, ride_id) da los
+    # rides del pasajero y cada uno se busca por PK; el orden es sobre ese
+    # conjunto chico, no sobre la tabla de rides
+    stmt = (
+        select(*RIDE_COLUMNS)
+        .join(RidePassengerModel, RidePassengerModel.ride_id == RideModel.id)
+        .where(
+            RidePassengerModel.passenger_id == passenger_id,
+            RidePassengerModel.status == PassengerStatusDB.JOINED,
+        )
+        .order_by(RideModel.departure_time, RideModel.id)
+    )
+    if after:
+        stmt = stmt.where(tuple_(RideModel.departure_time, RideModel.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def driver_rides_stmt(
+    driver_id: str,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    # Dos sentencias por página, sin importar cuántos rides traiga: la de rides
+    # (índice por driver_id, departure_time, id) y un solo SELECT ... IN con los
+    # pasajeros unidos de todos ellos, en vez del lazy load por ride (N+1)
+    stmt = (
+        select(RideModel)
+        .where(RideModel.driver_id == driver_id)
+        .options(
+            selectinload(
+                RideModel.passengers.and_(
+                    RidePassengerModel.status == PassengerStatusDB.JOINED
+                )
+            )
+        )
+        .order_by(RideModel.departure_time, RideModel.id)
+    )
+    if after:
+        stmt = stmt.where(tuple_(RideModel.departure_time, RideModel.id) > tuple_(*after))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def to_domain_manifest(model: RideModel) -> RideManifest:
+    return RideManifest(
+        ride=to_domain_ride(model),
+        passengers=[to_domain_passenger(p) for p in model.passengers],
+    )
+
+
+def get_passenger_stmt(ride_id: int, passenger_id: str) -> Select:
+    return select(*PASSENGER_COLUMNS).where(
+        and_(
+            RidePassengerModel.ride_id == ride_id,
+            RidePassengerModel.passenger_id == passenger_id,
+        )
+    )
+
+
+def list_passengers_stmt(ride_id: int) -> Select:
+    return select(*PASSENGER_COLUMNS).where(RidePassengerModel.ride_id == ride_id)
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def outbox_values(event: RideEvent) -> dict:
+    ride = event.ride
+    payload = {f.name: _json_value(getattr(ride, f.name)) for f in fields(ride)}
+    return dict(
+        event_type=event.type.value,
+        ride_id=ride.id,
+        payload=json.dumps(payload),
+        created_at=utcnow(),
+    )
+
+
+def insert_outbox_stmt() -> Insert:
+    # Con la lista de eventos de la transacción: un solo executemany
+    return insert(RideOutboxModel)
+
+
+def claim_outbox_batch_stmt(limit: int) -> Select:
+    # SKIP LOCKED: varios relays (uno por réplica) se reparten lotes distintos
+    # sin esperarse. SQLite no lo soporta y lo omite (un solo escritor).
+    return (
+        select(RideOutboxModel)
+        .order_by(RideOutboxModel.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def delete_outbox_stmt(ids: List[int]) -> Delete:
+    return delete(RideOutboxModel).where(RideOutboxModel.id.in_(ids))
+
+
+def to_outbox_message(model: RideOutboxModel) -> OutboxMessage:
+    return OutboxMessage(
+        id=model.id,
+        event_type=model.event_type,
+        ride_id=model.ride_id,
+        payload=model.payload,
+        created_at=model.created_at,
+    )
+
+
+def insert_idempotency_key_stmt(
+    scope: str, key: str, request_hash: str, created_at: datetime
+) -> Insert:
+    # Sin status_code: reservada mientras corre el request original
+    return insert(IdempotencyKeyModel).values(
+        scope=scope, key=key, request_hash=request_hash, created_at=created_at
+    )
+
+
+def get_idempotency_key_stmt(scope: str, key: str) -> Select:
+    return select(
+        IdempotencyKeyModel.request_hash,
+        IdempotencyKeyModel.status_code,
+        IdempotencyKeyModel.body,
+        IdempotencyKeyModel.created_at,
+    ).where(IdempotencyKeyModel.scope == scope, IdempotencyKeyModel.key == key)
+
+
+def take_over_idempotency_key_stmt(
+    scope: str, key: str, request_hash: str, seen_created_at: datetime, created_at: datetime
+) -> Update:
+    # Reutiliza una clave vencida o abandonada; si dos requests lo intentan a
+    # la vez, solo uno ve todavía el created_at que leyó
+    return (
+        update(IdempotencyKeyModel)
+        .where(
+            IdempotencyKeyModel.scope == scope,
+            IdempotencyKeyModel.key == key,
+            IdempotencyKeyModel.created_at == seen_created_at,
+        )
+        .values(request_hash=request_hash, status_code=None, body=None, created_at=created_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def complete_idempotency_key_stmt(scope: str, key: str, status_code: int, body: bytes) -> Update:
+    return (
+        update(IdempotencyKeyModel)
+        .where(IdempotencyKeyModel.scope == scope, IdempotencyKeyModel.key == key)
+        .values(status_code=status_code, body=body)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_idempotency_key_stmt(scope: str, key: str) -> Delete:
+    return (
+        delete(IdempotencyKeyModel)
+        .where(IdempotencyKeyModel.scope == scope, IdempotencyKeyModel.key == key)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def purge_idempotency_keys_stmt(created_before: datetime, limit: int) -> Delete:
+    # Un lote de claves vencidas por el índice de created_at; como en el
+    # housekeeping de rides, SKIP LOCKED salta las que un request tiene tomadas
+    batch = (
+        select(IdempotencyKeyModel.scope, IdempotencyKeyModel.key)
+        .where(IdempotencyKeyModel.created_at < created_before)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        delete(IdempotencyKeyModel)
+        .where(tuple_(IdempotencyKeyModel.scope, IdempotencyKeyModel.key).in_(batch))
+        .execution_options(synchronize_session=False)
+    )
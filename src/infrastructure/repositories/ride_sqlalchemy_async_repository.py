@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.dto import RideManifest
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.domain.entities import (
+    Ride,
+    RidePassenger,
+    RideStatus,
+)
+from src.domain.geo import GeoArea
+from src.infrastructure.repositories.ride_queries import (
+    cancel_passenger_stmt,
+    complete_ride_stmt,
+    driver_rides_stmt,
+    get_passenger_stmt,
+    get_ride_stmt,
+    insert_passenger_stmt,
+    insert_ride_stmt,
+    insert_rides_stmt,
+    list_passengers_stmt,
+    passenger_from_row,
+    passenger_rides_stmt,
+    rejoin_passenger_stmt,
+    release_seat_stmt,
+    reserve_seat_stmt,
+    ride_from_row,
+    ride_values,
+    to_domain_manifest,
+    to_domain_passenger,
+    to_domain_ride,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    _RideSQLAlchemyBase,
+    _already_joined,
+)
+
+
+class RideSQLAlchemyAsyncRepository(
+    _RideSQLAlchemyBase[AsyncSession], AsyncRideRepositoryPort
+):
+
+    async def create_ride(self, ride: Ride) -> Ride:
+        db_ride = (await self._session.scalars(insert_ride_stmt(ride))).one()
+        return to_domain_ride(db_ride)
+
+    async def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        if not rides:
+            return []
+        results = (
+            await self._session.scalars(insert_rides_stmt(), [ride_values(r) for r in rides])
+        ).all()
+        return [to_domain_ride(r) for r in results]
+
+    async def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
+        row = (await self._session.execute(get_ride_stmt(ride_id))).one_or_none()
+        if row is None:
+            return None
+        return ride_from_row(row)
+
+    async def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        db_ride = (
+            await self._session.scalars(complete_ride_stmt(ride_id, driver_id, updated_at))
+        ).one_or_none()
+        if db_ride is None:
+            return None
+        return to_domain_ride(db_ride)
+
+    async def list_rides(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
+        status: Optional[RideStatus] = None,
+        departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        stmt = self._list_rides_stmt(
+            origin=origin,
+            destination=destination,
+            origin_search=origin_search,
+            destination_search=destination_search,
+            status=status,
+            departure_from=departure_from,
+            departure_to=departure_to,
+            origin_area=origin_area,
+            destination_area=destination_area,
+            after=after,
+            limit=limit,
+        )
+        rows = (await self._session.execute(stmt)).all()
+        return [ride_from_row(r) for r in rows]
+
+    async def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        db_passenger = (await self._session.scalars(insert_passenger_stmt(passenger))).one()
+        return to_domain_passenger(db_passenger)
+
+    async def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        db_ride = (await self._session.scalars(reserve_seat_stmt(passenger))).one_or_none()
+        if db_ride is None:
+            return None
+        ride = to_domain_ride(db_ride)
+        if rejoin:
+            rejoined = (await self._session.scalars(rejoin_passenger_stmt(passenger))).one_or_none()
+            if rejoined is None:
+                raise _already_joined()
+            return ride
+        try:
+            await self._session.execute(insert_passenger_stmt(passenger))
+        except IntegrityError:
+            # Unión duplicada concurrente: el rollback de la unidad de trabajo
+            # también devuelve el asiento
+            raise _already_joined()
+        return ride
+
+    async def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        cancelled = (
+            await self._session.scalars(cancel_passenger_stmt(ride_id, passenger_id, left_at))
+        ).one_or_none()
+        if cancelled is None:
+            return None
+        db_ride = (await self._session.scalars(release_seat_stmt(ride_id, left_at))).one_or_none()
+        if db_ride is None:
+            return None
+        return to_domain_ride(db_ride)
+
+    async def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        stmt = passenger_rides_stmt(passenger_id, after=after, limit=limit)
+        rows = (await self._session.execute(stmt)).all()
+        return [ride_from_row(r) for r in rows]
+
+    async def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        stmt = driver_rides_stmt(driver_id, after=after, limit=limit)
+        results = (await self._session.execute(stmt)).scalars().all()
+        return [to_domain_manifest(r) for r in results]
+
+    async def get_passenger(
+        self,
+        ride_id: int,
+        passenger_id: str,
+    ) -> Optional[RidePassenger]:
+        stmt = get_passenger_stmt(ride_id, passenger_id)
+        row = (await self._session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        return passenger_from_row(row)
+
+    async def list_passengers(self, ride_id: int) -> List[RidePassenger]:
+        rows = (await self._session.execute(list_passengers_stmt(ride_id))).all()
+        return [passenger_from_row(r) for r in rows]
@@ -1,152 +1,223 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Generic, List, Optional, Tuple, TypeVar
 
-from sqlalchemy import and_, select
+from sqlalchemy import Select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.application.dto import RideManifest
 from src.application.ports.ride_repository_port import RideRepositoryPort
 from src.domain.entities import (
     Ride,
     RidePassenger,
     RideStatus,
-    PassengerStatus,
 )
-from src.infrastructure.db.models import (
-    RideModel,
-    RidePassengerModel,
-    RideStatusDB,
-    PassengerStatusDB,
+from src.domain.geo import GeoArea
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.infrastructure.place_index import TrigramPlaceIndex
+from src.infrastructure.repositories.ride_queries import (
+    PlaceSearch,
+    archivable_rides_stmt,
+    archive_rides_stmts,
+    cancel_passenger_stmt,
+    complete_ride_stmt,
+    driver_rides_stmt,
+    expire_rides_stmt,
+    get_passenger_stmt,
+    get_ride_stmt,
+    insert_passenger_stmt,
+    insert_ride_stmt,
+    insert_rides_stmt,
+    list_passengers_stmt,
+    list_rides_stmt,
+    passenger_from_row,
+    passenger_rides_stmt,
+    place_search,
+    rejoin_passenger_stmt,
+    release_seat_stmt,
+    reserve_seat_stmt,
+    ride_from_row,
+    ride_values,
+    to_domain_manifest,
+    to_domain_passenger,
+    to_domain_ride,
 )
 
 
-class RideSQLAlchemyRepository(RideRepositoryPort):
-    def __init__(self, session: Session) -> None:
-        self._session = session
+S = TypeVar("S", Session, AsyncSession)
+
+
+def _already_joined() -> PassengerAlreadyJoinedError:
+    return PassengerAlreadyJoinedError("Passenger already joined this ride")
 
-    @staticmethod
-    def _to_domain_ride(model: RideModel) -> Ride:
-        return Ride(
-            id=model.id,
-            driver_id=model.driver_id,
-            origin=model.origin,
-            destination=model.destination,
-            departure_time=model.departure_time,
-            seats_total=model.seats_total,
-            seats_available=model.seats_available,
-            status=RideStatus(model.status.value),
-            created_at=model.created_at,
-            updated_at=model.updated_at,
-        )
 
-    @staticmethod
-    def _to_domain_passenger(model: RidePassengerModel) -> RidePassenger:
-        return RidePassenger(
-            id=model.id,
-            ride_id=model.ride_id,
-            passenger_id=model.passenger_id,
-            status=PassengerStatus(model.status.value),
-            joined_at=model.joined_at,
-            left_at=model.left_at,
+class _RideSQLAlchemyBase(Generic[S]):
+    """Lo común a los repositorios sync y async; estos solo difieren en la I/O."""
+
+    def __init__(
+        self,
+        session: S,
+        place_index: Optional[TrigramPlaceIndex] = None,
+    ) -> None:
+        self._session = session
+        # Sin pg_trgm, las búsquedas aproximadas se resuelven contra este índice
+        self._place_index = place_index
+
+    def _place_search(self, text: Optional[str]) -> Optional[PlaceSearch]:
+        return place_search(text, self._session.get_bind().dialect.name, self._place_index)
+
+    def _list_rides_stmt(
+        self, origin_search: Optional[str], destination_search: Optional[str], **filters
+    ) -> Select:
+        return list_rides_stmt(
+            origin_search=self._place_search(origin_search),
+            destination_search=self._place_search(destination_search),
+            **filters,
         )
 
+
+class RideSQLAlchemyRepository(_RideSQLAlchemyBase[Session], RideRepositoryPort):
+
     def create_ride(self, ride: Ride) -> Ride:
-        db_ride = RideModel(
-            driver_id=ride.driver_id,
-            origin=ride.origin,
-            destination=ride.destination,
-            departure_time=ride.departure_time,
-            seats_total=ride.seats_total,
-            seats_available=ride.seats_available,
-            status=RideStatusDB(ride.status.value),
-            created_at=ride.created_at,
-            updated_at=ride.updated_at,
-        )
-        self._session.add(db_ride)
-        self._session.commit()
-        self._session.refresh(db_ride)
-        return self._to_domain_ride(db_ride)
+        db_ride = (self._session.scalars(insert_ride_stmt(ride))).one()
+        return to_domain_ride(db_ride)
+
+    def create_rides(self, rides: List[Ride]) -> List[Ride]:
+        if not rides:
+            return []
+        results = (
+            self._session.scalars(insert_rides_stmt(), [ride_values(r) for r in rides])
+        ).all()
+        return [to_domain_ride(r) for r in results]
 
     def get_ride_by_id(self, ride_id: int) -> Optional[Ride]:
-        stmt = select(RideModel).where(RideModel.id == ride_id)
-        result = self._session.execute(stmt).scalar_one_or_none()
-        if result is None:
+        row = self._session.execute(get_ride_stmt(ride_id)).one_or_none()
+        if row is None:
             return None
-        return self._to_domain_ride(result)
-
-    def save_ride(self, ride: Ride) -> Ride:
-        db_ride: RideModel | None = self._session.get(RideModel, ride.id)
+        return ride_from_row(row)
+
+    def complete_ride(
+        self, ride_id: int, driver_id: str, updated_at: datetime
+    ) -> Optional[Ride]:
+        db_ride = (
+            self._session.scalars(complete_ride_stmt(ride_id, driver_id, updated_at))
+        ).one_or_none()
         if db_ride is None:
-            raise ValueError("Ride not found in DB")
-
-        db_ride.origin = ride.origin
-        db_ride.destination = ride.destination
-        db_ride.departure_time = ride.departure_time
-        db_ride.seats_total = ride.seats_total
-        db_ride.seats_available = ride.seats_available
-        db_ride.status = RideStatusDB(ride.status.value)
-        db_ride.updated_at = ride.updated_at
-
-        self._session.commit()
-        self._session.refresh(db_ride)
-        return self._to_domain_ride(db_ride)
+            return None
+        return to_domain_ride(db_ride)
 
     def list_rides(
         self,
         origin: Optional[str] = None,
         destination: Optional[str] = None,
+        origin_search: Optional[str] = None,
+        destination_search: Optional[str] = None,
         status: Optional[RideStatus] = None,
         departure_from: Optional[datetime] = None,
+        departure_to: Optional[datetime] = None,
+        origin_area: Optional[GeoArea] = None,
+        destination_area: Optional[GeoArea] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
     ) -> List[Ride]:
-        filters = []
-        if origin:
-            filters.append(RideModel.origin == origin)
-        if destination:
-            filters.append(RideModel.destination == destination)
-        if status:
-            filters.append(RideModel.status == RideStatusDB(status.value))
-        if departure_from:
-            filters.append(RideModel.departure_time >= departure_from)
-
-        stmt = select(RideModel)
-        if filters:
-            stmt = stmt.where(and_(*filters))
+        stmt = self._list_rides_stmt(
+            origin=origin,
+            destination=destination,
+            origin_search=origin_search,
+            destination_search=destination_search,
+            status=status,
+            departure_from=departure_from,
+            departure_to=departure_to,
+            origin_area=origin_area,
+            destination_area=destination_area,
+            after=after,
+            limit=limit,
+        )
+        rows = self._session.execute(stmt).all()
+        return [ride_from_row(r) for r in rows]
 
-        results = self._session.execute(stmt).scalars().all()
+    def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
+        db_passenger = (self._session.scalars(insert_passenger_stmt(passenger))).one()
+        return to_domain_passenger(db_passenger)
 
-        print(results)
+    def reserve_seat(self, passenger: RidePassenger, rejoin: bool = False) -> Optional[Ride]:
+        db_ride = (self._session.scalars(reserve_seat_stmt(passenger))).one_or_none()
+        if db_ride is None:
+            return None
+        ride = to_domain_ride(db_ride)
+        if rejoin:
+            rejoined = (self._session.scalars(rejoin_passenger_stmt(passenger))).one_or_none()
+            if rejoined is None:
+                raise _already_joined()
+            return ride
+        try:
+            self._session.execute(insert_passenger_stmt(passenger))
+        except IntegrityError:
+            # Unión duplicada concurrente: el rollback de la unidad de trabajo
+            # también devuelve el asiento
+            raise _already_joined()
+        return ride
+
+    def release_seat(
+        self, ride_id: int, passenger_id: str, left_at: datetime
+    ) -> Optional[Ride]:
+        cancelled = (
+            self._session.scalars(cancel_passenger_stmt(ride_id, passenger_id, left_at))
+        ).one_or_none()
+        if cancelled is None:
+            return None
+        db_ride = (self._session.scalars(release_seat_stmt(ride_id, left_at))).one_or_none()
+        if db_ride is None:
+            return None
+        return to_domain_ride(db_ride)
 
-        return [self._to_domain_ride(r) for r in results]
+    def list_passenger_rides(
+        self,
+        passenger_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Ride]:
+        stmt = passenger_rides_stmt(passenger_id, after=after, limit=limit)
+        rows = (self._session.execute(stmt)).all()
+        return [ride_from_row(r) for r in rows]
 
-    def add_passenger(self, passenger: RidePassenger) -> RidePassenger:
-        db_passenger = RidePassengerModel(
-            ride_id=passenger.ride_id,
-            passenger_id=passenger.passenger_id,
-            status=PassengerStatusDB(passenger.status.value),
-            joined_at=passenger.joined_at,
-            left_at=passenger.left_at,
-        )
-        self._session.add(db_passenger)
-        self._session.commit()
-        self._session.refresh(db_passenger)
-        return self._to_domain_passenger(db_passenger)
+    def list_driver_rides(
+        self,
+        driver_id: str,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[RideManifest]:
+        stmt = driver_rides_stmt(driver_id, after=after, limit=limit)
+        results = (self._session.execute(stmt)).scalars().all()
+        return [to_domain_manifest(r) for r in results]
 
     def get_passenger(
         self,
         ride_id: int,
         passenger_id: str,
     ) -> Optional[RidePassenger]:
-        stmt = select(RidePassengerModel).where(
-            and_(
-                RidePassengerModel.ride_id == ride_id,
-                RidePassengerModel.passenger_id == passenger_id,
-            )
-        )
-        result = self._session.execute(stmt).scalar_one_or_none()
-        if result is None:
+        stmt = get_passenger_stmt(ride_id, passenger_id)
+        row = self._session.execute(stmt).one_or_none()
+        if row is None:
             return None
-        return self._to_domain_passenger(result)
+        return passenger_from_row(row)
 
     def list_passengers(self, ride_id: int) -> List[RidePassenger]:
-        stmt = select(RidePassengerModel).where(RidePassengerModel.ride_id == ride_id)
-        results = self._session.execute(stmt).scalars().all()
-        return [self._to_domain_passenger(p) for p in results]
+        rows = self._session.execute(list_passengers_stmt(ride_id)).all()
+        return [passenger_from_row(r) for r in rows]
+
+    def expire_rides(
+        self, departed_before: datetime, updated_at: datetime, limit: int
+    ) -> List[Ride]:
+        rows = self._session.execute(expire_rides_stmt(departed_before, updated_at, limit)).all()
+        return [ride_from_row(r) for r in rows]
+
+    def archive_rides(
+        self, departed_before: datetime, archived_at: datetime, limit: int
+    ) -> List[int]:
+        ride_ids = list(self._session.scalars(archivable_rides_stmt(departed_before, limit)))
+        if ride_ids:
+            for stmt in archive_rides_stmts(ride_ids, archived_at):
+                self._session.execute(stmt)
+        return ride_ids
@@ -0,0 +1,159 @@
+"""
+Unidades de trabajo sobre una sesión SQLAlchemy (sync y async).
+
+Envuelven la sesión del request: los repositorios ejecutan sentencias sobre
+ella y la transacción se confirma una sola vez en `commit()`. Si hay caché de
+rides, las lecturas igual van a la base y los listados se invalidan
+después del commit (nada, en rollback); lo mismo con los eventos
+registrados por el caso de uso. Con outbox, además,
+los eventos se insertan en `ride_outbox` dentro de la misma transacción, y si
+el request lleva Idempotency-Key, su respuesta (ver src/infrastructure/idempotency.py).
+"""
+import logging
+from typing import List, Optional
+
+from sqlalchemy import Update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.ride_event_publisher_port import RideEventPublisherPort
+from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
+from src.domain.entities import Ride
+from src.domain.events import RideEvent
+from src.infrastructure.idempotency import completion_committed, completion_stmt
+from src.infrastructure.outbox import OutboxRelay
+from src.infrastructure.repositories.cached_ride_repository import (
+    AsyncCachedRideRepository,
+    CachedRideRepository,
+    RideCache,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_async_repository import (
+    RideSQLAlchemyAsyncRepository,
+)
+from src.infrastructure.repositories.ride_queries import insert_outbox_stmt, outbox_values
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingEvents:
+    def __init__(
+        self,
+        publisher: Optional[RideEventPublisherPort],
+        outbox: Optional[OutboxRelay],
+    ) -> None:
+        self._publisher = publisher
+        self._outbox = outbox
+        self._events: List[RideEvent] = []
+        # Estado final del ride que cambió la transacción (el del último evento)
+        self._ride: Optional[Ride] = None
+
+    def add_event(self, event: RideEvent) -> None:
+        self._ride = event.ride
+        if self._publisher is not None or self._outbox is not None:
+            self._events.append(event)
+
+    def _completion(self) -> Optional[Update]:
+        return completion_stmt(self._ride) if self._ride is not None else None
+
+    def _outbox_rows(self) -> List[dict]:
+        if self._outbox is None:
+            return []
+        return [outbox_values(event) for event in self._events]
+
+    def _publish_events(self) -> None:
+        events, self._events = self._events, []
+        self._ride = None
+        if self._outbox is not None and events:
+            self._outbox.notify()
+        if self._publisher is None:
+            return
+        for event in events:
+            try:
+                self._publisher.publish(event)  # type: ignore[union-attr]
+            except Exception:
+                # El cambio ya está confirmado: un suscriptor roto no lo revierte
+                logger.exception("Ride event publish failed", extra={"type": event.type.value})
+
+    def _discard_events(self) -> None:
+        self._events.clear()
+        self._ride = None
+
+
+class SQLAlchemyUnitOfWork(_PendingEvents, UnitOfWorkPort):
+    def __init__(
+        self,
+        session: Session,
+        ride_cache: Optional[RideCache] = None,
+        events: Optional[RideEventPublisherPort] = None,
+        outbox: Optional[OutboxRelay] = None,
+    ) -> None:
+        super().__init__(events, outbox)
+        self._session = session
+        self._cached: Optional[CachedRideRepository] = None
+        self.rides: RideRepositoryPort = RideSQLAlchemyRepository(session)
+        if ride_cache is not None:
+            self._cached = CachedRideRepository(self.rides, ride_cache, read_through=False)
+            self.rides = self._cached
+
+    def commit(self) -> None:
+        rows = self._outbox_rows()
+        if rows:
+            self._session.execute(insert_outbox_stmt(), rows)
+        completion = self._completion()
+        if completion is not None:
+            self._session.execute(completion)
+        self._session.commit()
+        if completion is not None:
+            completion_committed()
+        if self._cached is not None:
+            self._cached.publish()
+        self._publish_events()
+
+    def rollback(self) -> None:
+        self._session.rollback()
+        if self._cached is not None:
+            self._cached.discard()
+        self._discard_events()
+
+
+class SQLAlchemyAsyncUnitOfWork(_PendingEvents, AsyncUnitOfWorkPort):
+    def __init__(
+        self,
+        session: AsyncSession,
+        ride_cache: Optional[RideCache] = None,
+        events: Optional[RideEventPublisherPort] = None,
+        outbox: Optional[OutboxRelay] = None,
+    ) -> None:
+        super().__init__(events, outbox)
+        self._session = session
+        self._cached: Optional[AsyncCachedRideRepository] = None
+        self.rides: AsyncRideRepositoryPort = RideSQLAlchemyAsyncRepository(session)
+        if ride_cache is not None:
+            self._cached = AsyncCachedRideRepository(self.rides, ride_cache, read_through=False)
+            self.rides = self._cached
+
+    async def commit(self) -> None:
+        rows = self._outbox_rows()
+        if rows:
+            await self._session.execute(insert_outbox_stmt(), rows)
+        completion = self._completion()
+        if completion is not None:
+            await self._session.execute(completion)
+        await self._session.commit()
+        if completion is not None:
+            completion_committed()
+        if self._cached is not None:
+            self._cached.publish()
+        self._publish_events()
+
+    async def rollback(self) -> None:
+        await self._session.rollback()
+        if self._cached is not None:
+            self._cached.discard()
+        self._discard_events()
@@ -0,0 +1,201 @@
+"""
+Métricas por request: latencia por ruta, sentencias y tiempo en la base, y fases.
+
+Cada request HTTP lleva un `RequestTiming` en una ContextVar (lo pone el
+middleware de src/interface/api/metrics_middleware.py). La copia del contexto
+llega al threadpool de las rutas sync y al greenlet del AsyncEngine, así que
+los hooks del engine y `timed_phase` suman al request que los originó; fuera
+de un request (relay del outbox, índice de lugares) no registran nada.
+
+Al terminar, el request se agrega a `RequestMetrics` por (método, plantilla de
+ruta, status): histograma de latencia y totales de sentencias, segundos en la
+base y segundos por fase. `render` los devuelve en el formato de texto de
+Prometheus. El costo por sentencia son dos perf_counter y una ContextVar.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites en segundos (los de prometheus_client por defecto)
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+)
+
+_STARTED_AT = "_request_metrics_started_at"
+
+
+class RequestTiming:
+    __slots__ = ("db_statements", "db_seconds", "phases")
+
+    def __init__(self) -> None:
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Valor del header Server-Timing (duraciones en ms)."""
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        parts.append(f'db;dur={self.db_seconds * 1000:.2f};desc="statements: {self.db_statements}"')
+        parts.append(f"app;dur={total_seconds * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def start_request(timing: RequestTiming) -> Token:
+    return _current.set(timing)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+class timed_phase:
+    """`with timed_phase("auth"): ...` suma la duración a la fase del request en curso."""
+
+    __slots__ = ("_name", "_started")
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *_exc) -> None:
+        timing = _current.get()
+        if timing is not None:
+            elapsed = time.perf_counter() - self._started
+            timing.phases[self._name] = timing.phases.get(self._name, 0.0) + elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        setattr(context, _STARTED_AT, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timing = _current.get()
+    started = getattr(context, _STARTED_AT, None)
+    if timing is not None and started is not None:
+        timing.db_statements += 1
+        timing.db_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Engancha el conteo por request; con AsyncEngine, pasar `async_engine.sync_engine`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self, size: int) -> None:
+        self.buckets = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class _RouteTotals:
+    __slots__ = ("db_statements", "db_seconds", "phases")
+
+    def __init__(self) -> None:
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.phases: Dict[str, float] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._buckets = buckets
+        self._latency: Dict[Tuple[str, str, str], _Histogram] = {}
+        self._totals: Dict[Tuple[str, str], _RouteTotals] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, timing: RequestTiming) -> None:
+        index = bisect.bisect_left(self._buckets, seconds)
+        with self._lock:
+            key = (method, route, str(status_code))
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = _Histogram(len(self._buckets) + 1)
+            histogram.buckets[index] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+            totals = self._totals.get((method, route))
+            if totals is None:
+                totals = self._totals[(method, route)] = _RouteTotals()
+            totals.db_statements += timing.db_statements
+            totals.db_seconds += timing.db_seconds
+            for name, phase_seconds in timing.phases.items():
+                totals.phases[name] = totals.phases.get(name, 0.0) + phase_seconds
+
+    def render(self) -> str:
+        """Formato de texto de Prometheus (0.0.4)."""
+        with self._lock:
+            latency = [(k, list(h.buckets), h.total, h.count) for k, h in sorted(self._latency.items())]
+            totals = [
+                (k, t.db_statements, t.db_seconds, dict(t.phases)) for k, t in sorted(self._totals.items())
+            ]
+
+        lines: List[str] = [
+            "# HELP http_request_duration_seconds Time until the response headers are sent.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        bounds = [f'le="{_number(b)}"}}' for b in self._buckets] + ['le="+Inf"}']
+        for (method, route, status_code), buckets, total, count in latency:
+            labels = _labels(method=method, route=route, status=status_code)
+            # Las etiquetas de la serie se arman una vez; cada bucket solo agrega `le`
+            prefix = f"http_request_duration_seconds_bucket{labels[:-1]},"
+            cumulative = 0
+            for bound, hits in zip(bounds, buckets):
+                cumulative += hits
+                lines.append(f"{prefix}{bound} {cumulative}")
+            lines.append(f"http_request_duration_seconds_sum{labels} {_number(total)}")
+            lines.append(f"http_request_duration_seconds_count{labels} {count}")
+
+        lines += [
+            "# HELP http_request_db_statements_total SQL statements executed by requests.",
+            "# TYPE http_request_db_statements_total counter",
+        ]
+        lines += [
+            f"http_request_db_statements_total{_labels(method=m, route=r)} {statements}"
+            for (m, r), statements, _, _ in totals
+        ]
+        lines += [
+            "# HELP http_request_db_seconds_total Time spent executing SQL statements.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        lines += [
+            f"http_request_db_seconds_total{_labels(method=m, route=r)} {_number(seconds)}"
+            for (m, r), _, seconds, _ in totals
+        ]
+        lines += [
+            "# HELP http_request_phase_seconds_total Time spent per request phase (auth, serialize).",
+            "# TYPE http_request_phase_seconds_total counter",
+        ]
+        lines += [
+            f"http_request_phase_seconds_total{_labels(method=m, route=r, phase=name)} {_number(seconds)}"
+            for (m, r), _, _, phases in totals
+            for name, seconds in sorted(phases.items())
+        ]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,153 @@
+"""
+Fan-out en proceso de eventos de rides hacia suscriptores de streaming (SSE).
+
+Cada suscripción tiene una cola acotada: si el cliente no consume a tiempo, se
+descartan los eventos más viejos y se cuentan, para que el stream le avise que
+debe resincronizar con GET /rides. Publicar nunca espera a un suscriptor lento.
+
+El evento se serializa una sola vez por publicación (y solo si alguien lo
+escucha); las colas guardan los bytes ya listos para enviar. Las suscripciones
+se indexan por su filtro (origen, destino), así que un evento solo toca a las
+suscripciones que le interesan.
+
+`publish` se puede llamar desde cualquier hilo (las rutas sync corren en el
+threadpool): despertar a los suscriptores se agenda en su event loop con una
+sola llamada por publicación.
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+from collections.abc import Callable
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from src.application.ports.ride_event_publisher_port import RideEventPublisherPort
+from src.domain.events import RideEvent
+
+_FilterKey = Tuple[Optional[str], Optional[str]]
+
+
+class TooManySubscribersError(Exception):
+    pass
+
+
+class RideSubscription:
+    __slots__ = ("_broker", "_loop", "_queue", "_ready", "filter_key", "dropped")
+
+    def __init__(
+        self,
+        broker: "RideEventBroker",
+        loop: asyncio.AbstractEventLoop,
+        filter_key: _FilterKey,
+        max_queue: int,
+    ) -> None:
+        self._broker = broker
+        self._loop = loop
+        self._queue: Deque[bytes] = deque(maxlen=max_queue)
+        self._ready = asyncio.Event()
+        self.filter_key = filter_key
+        self.dropped = 0
+
+    def _push(self, payload: bytes) -> bool:
+        """Encola (con el lock del broker); True si la cola estaba vacía."""
+        was_empty = not self._queue
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(payload)
+        return was_empty
+
+    async def next_batch(self, timeout: float) -> Tuple[List[bytes], int]:
+        """Espera eventos hasta `timeout`; devuelve (payloads, descartados desde la última vez)."""
+        if not self._queue:
+            # _ready solo se activa desde callbacks del loop: entre este chequeo
+            # y el wait no puede colarse un aviso
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._broker._drain(self)
+
+    def close(self) -> None:
+        self._broker._unsubscribe(self)
+
+
+class RideEventBroker(RideEventPublisherPort):
+    def __init__(
+        self,
+        encode: Callable[[int, RideEvent], bytes],
+        max_queue: int = 100,
+        max_subscribers: int = 10_000,
+    ) -> None:
+        self._encode = encode
+        self._max_queue = max_queue
+        self._max_subscribers = max_subscribers
+        self._by_filter: Dict[_FilterKey, Set[RideSubscription]] = {}
+        self._count = 0
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        return self._count
+
+    def subscribe(
+        self, origin: Optional[str] = None, destination: Optional[str] = None
+    ) -> RideSubscription:
+        """Se llama desde el event loop que va a consumir la suscripción."""
+        subscription = RideSubscription(
+            self, asyncio.get_running_loop(), (origin, destination), self._max_queue
+        )
+        with self._lock:
+            if self._count >= self._max_subscribers:
+                raise TooManySubscribersError("Too many ride stream subscribers")
+            self._by_filter.setdefault(subscription.filter_key, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def _unsubscribe(self, subscription: RideSubscription) -> None:
+        with self._lock:
+            group = self._by_filter.get(subscription.filter_key)
+            if group is None or subscription not in group:
+                return
+            group.discard(subscription)
+            if not group:
+                del self._by_filter[subscription.filter_key]
+            self._count -= 1
+
+    def _drain(self, subscription: RideSubscription) -> Tuple[List[bytes], int]:
+        with self._lock:
+            payloads = list(subscription._queue)
+            subscription._queue.clear()
+            dropped, subscription.dropped = subscription.dropped, 0
+        return payloads, dropped
+
+    def publish(self, event: RideEvent) -> None:
+        ride = event.ride
+        keys = (
+            (None, None),
+            (ride.origin, None),
+            (None, ride.destination),
+            (ride.origin, ride.destination),
+        )
+        to_wake: Dict[asyncio.AbstractEventLoop, List[RideSubscription]] = {}
+        with self._lock:
+            groups = [self._by_filter[k] for k in keys if k in self._by_filter]
+            if not groups:
+                return
+            payload = self._encode(next(self._sequence), event)
+            for group in groups:
+                for subscription in group:
+                    if subscription._push(payload):
+                        to_wake.setdefault(subscription._loop, []).append(subscription)
+        for loop, subscriptions in to_wake.items():
+            try:
+                loop.call_soon_threadsafe(_wake, subscriptions)
+            except RuntimeError:
+                # Loop cerrado (apagado); sus suscripciones ya no leen
+                pass
+
+
+def _wake(subscriptions: List[RideSubscription]) -> None:
+    for subscription in subscriptions:
+        subscription._ready.set()
@@ -0,0 +1,107 @@
+"""
+Claves de verificación desde un documento JWKS (archivo local o URL).
+
+Las claves se indexan por `kid` en memoria y un hilo en segundo plano las
+refresca periódicamente con jitter, para que las réplicas no golpeen el IAM a la
+vez. La verificación solo lee el índice en memoria: nunca espera un fetch. Un
+`kid` desconocido solo pide un refresco anticipado al hilo.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    def __init__(
+        self,
+        source: str,
+        refresh_seconds: float = 300.0,
+        jitter_seconds: float = 30.0,
+        min_refresh_interval_seconds: float = 10.0,
+        fetch_timeout_seconds: float = 5.0,
+    ) -> None:
+        self._source = source
+        self._refresh_seconds = refresh_seconds
+        self._jitter_seconds = jitter_seconds
+        self._min_refresh_interval = min_refresh_interval_seconds
+        self._fetch_timeout = fetch_timeout_seconds
+        self._keys: dict[str, Any] = {}
+        self._last_refresh = 0.0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def kids(self) -> list[str]:
+        return list(self._keys)
+
+    def get(self, kid: str) -> Optional[Any]:
+        return self._keys.get(kid)
+
+    def _load_document(self) -> dict:
+        if self._source.startswith(("http://", "https://")):
+            response = httpx.get(self._source, timeout=self._fetch_timeout)
+            response.raise_for_status()
+            return response.json()
+        return json.loads(Path(self._source).read_text())
+
+    def refresh(self) -> None:
+        """Descarga y reemplaza el índice de claves (bloqueante; fuera del hot path)."""
+        document = self._load_document()
+        keys: dict[str, Any] = {}
+        for jwk in document.get("keys", []):
+            kid = jwk.get("kid")
+            if not kid or jwk.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[kid] = jwt.PyJWK.from_dict(jwk).key
+            except jwt.PyJWTError:
+                logger.warning("Skipping unusable JWK", extra={"kid": kid})
+        # Reemplazo atómico: los lectores ven el índice viejo o el nuevo, nunca uno a medias
+        self._keys = keys
+        self._last_refresh = time.monotonic()
+
+    def request_refresh(self) -> None:
+        """Pide un refresco anticipado sin esperar su resultado."""
+        self._wake.set()
+
+    def _next_delay(self) -> float:
+        return self._refresh_seconds + random.uniform(0, self._jitter_seconds)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self._next_delay())
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            # Acota los refrescos disparados por kids desconocidos (o basura)
+            elapsed = time.monotonic() - self._last_refresh
+            if elapsed < self._min_refresh_interval:
+                self._stopped.wait(self._min_refresh_interval - elapsed)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("JWKS refresh failed; keeping previous keys")
+
+    def start(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Initial JWKS load failed; retrying in background")
+        self._thread = threading.Thread(target=self._run, name="jwks-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._fetch_timeout)
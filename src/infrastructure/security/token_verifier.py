@@ -0,0 +1,103 @@
+"""
+Verificación de JWT con la clave pública ya parseada y una caché de tokens.
+
+Un mismo bearer token vuelve cientos de veces por minuto; verificar RS256 y
+reparsear el PEM en cada request es trabajo repetido. Los tokens verificados se
+guardan por hash (nunca el token en claro) y caducan a más tardar en su `exp`.
+"""
+import hashlib
+import time
+from typing import Any, Optional
+
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.security.jwks import JWKSKeyStore
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        public_key: Any,
+        algorithm: str,
+        issuer: Optional[str] = None,
+        audience: Optional[str] = None,
+        cache: Optional[TTLCache[dict]] = None,
+        key_store: Optional[JWKSKeyStore] = None,
+    ) -> None:
+        self._key = public_key
+        self._key_store = key_store
+        self._algorithms = [algorithm]
+        self._issuer = issuer
+        self._audience = audience
+        self._cache = cache
+
+    @classmethod
+    def from_pem(
+        cls,
+        pem: str,
+        algorithm: str,
+        issuer: Optional[str] = None,
+        audience: Optional[str] = None,
+        cache_size: int = 0,
+        cache_ttl_seconds: float = 0,
+        key_store: Optional[JWKSKeyStore] = None,
+    ) -> "TokenVerifier":
+        cache = TTLCache[dict](cache_size, cache_ttl_seconds) if cache_size > 0 else None
+        return cls(
+            public_key=load_pem_public_key(pem.encode()),
+            algorithm=algorithm,
+            issuer=issuer,
+            audience=audience,
+            cache=cache,
+            key_store=key_store,
+        )
+
+    @property
+    def cache(self) -> Optional[TTLCache[dict]]:
+        return self._cache
+
+    def _resolve_key(self, token: str) -> Any:
+        """Clave por `kid` desde el JWKS en memoria; si no está, la PEM estática."""
+        if self._key_store is None:
+            return self._key
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid:
+            key = self._key_store.get(kid)
+            if key is not None:
+                return key
+            # Posible rotación: el refresco ocurre en segundo plano, no aquí
+            self._key_store.request_refresh()
+        return self._key
+
+    def _decode(self, token: str) -> dict:
+        decode_kwargs: dict[str, Any] = {
+            "key": self._resolve_key(token),
+            "algorithms": self._algorithms,
+            "options": {"verify_aud": self._audience is not None},
+        }
+        if self._issuer:
+            decode_kwargs["issuer"] = self._issuer
+        if self._audience:
+            decode_kwargs["audience"] = self._audience
+        return jwt.decode(token, **decode_kwargs)
+
+    def verify(self, token: str) -> dict:
+        """Devuelve el payload verificado; lanza `jwt.PyJWTError` si no es válido."""
+        if self._cache is None:
+            return self._decode(token)
+
+        cache_key = hashlib.sha256(token.encode()).digest()
+        payload = self._cache.get(cache_key)
+        if payload is not None:
+            return payload
+
+        payload = self._decode(token)
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            # `exp` es hora de pared; la caché usa un reloj monotónico relativo
+            self._cache.set(cache_key, payload, ttl_seconds=exp - time.time())
+        else:
+            self._cache.set(cache_key, payload)
+        return payload
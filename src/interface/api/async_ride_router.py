@@ -0,0 +1,361 @@
+"""
+Rutas de rides sobre el stack asyncio (DB_ASYNC=true).
+
+Mismo contrato HTTP que ride_router, pero con handlers `async def` que no
+ocupan un hilo del threadpool ni una conexión mientras esperan a la base.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+
+from src.application.dto import (
+    CreateRideCommand,
+    DriverRidesQuery,
+    JoinRideCommand,
+    LeaveRideCommand,
+    ListRidesQuery,
+    PassengerRidesQuery,
+)
+from src.application.use_cases.create_ride import (
+    AsyncBulkCreateRidesUseCase,
+    AsyncCreateRideUseCase,
+)
+from src.application.use_cases.join_ride import (
+    AsyncJoinRideUseCase,
+    RideNotFoundError,
+    RideIsFullError,
+)
+from src.application.use_cases.leave_ride import (
+    AsyncLeaveRideUseCase,
+    PassengerNotJoinedError,
+    RideClosedError,
+)
+from src.application.use_cases.list_rides import (
+    AsyncListDriverRidesUseCase,
+    AsyncListPassengerRidesUseCase,
+    AsyncListRidesUseCase,
+)
+from src.application.use_cases.suggest_places import SuggestPlacesUseCase
+from src.application.use_cases.complete_ride import (
+    AsyncCompleteRideUseCase,
+    NotRideDriverError,
+)
+from src.domain.entities import Ride, RideStatus
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.domain.geo import GeoArea
+from src.interface.api.schemas import (
+    BulkCreateRidesRequest,
+    BulkCreateRidesResponse,
+    CreateRideRequest,
+    DriverRidesResponse,
+    RideResponse,
+    ListRidesResponse,
+    PlaceSuggestionResponse,
+    PlaceSuggestionsResponse,
+)
+from src.interface.api.dependencies import (
+    get_async_create_ride_uc,
+    get_async_bulk_create_rides_uc,
+    get_async_join_ride_uc,
+    get_async_leave_ride_uc,
+    get_async_list_rides_uc,
+    get_async_list_passenger_rides_uc,
+    get_async_list_driver_rides_uc,
+    get_async_complete_ride_uc,
+    get_suggest_places_uc,
+    get_current_user_async,
+    ride_event_broker,
+    async_idempotency_guard,
+    AuthUser,
+)
+from src.config import settings
+from src.interface.api.bulk import bulk_response, parse_bulk_items
+from src.interface.api.geo_params import destination_area_param, origin_area_param
+from src.interface.api.idempotency import idempotent_async, request_hash
+from src.interface.api.pagination import decode_cursor
+from src.interface.api.ride_json import (
+    manifest_page_response,
+    ride_page_response,
+    ride_response,
+)
+from src.interface.api.ride_stream import ride_stream_response
+
+router = APIRouter(prefix="/rides", tags=["rides"])
+
+
+@router.post(
+    "",
+    response_model=RideResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_ride(
+    body: CreateRideRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncCreateRideUseCase = Depends(get_async_create_ride_uc),
+) -> Response:
+    if "DRIVER" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers can create rides",
+        )
+
+    command = CreateRideCommand(
+        driver_id=current_user.user_id,
+        origin=body.origin,
+        destination=body.destination,
+        departure_time=body.departure_time,
+        seats_total=body.seats_total,
+        origin_lat=body.origin_lat,
+        origin_lng=body.origin_lng,
+        destination_lat=body.destination_lat,
+        destination_lng=body.destination_lng,
+    )
+
+    def respond(ride: Ride) -> Response:
+        return ride_response(ride, status_code=status.HTTP_201_CREATED)
+
+    async def handler() -> Response:
+        return respond(await use_case.execute(command))
+
+    return await idempotent_async(
+        async_idempotency_guard,
+        idempotency_key,
+        current_user.user_id,
+        request_hash("POST", "/rides", body.model_dump_json()),
+        handler,
+        respond,
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkCreateRidesResponse,
+)
+async def bulk_create_rides(
+    body: BulkCreateRidesRequest,
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncBulkCreateRidesUseCase = Depends(get_async_bulk_create_rides_uc),
+) -> BulkCreateRidesResponse:
+    if "DRIVER" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers can create rides",
+        )
+
+    commands, positions, rejected = parse_bulk_items(
+        body.rides, current_user.user_id, settings.RIDES_BULK_MAX_ITEMS
+    )
+    results = await use_case.execute(commands) if commands else []
+    return bulk_response(results, positions, rejected)
+
+
+@router.post(
+    "/{ride_id}/join",
+    response_model=RideResponse,
+)
+async def join_ride(
+    ride_id: int,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncJoinRideUseCase = Depends(get_async_join_ride_uc),
+) -> Response:
+    if "STUDENT" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only students can join rides as passengers",
+        )
+
+    command = JoinRideCommand(
+        ride_id=ride_id,
+        passenger_id=current_user.user_id,
+    )
+
+    async def handler() -> Response:
+        try:
+            ride = await use_case.execute(command)
+        except RideNotFoundError:
+            raise HTTPException(status_code=404, detail="Ride not found")
+        except RideIsFullError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except PassengerAlreadyJoinedError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ride_response(ride)
+
+    return await idempotent_async(
+        async_idempotency_guard,
+        idempotency_key,
+        current_user.user_id,
+        request_hash("POST", f"/rides/{ride_id}/join"),
+        handler,
+        ride_response,
+    )
+
+
+@router.post(
+    "/{ride_id}/leave",
+    response_model=RideResponse,
+)
+async def leave_ride(
+    ride_id: int,
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncLeaveRideUseCase = Depends(get_async_leave_ride_uc),
+) -> Response:
+    # Libera el asiento del pasajero; un ride FULL vuelve a OPEN
+    command = LeaveRideCommand(
+        ride_id=ride_id,
+        passenger_id=current_user.user_id,
+    )
+    try:
+        ride = await use_case.execute(command)
+    except RideNotFoundError:
+        raise HTTPException(status_code=404, detail="Ride not found")
+    except (PassengerNotJoinedError, RideClosedError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ride_response(ride)
+
+
+@router.get(
+    "",
+    response_model=ListRidesResponse,
+)
+async def list_rides(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    origin_search: Optional[str] = Query(None, min_length=2),
+    destination_search: Optional[str] = Query(None, min_length=2),
+    status_filter: Optional[RideStatus] = None,
+    departure_from: Optional[datetime] = None,
+    departure_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    origin_area: Optional[GeoArea] = Depends(origin_area_param),
+    destination_area: Optional[GeoArea] = Depends(destination_area_param),
+    use_case: AsyncListRidesUseCase = Depends(get_async_list_rides_uc),
+    _: AuthUser = Depends(get_current_user_async),
+) -> Response:
+    query = ListRidesQuery(
+        origin=origin,
+        destination=destination,
+        origin_search=origin_search,
+        destination_search=destination_search,
+        status=status_filter,
+        departure_from=departure_from,
+        departure_to=departure_to,
+        origin_area=origin_area,
+        destination_area=destination_area,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    page = await use_case.execute(query)
+    return ride_page_response(page)
+
+
+@router.get(
+    "/joined",
+    response_model=ListRidesResponse,
+)
+async def list_joined_rides(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncListPassengerRidesUseCase = Depends(get_async_list_passenger_rides_uc),
+) -> Response:
+    # Rides en los que el usuario sigue unido como pasajero
+    query = PassengerRidesQuery(
+        passenger_id=current_user.user_id,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    page = await use_case.execute(query)
+    return ride_page_response(page)
+
+
+@router.get(
+    "/offered",
+    response_model=DriverRidesResponse,
+)
+async def list_offered_rides(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncListDriverRidesUseCase = Depends(get_async_list_driver_rides_uc),
+) -> Response:
+    # Rides del driver con sus pasajeros unidos
+    if "DRIVER" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers have offered rides",
+        )
+
+    query = DriverRidesQuery(
+        driver_id=current_user.user_id,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    page = await use_case.execute(query)
+    return manifest_page_response(page)
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+)
+async def stream_rides(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    _: AuthUser = Depends(get_current_user_async),
+) -> StreamingResponse:
+    return ride_stream_response(
+        ride_event_broker,
+        origin,
+        destination,
+        heartbeat_seconds=settings.RIDE_STREAM_HEARTBEAT_SECONDS,
+    )
+
+
+@router.get(
+    "/places",
+    response_model=PlaceSuggestionsResponse,
+)
+async def suggest_places(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1),
+    use_case: SuggestPlacesUseCase = Depends(get_suggest_places_uc),
+    _: AuthUser = Depends(get_current_user_async),
+) -> PlaceSuggestionsResponse:
+    # Autocompletado de origen/destino desde el índice en memoria
+    return PlaceSuggestionsResponse(
+        places=[
+            PlaceSuggestionResponse(name=p.name, open_rides=p.open_rides)
+            for p in use_case.execute(q, limit)
+        ]
+    )
+
+
+@router.post(
+    "/{ride_id}/complete",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def complete_ride(
+    ride_id: int,
+    current_user: AuthUser = Depends(get_current_user_async),
+    use_case: AsyncCompleteRideUseCase = Depends(get_async_complete_ride_uc),
+) -> None:
+    if "DRIVER" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers can complete rides",
+        )
+
+    try:
+        await use_case.execute(ride_id, current_user.user_id)
+    except RideNotFoundError:
+        raise HTTPException(status_code=404, detail="Ride not found")
+    except NotRideDriverError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except RideClosedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,86 @@
+"""
+Validación por item y armado de la respuesta del alta masiva de rides.
+
+Los items inválidos no abortan el lote: se reportan con su posición y solo los
+válidos llegan al caso de uso.
+"""
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from src.application.dto import BulkCreateResult, CreateRideCommand
+from src.interface.api.schemas import (
+    BulkCreateRidesResponse,
+    BulkRideResult,
+    CreateRideRequest,
+    RideResponse,
+)
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}"
+        for err in exc.errors()
+    )
+
+
+def parse_bulk_items(
+    items: List[Dict[str, Any]],
+    driver_id: str,
+    max_items: int,
+) -> Tuple[List[CreateRideCommand], List[int], List[BulkRideResult]]:
+    """Devuelve los comandos válidos, su posición original y los items rechazados."""
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_items} rides per request",
+        )
+
+    commands: List[CreateRideCommand] = []
+    positions: List[int] = []
+    rejected: List[BulkRideResult] = []
+    for index, item in enumerate(items):
+        try:
+            body = CreateRideRequest.model_validate(item)
+        except ValidationError as exc:
+            rejected.append(BulkRideResult(index=index, error=_describe(exc)))
+            continue
+        commands.append(
+            CreateRideCommand(
+                driver_id=driver_id,
+                origin=body.origin,
+                destination=body.destination,
+                departure_time=body.departure_time,
+                seats_total=body.seats_total,
+                origin_lat=body.origin_lat,
+                origin_lng=body.origin_lng,
+                destination_lat=body.destination_lat,
+                destination_lng=body.destination_lng,
+            )
+        )
+        positions.append(index)
+    return commands, positions, rejected
+
+
+def bulk_response(
+    results: List[BulkCreateResult],
+    positions: List[int],
+    rejected: List[BulkRideResult],
+) -> BulkCreateRidesResponse:
+    items = list(rejected)
+    for result in results:
+        items.append(
+            BulkRideResult(
+                index=positions[result.index],
+                ride=RideResponse.model_validate(result.ride) if result.ride else None,
+                error=result.error,
+            )
+        )
+    items.sort(key=lambda item: item.index)
+    created = sum(1 for item in items if item.ride is not None)
+    return BulkCreateRidesResponse(
+        created=created,
+        failed=len(items) - created,
+        results=items,
+    )
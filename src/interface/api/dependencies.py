@@ -1,36 +1,99 @@
-from collections.abc import Generator
+import logging
+from collections.abc import AsyncGenerator, Callable, Generator, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
 
-import jwt
 from fastapi import Depends, Header, HTTPException, status
 from jwt import PyJWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.application.ports.async_ride_repository_port import AsyncRideRepositoryPort
+from src.application.ports.async_unit_of_work_port import AsyncUnitOfWorkPort
+from src.application.ports.ride_repository_port import RideRepositoryPort
+from src.application.ports.unit_of_work_port import UnitOfWorkPort
 from src.config import settings
-from src.infrastructure.db.session import get_db_session
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.db.replicas import ReplicaRouter
+from src.infrastructure.db.session import (
+    AsyncSessionLocal,
+    SessionLocal,
+    get_async_db_session,
+    get_db_session,
+    read_replicas,
+)
+from src.infrastructure.housekeeping import HousekeepingScheduler
+from src.infrastructure.idempotency import (
+    AsyncIdempotencyGuard,
+    AsyncIdempotencyStore,
+    AsyncInMemoryIdempotencyStore,
+    IdempotencyGuard,
+    IdempotencyStore,
+    IdempotentResponse,
+    InMemoryIdempotencyStore,
+)
+from src.infrastructure.outbox import OutboxRelay, build_outbox_sink
+from src.infrastructure.place_index import (
+    PlaceIndexRefresher,
+    TrigramPlaceIndex,
+    sql_open_place_counts,
+    sql_place_names,
+)
+from src.infrastructure.request_metrics import RequestMetrics, timed_phase
+from src.infrastructure.ride_event_broker import RideEventBroker
+from src.infrastructure.repositories.cached_ride_repository import (
+    AsyncCachedRideRepository,
+    CachedRideRepository,
+    RideCache,
+)
+from src.infrastructure.repositories.in_memory_unit_of_work import (
+    InMemoryAsyncUnitOfWork,
+    InMemoryUnitOfWork,
+)
+from src.infrastructure.repositories.ride_in_memory_repository import (
+    InMemoryRideStore,
+    RideInMemoryAsyncRepository,
+    RideInMemoryRepository,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_async_repository import (
+    RideSQLAlchemyAsyncRepository,
+)
 from src.infrastructure.repositories.ride_sqlalchemy_repository import (
     RideSQLAlchemyRepository,
 )
-from src.application.use_cases.create_ride import CreateRideUseCase
-from src.application.use_cases.join_ride import JoinRideUseCase
-from src.application.use_cases.list_rides import ListRidesUseCase
-from src.application.use_cases.complete_ride import CompleteRideUseCase
-
-
-# ---------- DB ----------
-def get_db() -> Generator[Session, None, None]:
-    db = get_db_session()
-    try:
-        yield db
-    finally:
-        db.close()
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import (
+    SQLAlchemyAsyncUnitOfWork,
+    SQLAlchemyUnitOfWork,
+)
+from src.infrastructure.security.jwks import JWKSKeyStore
+from src.infrastructure.security.token_verifier import TokenVerifier
+from src.application.use_cases.create_ride import (
+    AsyncBulkCreateRidesUseCase,
+    AsyncCreateRideUseCase,
+    BulkCreateRidesUseCase,
+    CreateRideUseCase,
+)
+from src.application.use_cases.join_ride import AsyncJoinRideUseCase, JoinRideUseCase
+from src.application.use_cases.leave_ride import AsyncLeaveRideUseCase, LeaveRideUseCase
+from src.application.use_cases.list_rides import (
+    AsyncListDriverRidesUseCase,
+    AsyncListPassengerRidesUseCase,
+    AsyncListRidesUseCase,
+    ListDriverRidesUseCase,
+    ListPassengerRidesUseCase,
+    ListRidesUseCase,
+)
+from src.application.use_cases.complete_ride import (
+    AsyncCompleteRideUseCase,
+    CompleteRideUseCase,
+)
+from src.application.use_cases.suggest_places import SuggestPlacesUseCase
+from src.interface.api.ride_stream import encode_event
 
 
-def get_ride_repository(
-    db: Session = Depends(get_db),
-) -> RideSQLAlchemyRepository:
-    return RideSQLAlchemyRepository(db)
+logger = logging.getLogger(__name__)
 
 
 # ---------- JWT / Auth ----------
@@ -40,9 +103,31 @@ class AuthUser:
     roles: list[str] | None = None 
 
 
-def get_current_user(
-    authorization: str = Header(..., alias="Authorization"),
-) -> AuthUser:
+# Se arranca/detiene con la app (ver src/main.py)
+jwks_key_store = (
+    JWKSKeyStore(
+        settings.JWKS_SOURCE,
+        refresh_seconds=settings.JWKS_REFRESH_SECONDS,
+        jitter_seconds=settings.JWKS_REFRESH_JITTER_SECONDS,
+    )
+    if settings.JWKS_SOURCE
+    else None
+)
+
+# La clave se parsea una sola vez al importar; los tokens ya verificados se
+# sirven desde una caché LRU acotada hasta su `exp`.
+token_verifier = TokenVerifier.from_pem(
+    settings.IAM_PUBLIC_KEY,
+    algorithm=settings.JWT_ALGORITHM,
+    issuer=settings.JWT_ISSUER,
+    audience=settings.JWT_AUDIENCE,
+    cache_size=settings.JWT_CACHE_SIZE,
+    cache_ttl_seconds=settings.JWT_CACHE_TTL_SECONDS,
+    key_store=jwks_key_store,
+)
+
+
+def _authenticate(authorization: str) -> AuthUser:
     if not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,22 +136,10 @@ def get_current_user(
 
     token = authorization.split(" ", 1)[1]
 
-    options = {"verify_aud": settings.JWT_AUDIENCE is not None}
     try:
-        decode_kwargs = {
-            "key": settings.IAM_PUBLIC_KEY,
-            "algorithms": [settings.JWT_ALGORITHM],
-            "options": options,
-        }
-        if settings.JWT_ISSUER:
-            decode_kwargs["issuer"] = settings.JWT_ISSUER
-        if settings.JWT_AUDIENCE:
-            decode_kwargs["audience"] = settings.JWT_AUDIENCE
-
-        payload = jwt.decode(token, **decode_kwargs)  # type: ignore[arg-type]
-
+        payload = token_verifier.verify(token)
     except PyJWTError as e:
-        print(e)
+        logger.info("Rejected bearer token", extra={"reason": str(e)})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
@@ -88,31 +161,400 @@ def get_current_user(
     else:
         roles_list = [ str(r) for r in roles_claim ]
 
-    print(payload) 
+    logger.debug("Authenticated request", extra={"sub": user_id, "roles": roles_list})
 
     return AuthUser(user_id=user_id, roles=roles_list)
 
 
+def get_current_user(
+    authorization: str = Header(..., alias="Authorization"),
+) -> AuthUser:
+    with timed_phase("auth"):
+        return _authenticate(authorization)
+
+
+async def get_current_user_async(
+    authorization: str = Header(..., alias="Authorization"),
+) -> AuthUser:
+    # Variante async def: verifica en el event loop sin pasar por el threadpool
+    with timed_phase("auth"):
+        return _authenticate(authorization)
+
+
+# ---------- DB ----------
+def get_db() -> Generator[Session, None, None]:
+    db = get_db_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Lecturas fuera de una escritura: réplica sana o primario (ver src/main.py)
+replica_router = ReplicaRouter(
+    SessionLocal,
+    read_replicas(),
+    async_primary=AsyncSessionLocal,
+    check_seconds=settings.DB_REPLICA_CHECK_SECONDS,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+)
+
+
+def get_read_db(
+    current_user: AuthUser = Depends(get_current_user),
+) -> Generator[Session, None, None]:
+    db = replica_router.read_session(current_user.user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def build_ride_store(backend: str) -> Optional[InMemoryRideStore]:
+    if backend == "memory":
+        return InMemoryRideStore()
+    if backend == "sqlalchemy":
+        return None
+    raise ValueError(f"Unknown repository backend: {backend!r} (expected 'sqlalchemy' or 'memory')")
+
+
+# Con REPOSITORY_BACKEND=memory, los rides de todo el proceso viven acá
+ride_store = build_ride_store(settings.REPOSITORY_BACKEND)
+
+# Caché de rides compartida por todos los requests del proceso (opcional)
+ride_cache = (
+    RideCache(TTLCache(settings.RIDE_CACHE_SIZE, settings.RIDE_CACHE_TTL_SECONDS))
+    if settings.RIDE_CACHE_ENABLED and ride_store is None
+    else None
+)
+
+# Lugares para autocompletar y búsquedas sin pg_trgm; se carga al arrancar y se
+# recuenta en segundo plano (ver src/main.py)
+place_index = TrigramPlaceIndex()
+place_index_refresher = PlaceIndexRefresher(
+    place_index,
+    ride_store.open_place_counts
+    if ride_store is not None
+    else sql_open_place_counts(replica_router.read_session),
+    refresh_seconds=settings.PLACE_INDEX_REFRESH_SECONDS,
+    # El store en memoria arranca vacío: todo lo que tenga pasa por ride_opened
+    load_names=None if ride_store is not None else sql_place_names(replica_router.read_session),
+)
+
+# Eventos confirmados de rides hacia los suscriptores de GET /rides/stream
+ride_event_broker = RideEventBroker(
+    encode_event,
+    max_queue=settings.RIDE_STREAM_QUEUE_SIZE,
+    max_subscribers=settings.RIDE_STREAM_MAX_SUBSCRIBERS,
+)
+
+# Relay del outbox (opcional); se arranca y detiene en src/main.py
+outbox_relay = (
+    OutboxRelay(
+        SessionLocal,
+        build_outbox_sink(settings.OUTBOX_SINK, settings.OUTBOX_FILE_PATH),
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        linger_seconds=settings.OUTBOX_LINGER_SECONDS,
+        poll_seconds=settings.OUTBOX_POLL_SECONDS,
+    )
+    if settings.OUTBOX_ENABLED and ride_store is None
+    else None
+)
+
+# Respuestas de POST /rides y POST /rides/{id}/join por Idempotency-Key
+# (la variante async solo existe con DB_ASYNC, como AsyncSessionLocal)
+idempotency_cache = TTLCache[IdempotentResponse](
+    settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_CACHE_TTL_SECONDS
+)
+if ride_store is not None:
+    memory_idempotency_store = InMemoryIdempotencyStore(
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    )
+    idempotency_guard = IdempotencyGuard(
+        memory_idempotency_store,
+        idempotency_cache,
+        wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    )
+    async_idempotency_guard: Optional[AsyncIdempotencyGuard] = AsyncIdempotencyGuard(
+        AsyncInMemoryIdempotencyStore(memory_idempotency_store),
+        idempotency_cache,
+        wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    )
+    # El store en memoria ya purga las vencidas en cada reserva
+    purge_idempotency_keys: Optional[Callable[[datetime, int], int]] = None
+else:
+    idempotency_store = IdempotencyStore(
+        SessionLocal,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+    )
+    purge_idempotency_keys = idempotency_store.purge_expired
+    idempotency_guard = IdempotencyGuard(
+        idempotency_store,
+        idempotency_cache,
+        wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    )
+    async_idempotency_guard = (
+        AsyncIdempotencyGuard(
+            AsyncIdempotencyStore(
+                AsyncSessionLocal,
+                ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+                lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+            ),
+            idempotency_cache,
+            wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+        )
+        if settings.DB_ASYNC
+        else None
+    )
+
+
+# Latencias y sentencias por ruta; las registra el middleware de src/main.py
+request_metrics = RequestMetrics()
+
+
+# Una unidad de trabajo por lote del housekeeping, siempre sobre el primario y
+# con la misma caché, eventos y outbox que los requests
+@contextmanager
+def housekeeping_unit_of_work() -> Iterator[UnitOfWorkPort]:
+    if ride_store is not None:
+        yield InMemoryUnitOfWork(ride_store, ride_event_broker)
+        return
+    with SessionLocal() as db:
+        yield SQLAlchemyUnitOfWork(db, ride_cache, ride_event_broker, outbox_relay)
+
+
+# Vence y archiva rides y purga claves de Idempotency-Key vencidas en segundo plano (opcional); se arranca y detiene en src/main.py
+housekeeping_scheduler = (
+    HousekeepingScheduler(
+        housekeeping_unit_of_work,
+        interval_seconds=settings.HOUSEKEEPING_INTERVAL_SECONDS,
+        expire_grace_seconds=settings.HOUSEKEEPING_EXPIRE_GRACE_SECONDS,
+        archive_after_seconds=settings.HOUSEKEEPING_ARCHIVE_AFTER_SECONDS,
+        batch_size=settings.HOUSEKEEPING_BATCH_SIZE,
+        batch_pause_seconds=settings.HOUSEKEEPING_BATCH_PAUSE_SECONDS,
+        max_batches=settings.HOUSEKEEPING_MAX_BATCHES,
+        purge_idempotency_keys=purge_idempotency_keys,
+    )
+    if settings.HOUSEKEEPING_ENABLED
+    else None
+)
+
+
+def get_sql_ride_repository(
+    db: Session = Depends(get_read_db),
+) -> RideRepositoryPort:
+    repo = RideSQLAlchemyRepository(db, place_index)
+    if ride_cache is not None:
+        # Lo leído de una réplica puede ser previo a la última escritura
+        return CachedRideRepository(repo, ride_cache, fill=not replica_router.from_replica(db))
+    return repo
+
+
+# Escrituras: la transacción la abre y la confirma el caso de uso
+def get_sql_unit_of_work(
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user),
+) -> UnitOfWorkPort:
+    # Desde acá, este usuario lee del primario por un rato
+    replica_router.mark_write(current_user.user_id)
+    return SQLAlchemyUnitOfWork(db, ride_cache, ride_event_broker, outbox_relay)
+
+
+# Sin sesión de por medio: el backend en memoria no abre nada por request
+def get_memory_ride_repository() -> RideRepositoryPort:
+    return RideInMemoryRepository(ride_store, place_index)  # type: ignore[arg-type]
+
+
+def get_memory_unit_of_work() -> UnitOfWorkPort:
+    return InMemoryUnitOfWork(ride_store, ride_event_broker)  # type: ignore[arg-type]
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    db = get_async_db_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_read_db(
+    current_user: AuthUser = Depends(get_current_user_async),
+) -> AsyncGenerator[AsyncSession, None]:
+    db = replica_router.async_read_session(current_user.user_id)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# En el stack async las dependencias también son async def: FastAPI ejecuta las
+# funciones sync en el threadpool, que es justo lo que este modo evita.
+async def get_async_sql_ride_repository(
+    db: AsyncSession = Depends(get_async_read_db),
+) -> AsyncRideRepositoryPort:
+    repo = RideSQLAlchemyAsyncRepository(db, place_index)
+    if ride_cache is not None:
+        return AsyncCachedRideRepository(repo, ride_cache, fill=not replica_router.from_replica(db))
+    return repo
+
+
+async def get_async_sql_unit_of_work(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user_async),
+) -> AsyncUnitOfWorkPort:
+    replica_router.mark_write(current_user.user_id)
+    return SQLAlchemyAsyncUnitOfWork(db, ride_cache, ride_event_broker, outbox_relay)
+
+
+async def get_async_memory_ride_repository() -> AsyncRideRepositoryPort:
+    return RideInMemoryAsyncRepository(ride_store, place_index)  # type: ignore[arg-type]
+
+
+async def get_async_memory_unit_of_work() -> AsyncUnitOfWorkPort:
+    return InMemoryAsyncUnitOfWork(ride_store, ride_event_broker)  # type: ignore[arg-type]
+
+
+# REPOSITORY_BACKEND elige la implementación de la que dependen los casos de uso
+if ride_store is not None:
+    get_ride_repository = get_memory_ride_repository
+    get_unit_of_work = get_memory_unit_of_work
+    get_async_ride_repository = get_async_memory_ride_repository
+    get_async_unit_of_work = get_async_memory_unit_of_work
+else:
+    get_ride_repository = get_sql_ride_repository
+    get_unit_of_work = get_sql_unit_of_work
+    get_async_ride_repository = get_async_sql_ride_repository
+    get_async_unit_of_work = get_async_sql_unit_of_work
+
+
 # ---------- Use Cases ----------
 def get_create_ride_uc(
-    repo: RideSQLAlchemyRepository = Depends(get_ride_repository),
+    uow: UnitOfWorkPort = Depends(get_unit_of_work),
 ) -> CreateRideUseCase:
-    return CreateRideUseCase(repo)
+    return CreateRideUseCase(uow, place_index)
+
+
+def get_bulk_create_rides_uc(
+    uow: UnitOfWorkPort = Depends(get_unit_of_work),
+) -> BulkCreateRidesUseCase:
+    return BulkCreateRidesUseCase(
+        uow, chunk_size=settings.RIDES_BULK_CHUNK_SIZE, place_index=place_index
+    )
 
 
 def get_join_ride_uc(
-    repo: RideSQLAlchemyRepository = Depends(get_ride_repository),
+    uow: UnitOfWorkPort = Depends(get_unit_of_work),
 ) -> JoinRideUseCase:
-    return JoinRideUseCase(repo)
+    return JoinRideUseCase(uow)
+
+
+def get_leave_ride_uc(
+    uow: UnitOfWorkPort = Depends(get_unit_of_work),
+) -> LeaveRideUseCase:
+    return LeaveRideUseCase(uow)
 
 
 def get_list_rides_uc(
-    repo: RideSQLAlchemyRepository = Depends(get_ride_repository),
+    repo: RideRepositoryPort = Depends(get_ride_repository),
 ) -> ListRidesUseCase:
-    return ListRidesUseCase(repo)
+    return ListRidesUseCase(
+        repo,
+        default_page_size=settings.RIDES_PAGE_SIZE_DEFAULT,
+        max_page_size=settings.RIDES_PAGE_SIZE_MAX,
+    )
+
+
+def get_list_passenger_rides_uc(
+    repo: RideRepositoryPort = Depends(get_ride_repository),
+) -> ListPassengerRidesUseCase:
+    return ListPassengerRidesUseCase(
+        repo,
+        default_page_size=settings.RIDES_PAGE_SIZE_DEFAULT,
+        max_page_size=settings.RIDES_PAGE_SIZE_MAX,
+    )
+
+
+def get_list_driver_rides_uc(
+    repo: RideRepositoryPort = Depends(get_ride_repository),
+) -> ListDriverRidesUseCase:
+    return ListDriverRidesUseCase(
+        repo,
+        default_page_size=settings.RIDES_PAGE_SIZE_DEFAULT,
+        max_page_size=settings.RIDES_PAGE_SIZE_MAX,
+    )
+
+
+# Sin I/O: sirve igual a las rutas sync y a las async
+async def get_suggest_places_uc() -> SuggestPlacesUseCase:
+    return SuggestPlacesUseCase(place_index, max_limit=settings.PLACE_SUGGEST_LIMIT_MAX)
 
 
 def get_complete_ride_uc(
-    repo: RideSQLAlchemyRepository = Depends(get_ride_repository),
+    uow: UnitOfWorkPort = Depends(get_unit_of_work),
 ) -> CompleteRideUseCase:
-    return CompleteRideUseCase(repo)
+    return CompleteRideUseCase(uow)
+
+
+async def get_async_create_ride_uc(
+    uow: AsyncUnitOfWorkPort = Depends(get_async_unit_of_work),
+) -> AsyncCreateRideUseCase:
+    return AsyncCreateRideUseCase(uow, place_index)
+
+
+async def get_async_bulk_create_rides_uc(
+    uow: AsyncUnitOfWorkPort = Depends(get_async_unit_of_work),
+) -> AsyncBulkCreateRidesUseCase:
+    return AsyncBulkCreateRidesUseCase(
+        uow, chunk_size=settings.RIDES_BULK_CHUNK_SIZE, place_index=place_index
+    )
+
+
+async def get_async_join_ride_uc(
+    uow: AsyncUnitOfWorkPort = Depends(get_async_unit_of_work),
+) -> AsyncJoinRideUseCase:
+    return AsyncJoinRideUseCase(uow)
+
+
+async def get_async_leave_ride_uc(
+    uow: AsyncUnitOfWorkPort = Depends(get_async_unit_of_work),
+) -> AsyncLeaveRideUseCase:
+    return AsyncLeaveRideUseCase(uow)
+
+
+async def get_async_list_rides_uc(
+    repo: AsyncRideRepositoryPort = Depends(get_async_ride_repository),
+) -> AsyncListRidesUseCase:
+    return AsyncListRidesUseCase(
+        repo,
+        default_page_size=settings.RIDES_PAGE_SIZE_DEFAULT,
+        max_page_size=settings.RIDES_PAGE_SIZE_MAX,
+    )
+
+
+async def get_async_list_passenger_rides_uc(
+    repo: AsyncRideRepositoryPort = Depends(get_async_ride_repository),
+) -> AsyncListPassengerRidesUseCase:
+    return AsyncListPassengerRidesUseCase(
+        repo,
+        default_page_size=settings.RIDES_PAGE_SIZE_DEFAULT,
+        max_page_size=settings.RIDES_PAGE_SIZE_MAX,
+    )
+
+
+async def get_async_list_driver_rides_uc(
+    repo: AsyncRideRepositoryPort = Depends(get_async_ride_repository),
+) -> AsyncListDriverRidesUseCase:
+    return AsyncListDriverRidesUseCase(
+        repo,
+        default_page_size=settings.RIDES_PAGE_SIZE_DEFAULT,
+        max_page_size=settings.RIDES_PAGE_SIZE_MAX,
+    )
+
+
+async def get_async_complete_ride_uc(
+    uow: AsyncUnitOfWorkPort = Depends(get_async_unit_of_work),
+) -> AsyncCompleteRideUseCase:
+    return AsyncCompleteRideUseCase(uow)
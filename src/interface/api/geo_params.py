@@ -0,0 +1,69 @@
+"""
+Parámetros de búsqueda por cercanía de GET /rides.
+
+Para origen y destino se acepta un radio (`*_lat`, `*_lng`, `*_radius_km`) o
+un rectángulo (`*_bbox=min_lat,min_lng,max_lat,max_lng`), no ambos.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from src.config import settings
+from src.domain.geo import BoundingBox, GeoArea, GeoRadius
+
+
+def _area(
+    place: str,
+    lat: Optional[float],
+    lng: Optional[float],
+    radius_km: Optional[float],
+    bbox: Optional[str],
+) -> Optional[GeoArea]:
+    radius_given = any(v is not None for v in (lat, lng, radius_km))
+    if bbox is not None and radius_given:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Use either {place}_bbox or {place}_lat/{place}_lng/{place}_radius_km",
+        )
+    try:
+        if bbox is not None:
+            parts = bbox.split(",")
+            if len(parts) != 4:
+                raise ValueError("expected min_lat,min_lng,max_lat,max_lng")
+            return BoundingBox(*(float(v) for v in parts))
+        if radius_given:
+            if lat is None or lng is None or radius_km is None:
+                raise ValueError("lat, lng and radius_km are required together")
+            return GeoRadius(lat, lng, radius_km)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid {place} area: {exc}")
+    return None
+
+
+# async def: en el stack async no pasan por el threadpool y en el sync no molestan
+async def origin_area_param(
+    origin_lat: Optional[float] = Query(None, ge=-90, le=90),
+    origin_lng: Optional[float] = Query(None, ge=-180, le=180),
+    origin_radius_km: Optional[float] = Query(
+        None, gt=0, le=settings.RIDES_GEO_MAX_RADIUS_KM
+    ),
+    origin_bbox: Optional[str] = None,
+) -> Optional[GeoArea]:
+    return _area("origin", origin_lat, origin_lng, origin_radius_km, origin_bbox)
+
+
+async def destination_area_param(
+    destination_lat: Optional[float] = Query(None, ge=-90, le=90),
+    destination_lng: Optional[float] = Query(None, ge=-180, le=180),
+    destination_radius_km: Optional[float] = Query(
+        None, gt=0, le=settings.RIDES_GEO_MAX_RADIUS_KM
+    ),
+    destination_bbox: Optional[str] = None,
+) -> Optional[GeoArea]:
+    return _area(
+        "destination",
+        destination_lat,
+        destination_lng,
+        destination_radius_km,
+        destination_bbox,
+    )
@@ -0,0 +1,134 @@
+"""
+Header Idempotency-Key en las rutas de escritura (POST /rides y POST /rides/{id}/join).
+
+La clave es por usuario (`sub` del token). El request se identifica por un
+hash de método, ruta y cuerpo ya validado, así que el formato del JSON (orden,
+espacios) no cambia el hash. Los 4xx que arma la ruta (HTTPException) se
+guardan como cualquier respuesta: un reintento de un join rechazado recibe el
+mismo rechazo, y el de un join exitoso su 200 en vez de "ya unido". Las
+respuestas repetidas llevan `Idempotent-Replayed: true`.
+
+`respond` arma la respuesta exitosa a partir del ride confirmado: la ruta la
+usa en su handler y el guard, para guardarla en la misma transacción.
+"""
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+
+from src.domain.entities import Ride
+from src.infrastructure.idempotency import (
+    AsyncIdempotencyGuard,
+    IdempotencyGuard,
+    IdempotencyInProgressError,
+    IdempotencyKeyReusedError,
+    IdempotentResponse,
+)
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Sugerencia para el cliente cuando la clave está en uso en otra réplica
+_RETRY_AFTER_SECONDS = "1"
+
+
+def request_hash(method: str, path: str, body: str = "") -> str:
+    return hashlib.sha256(f"{method} {path}\n{body}".encode()).hexdigest()
+
+
+def _check_key(key: str) -> None:
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must have between 1 and {IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+        )
+
+
+def _error_body(exc: HTTPException) -> bytes:
+    # El mismo cuerpo que arma FastAPI para una HTTPException
+    return json.dumps({"detail": exc.detail}, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _capture(handler: Callable[[], Response]) -> Tuple[int, bytes]:
+    try:
+        response = handler()
+    except HTTPException as exc:
+        return exc.status_code, _error_body(exc)
+    return response.status_code, bytes(response.body)
+
+
+async def _capture_async(handler: Callable[[], Awaitable[Response]]) -> Tuple[int, bytes]:
+    try:
+        response = await handler()
+    except HTTPException as exc:
+        return exc.status_code, _error_body(exc)
+    return response.status_code, bytes(response.body)
+
+
+def _committed(respond: Callable[[Ride], Response]) -> Callable[[Ride], Tuple[int, bytes]]:
+    def committed(ride: Ride) -> Tuple[int, bytes]:
+        response = respond(ride)
+        return response.status_code, bytes(response.body)
+
+    return committed
+
+
+def _to_response(stored: IdempotentResponse, replayed: bool) -> Response:
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"} if replayed else None,
+    )
+
+
+def _guard_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, IdempotencyKeyReusedError):
+        return HTTPException(status_code=422, detail=str(exc))
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(exc),
+        headers={"Retry-After": _RETRY_AFTER_SECONDS},
+    )
+
+
+def idempotent(
+    guard: IdempotencyGuard,
+    key: Optional[str],
+    scope: str,
+    fingerprint: str,
+    handler: Callable[[], Response],
+    respond: Callable[[Ride], Response],
+) -> Response:
+    """Ejecuta `handler` una sola vez por (scope, key); sin clave, siempre."""
+    if key is None:
+        return handler()
+    _check_key(key)
+    try:
+        stored, replayed = guard.run(
+            scope, key, fingerprint, lambda: _capture(handler), _committed(respond)
+        )
+    except (IdempotencyKeyReusedError, IdempotencyInProgressError) as exc:
+        raise _guard_error(exc)
+    return _to_response(stored, replayed)
+
+
+async def idempotent_async(
+    guard: AsyncIdempotencyGuard,
+    key: Optional[str],
+    scope: str,
+    fingerprint: str,
+    handler: Callable[[], Awaitable[Response]],
+    respond: Callable[[Ride], Response],
+) -> Response:
+    if key is None:
+        return await handler()
+    _check_key(key)
+    try:
+        stored, replayed = await guard.run(
+            scope, key, fingerprint, lambda: _capture_async(handler), _committed(respond)
+        )
+    except (IdempotencyKeyReusedError, IdempotencyInProgressError) as exc:
+        raise _guard_error(exc)
+    return _to_response(stored, replayed)
@@ -0,0 +1,54 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter
+
+from src.infrastructure.db.pool_metrics import engine_pool_stats
+from src.infrastructure.db.session import async_engine, async_replica_engines, engine
+from src.interface.api.dependencies import (
+    housekeeping_scheduler,
+    idempotency_cache,
+    replica_router,
+    ride_cache,
+    token_verifier,
+)
+
+router = APIRouter(prefix="/instrumentation", tags=["instrumentation"])
+
+
+@router.get("/pool")
+def pool_statistics() -> dict:
+    """Estado en vivo de los pools de conexiones (para dimensionarlos con datos)."""
+    stats = {"sync": engine_pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = engine_pool_stats(async_engine.sync_engine)
+    for replica in replica_router.replicas:
+        stats[replica.name] = engine_pool_stats(replica.engine)
+    for position, async_replica_engine in enumerate(async_replica_engines):
+        stats[f"async-replica-{position}"] = engine_pool_stats(async_replica_engine.sync_engine)
+    return stats
+
+
+@router.get("/replicas")
+def replica_statistics() -> dict:
+    """Salud, atraso y lecturas servidas por cada réplica (y por el primario)."""
+    return replica_router.stats()
+
+
+@router.get("/housekeeping")
+def housekeeping_statistics() -> dict:
+    """Rides vencidos y archivados por el housekeeping, y su último ciclo."""
+    if housekeeping_scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **housekeeping_scheduler.stats()}
+
+
+@router.get("/cache")
+def cache_statistics() -> dict:
+    """Aciertos, fallos y desalojos de las cachés en proceso."""
+    stats: dict = {}
+    if ride_cache is not None:
+        stats["rides"] = ride_cache.stats()
+    if token_verifier.cache is not None:
+        stats["jwt"] = asdict(token_verifier.cache.stats())
+    stats["idempotency"] = asdict(idempotency_cache.stats())
+    return stats
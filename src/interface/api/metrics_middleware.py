@@ -0,0 +1,63 @@
+"""
+Middleware ASGI de métricas por request (ver src/infrastructure/request_metrics.py).
+
+ASGI puro en vez de BaseHTTPMiddleware: no envuelve el cuerpo de la respuesta
+(GET /rides/stream sigue siendo streaming) y la ContextVar que pone llega tal
+cual a la ruta. La latencia se mide hasta que salen los headers, que es cuando
+se puede escribir Server-Timing; en las respuestas JSON el cuerpo ya está
+armado en ese punto.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.infrastructure.request_metrics import (
+    RequestMetrics,
+    RequestTiming,
+    end_request,
+    start_request,
+)
+
+# Las rutas sin match (404) comparten etiqueta para no multiplicar las series
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics, server_timing: bool = True) -> None:
+        self.app = app
+        self._metrics = metrics
+        self._server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = start_request(timing)
+        started = time.perf_counter()
+        observed = False
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal observed
+            if message["type"] == "http.response.start" and not observed:
+                observed = True
+                elapsed = time.perf_counter() - started
+                self._observe(scope, message["status"], elapsed, timing)
+                if self._server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.server_timing(elapsed).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            if not observed:
+                # Excepción sin respuesta: la convierte en 500 ServerErrorMiddleware
+                self._observe(scope, 500, time.perf_counter() - started, timing)
+
+    def _observe(self, scope: Scope, status_code: int, seconds: float, timing: RequestTiming) -> None:
+        route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+        self._metrics.observe(scope["method"], route, status_code, seconds, timing)
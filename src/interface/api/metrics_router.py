@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from src.interface.api.dependencies import request_metrics
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Métricas por ruta en formato Prometheus."""
+    return Response(content=request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,24 @@
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from src.application.dto import RideCursor
+
+
+def encode_cursor(cursor: RideCursor) -> str:
+    raw = f"{cursor.departure_time.isoformat()}|{cursor.ride_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value: str) -> RideCursor:
+    try:
+        raw = base64.urlsafe_b64decode(value.encode()).decode()
+        departure_time, ride_id = raw.rsplit("|", 1)
+        return RideCursor(
+            departure_time=datetime.fromisoformat(departure_time),
+            ride_id=int(ride_id),
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,86 @@
+"""
+Serialización directa de rides a JSON para las respuestas de la API.
+
+Armar un `RideResponse` por fila valida cada ride dos veces (al construir el
+modelo y otra vez contra `response_model`) antes de codificarlo.
+Estos `TypeAdapter` se construyen una vez y serializan las entidades del
+dominio tal cual, sin validar, y las rutas devuelven los bytes en un
+`Response` crudo; `response_model` queda solo para el esquema de OpenAPI.
+
+Las entidades ya llegan validadas desde el dominio y tienen los mismos campos
+que `RideResponse`; benchmarks/ride_serialization comprueba que el JSON sea
+idéntico al del camino con modelos.
+"""
+from dataclasses import fields
+from typing import List, Optional, TypedDict, get_type_hints
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+from src.application.dto import RideManifestPage, RidePage
+from src.domain.entities import Ride, RidePassenger
+from src.infrastructure.request_metrics import timed_phase
+from src.interface.api.pagination import encode_cursor
+
+
+class _RidePageBody(TypedDict):
+    rides: List[Ride]
+    next_cursor: Optional[str]
+
+
+# Los campos del ride aplanados junto a sus pasajeros, como RideManifestResponse
+_RideManifestRow = TypedDict(  # type: ignore[misc]
+    "_RideManifestRow",
+    {**get_type_hints(Ride), "passengers": List[RidePassenger]},
+)
+
+
+class _RideManifestPageBody(TypedDict):
+    rides: List[_RideManifestRow]
+    next_cursor: Optional[str]
+
+
+_RIDE_FIELDS = tuple(f.name for f in fields(Ride))
+
+_ride_adapter = TypeAdapter(Ride)
+_ride_page_adapter = TypeAdapter(_RidePageBody)
+_manifest_page_adapter = TypeAdapter(_RideManifestPageBody)
+
+
+def _json_response(content: bytes, status_code: int) -> Response:
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
+
+def encode_ride(ride: Ride) -> bytes:
+    with timed_phase("serialize"):
+        return _ride_adapter.dump_json(ride)
+
+
+def ride_response(ride: Ride, status_code: int = status.HTTP_200_OK) -> Response:
+    return _json_response(encode_ride(ride), status_code)
+
+
+def ride_page_response(page: RidePage) -> Response:
+    body: _RidePageBody = {
+        "rides": page.rides,
+        "next_cursor": encode_cursor(page.next_cursor) if page.next_cursor else None,
+    }
+    with timed_phase("serialize"):
+        content = _ride_page_adapter.dump_json(body)
+    return _json_response(content, status.HTTP_200_OK)
+
+
+def manifest_page_response(page: RideManifestPage) -> Response:
+    body: _RideManifestPageBody = {
+        "rides": [
+            {  # type: ignore[misc]
+                **{name: getattr(m.ride, name) for name in _RIDE_FIELDS},
+                "passengers": m.passengers,
+            }
+            for m in page.rides
+        ],
+        "next_cursor": encode_cursor(page.next_cursor) if page.next_cursor else None,
+    }
+    with timed_phase("serialize"):
+        content = _manifest_page_adapter.dump_json(body)
+    return _json_response(content, status.HTTP_200_OK)
@@ -1,34 +1,87 @@
+import logging
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
-from src.application.dto import CreateRideCommand, JoinRideCommand, ListRidesQuery
-from src.application.use_cases.create_ride import CreateRideUseCase
+from src.application.dto import (
+    CreateRideCommand,
+    DriverRidesQuery,
+    JoinRideCommand,
+    LeaveRideCommand,
+    ListRidesQuery,
+    PassengerRidesQuery,
+)
+from src.application.use_cases.create_ride import (
+    BulkCreateRidesUseCase,
+    CreateRideUseCase,
+)
 from src.application.use_cases.join_ride import (
     JoinRideUseCase,
     RideNotFoundError,
     RideIsFullError,
-    PassengerAlreadyJoinedError,
 )
-from src.application.use_cases.list_rides import ListRidesUseCase
-from src.application.use_cases.complete_ride import CompleteRideUseCase
-from src.domain.entities import RideStatus
+from src.application.use_cases.leave_ride import (
+    LeaveRideUseCase,
+    PassengerNotJoinedError,
+    RideClosedError,
+)
+from src.application.use_cases.list_rides import (
+    ListDriverRidesUseCase,
+    ListPassengerRidesUseCase,
+    ListRidesUseCase,
+)
+from src.application.use_cases.suggest_places import SuggestPlacesUseCase
+from src.application.use_cases.complete_ride import (
+    CompleteRideUseCase,
+    NotRideDriverError,
+)
+from src.domain.entities import Ride, RideStatus
+from src.domain.exceptions import PassengerAlreadyJoinedError
+from src.domain.geo import GeoArea
 from src.interface.api.schemas import (
+    BulkCreateRidesRequest,
+    BulkCreateRidesResponse,
     CreateRideRequest,
+    DriverRidesResponse,
     RideResponse,
     ListRidesResponse,
+    PlaceSuggestionResponse,
+    PlaceSuggestionsResponse,
 )
 from src.interface.api.dependencies import (
     get_create_ride_uc,
+    get_bulk_create_rides_uc,
     get_join_ride_uc,
+    get_leave_ride_uc,
     get_list_rides_uc,
+    get_list_passenger_rides_uc,
+    get_list_driver_rides_uc,
     get_complete_ride_uc,
+    get_suggest_places_uc,
     get_current_user,
+    get_current_user_async,
+    ride_event_broker,
+    idempotency_guard,
     AuthUser,
 )
+from src.config import settings
+from src.interface.api.bulk import bulk_response, parse_bulk_items
+from src.interface.api.geo_params import destination_area_param, origin_area_param
+from src.interface.api.idempotency import idempotent, request_hash
+from src.interface.api.pagination import decode_cursor
+from src.interface.api.ride_json import (
+    manifest_page_response,
+    ride_page_response,
+    ride_response,
+)
+from src.interface.api.ride_stream import ride_stream_response
 
 router = APIRouter(prefix="/rides", tags=["rides"])
 
+logger = logging.getLogger(__name__)
+
 
 @router.post(
     "",
@@ -37,9 +90,10 @@ router = APIRouter(prefix="/rides", tags=["rides"])
 )
 def create_ride(
     body: CreateRideRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: AuthUser = Depends(get_current_user),
     use_case: CreateRideUseCase = Depends(get_create_ride_uc),
-) -> RideResponse:
+) -> Response:
     # Solo rol DRIVER puede crear rides
     if "DRIVER" not in current_user.roles:
         raise HTTPException(
@@ -53,9 +107,48 @@ def create_ride(
         destination=body.destination,
         departure_time=body.departure_time,
         seats_total=body.seats_total,
+        origin_lat=body.origin_lat,
+        origin_lng=body.origin_lng,
+        destination_lat=body.destination_lat,
+        destination_lng=body.destination_lng,
+    )
+
+    def respond(ride: Ride) -> Response:
+        return ride_response(ride, status_code=status.HTTP_201_CREATED)
+
+    def handler() -> Response:
+        return respond(use_case.execute(command))
+
+    return idempotent(
+        idempotency_guard,
+        idempotency_key,
+        current_user.user_id,
+        request_hash("POST", "/rides", body.model_dump_json()),
+        handler,
+        respond,
     )
-    ride = use_case.execute(command)
-    return RideResponse(**ride.__dict__)
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkCreateRidesResponse,
+)
+def bulk_create_rides(
+    body: BulkCreateRidesRequest,
+    current_user: AuthUser = Depends(get_current_user),
+    use_case: BulkCreateRidesUseCase = Depends(get_bulk_create_rides_uc),
+) -> BulkCreateRidesResponse:
+    if "DRIVER" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers can create rides",
+        )
+
+    commands, positions, rejected = parse_bulk_items(
+        body.rides, current_user.user_id, settings.RIDES_BULK_MAX_ITEMS
+    )
+    results = use_case.execute(commands) if commands else []
+    return bulk_response(results, positions, rejected)
 
 
 @router.post(
@@ -64,9 +157,10 @@ def create_ride(
 )
 def join_ride(
     ride_id: int,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: AuthUser = Depends(get_current_user),
     use_case: JoinRideUseCase = Depends(get_join_ride_uc),
-) -> RideResponse:
+) -> Response:
     # Solo rol STUDENT se sube como pasajero
     if "STUDENT" not in current_user.roles :
         raise HTTPException(
@@ -78,16 +172,50 @@ def join_ride(
         ride_id=ride_id,
         passenger_id=current_user.user_id,
     )
+
+    def handler() -> Response:
+        try:
+            ride = use_case.execute(command)
+        except RideNotFoundError:
+            raise HTTPException(status_code=404, detail="Ride not found")
+        except RideIsFullError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except PassengerAlreadyJoinedError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ride_response(ride)
+
+    return idempotent(
+        idempotency_guard,
+        idempotency_key,
+        current_user.user_id,
+        request_hash("POST", f"/rides/{ride_id}/join"),
+        handler,
+        ride_response,
+    )
+
+
+@router.post(
+    "/{ride_id}/leave",
+    response_model=RideResponse,
+)
+def leave_ride(
+    ride_id: int,
+    current_user: AuthUser = Depends(get_current_user),
+    use_case: LeaveRideUseCase = Depends(get_leave_ride_uc),
+) -> Response:
+    # Libera el asiento del pasajero; un ride FULL vuelve a OPEN
+    command = LeaveRideCommand(
+        ride_id=ride_id,
+        passenger_id=current_user.user_id,
+    )
     try:
         ride = use_case.execute(command)
     except RideNotFoundError:
         raise HTTPException(status_code=404, detail="Ride not found")
-    except RideIsFullError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except PassengerAlreadyJoinedError as e:
+    except (PassengerNotJoinedError, RideClosedError) as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return RideResponse(**ride.__dict__)
+    return ride_response(ride)
 
 
 @router.get(
@@ -97,19 +225,117 @@ def join_ride(
 def list_rides(
     origin: Optional[str] = None,
     destination: Optional[str] = None,
+    origin_search: Optional[str] = Query(None, min_length=2),
+    destination_search: Optional[str] = Query(None, min_length=2),
     status_filter: Optional[RideStatus] = None,
+    departure_from: Optional[datetime] = None,
+    departure_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    origin_area: Optional[GeoArea] = Depends(origin_area_param),
+    destination_area: Optional[GeoArea] = Depends(destination_area_param),
     use_case: ListRidesUseCase = Depends(get_list_rides_uc),
     _: AuthUser = Depends(get_current_user),  # cualquier usuario autenticado
-) -> ListRidesResponse:
+) -> Response:
     query = ListRidesQuery(
         origin=origin,
         destination=destination,
+        origin_search=origin_search,
+        destination_search=destination_search,
         status=status_filter,
+        departure_from=departure_from,
+        departure_to=departure_to,
+        origin_area=origin_area,
+        destination_area=destination_area,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
     )
-    rides = use_case.execute(query)
-    print(rides)
-    return ListRidesResponse(
-        rides=[RideResponse(**r.__dict__) for r in rides]
+    page = use_case.execute(query)
+    logger.debug("Listed rides", extra={"count": len(page.rides)})
+    return ride_page_response(page)
+
+
+@router.get(
+    "/joined",
+    response_model=ListRidesResponse,
+)
+def list_joined_rides(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: AuthUser = Depends(get_current_user),
+    use_case: ListPassengerRidesUseCase = Depends(get_list_passenger_rides_uc),
+) -> Response:
+    # Rides en los que el usuario sigue unido como pasajero
+    query = PassengerRidesQuery(
+        passenger_id=current_user.user_id,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    page = use_case.execute(query)
+    return ride_page_response(page)
+
+
+@router.get(
+    "/offered",
+    response_model=DriverRidesResponse,
+)
+def list_offered_rides(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: AuthUser = Depends(get_current_user),
+    use_case: ListDriverRidesUseCase = Depends(get_list_driver_rides_uc),
+) -> Response:
+    # Rides del driver con sus pasajeros unidos
+    if "DRIVER" not in current_user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only drivers have offered rides",
+        )
+
+    query = DriverRidesQuery(
+        driver_id=current_user.user_id,
+        cursor=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+    )
+    page = use_case.execute(query)
+    return manifest_page_response(page)
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+)
+async def stream_rides(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    _: AuthUser = Depends(get_current_user_async),
+) -> StreamingResponse:
+    # async def también en el stack sync: un stream abierto no debe ocupar un
+    # hilo del threadpool
+    return ride_stream_response(
+        ride_event_broker,
+        origin,
+        destination,
+        heartbeat_seconds=settings.RIDE_STREAM_HEARTBEAT_SECONDS,
+    )
+
+
+@router.get(
+    "/places",
+    response_model=PlaceSuggestionsResponse,
+)
+def suggest_places(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1),
+    use_case: SuggestPlacesUseCase = Depends(get_suggest_places_uc),
+    _: AuthUser = Depends(get_current_user),
+) -> PlaceSuggestionsResponse:
+    # Autocompletado de origen/destino desde el índice en memoria
+    return PlaceSuggestionsResponse(
+        places=[
+            PlaceSuggestionResponse(name=p.name, open_rides=p.open_rides)
+            for p in use_case.execute(q, limit)
+        ]
     )
 
 
@@ -122,9 +348,8 @@ def complete_ride(
     current_user: AuthUser = Depends(get_current_user),
     use_case: CompleteRideUseCase = Depends(get_complete_ride_uc),
 ) -> None:
-    # Solo el driver debería poder marcar su ride como completado (simple check aquí)
-    # En un caso real: verificar que current_user.user_id == ride.driver_id
-    # (habría que obtener el ride del repo; aquí lo dejamos simple por tamaño)
+    # Solo el driver del ride puede marcarlo como completado; que sea suyo lo
+    # verifica el propio UPDATE
     if "DRIVER" not in current_user.roles :
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -132,6 +357,10 @@ def complete_ride(
         )
 
     try:
-        use_case.execute(ride_id)
-    except ValueError:
+        use_case.execute(ride_id, current_user.user_id)
+    except RideNotFoundError:
         raise HTTPException(status_code=404, detail="Ride not found")
+    except NotRideDriverError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except RideClosedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
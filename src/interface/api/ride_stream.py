@@ -0,0 +1,61 @@
+"""
+Server-Sent Events de cambios de rides (GET /rides/stream).
+
+Cada evento sale como `id` (secuencia del proceso), `event` (ride.created,
+ride.joined, ride.filled, ride.left, ride.completed, ride.expired) y `data`
+con el ride en el mismo formato que GET /rides. Si el cliente se atrasa y su cola descarta eventos,
+recibe un `event: resync` y debería volver a listar. Sin eventos, un
+comentario de keep-alive mantiene viva la conexión a través de proxies.
+"""
+from collections.abc import AsyncIterator
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from src.domain.events import RideEvent
+from src.infrastructure.ride_event_broker import (
+    RideEventBroker,
+    RideSubscription,
+    TooManySubscribersError,
+)
+from src.interface.api.ride_json import encode_ride
+
+_RETRY_MS = 3000
+
+
+def encode_event(sequence: int, event: RideEvent) -> bytes:
+    head = f"id: {sequence}\nevent: {event.type.value}\ndata: ".encode()
+    return head + encode_ride(event.ride) + b"\n\n"
+
+
+async def _event_stream(
+    subscription: RideSubscription, heartbeat_seconds: float
+) -> AsyncIterator[bytes]:
+    try:
+        yield f"retry: {_RETRY_MS}\n\n".encode()
+        while True:
+            payloads, dropped = await subscription.next_batch(heartbeat_seconds)
+            if dropped:
+                yield f'event: resync\ndata: {{"dropped": {dropped}}}\n\n'.encode()
+            yield b"".join(payloads) if payloads else b": keep-alive\n\n"
+    finally:
+        # Desconexión del cliente (cancelación) o cierre del servidor
+        subscription.close()
+
+
+def ride_stream_response(
+    broker: RideEventBroker,
+    origin: Optional[str],
+    destination: Optional[str],
+    heartbeat_seconds: float,
+) -> StreamingResponse:
+    try:
+        subscription = broker.subscribe(origin=origin, destination=destination)
+    except TooManySubscribersError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return StreamingResponse(
+        _event_stream(subscription, heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from src.domain.entities import RideStatus, PassengerStatus
 
@@ -11,6 +11,18 @@ class RideBase(BaseModel):
     destination: str
     departure_time: datetime
     seats_total: int = Field(gt=0)
+    origin_lat: Optional[float] = Field(None, ge=-90, le=90)
+    origin_lng: Optional[float] = Field(None, ge=-180, le=180)
+    destination_lat: Optional[float] = Field(None, ge=-90, le=90)
+    destination_lng: Optional[float] = Field(None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def _coordinates_in_pairs(self):
+        for place in ("origin", "destination"):
+            lat, lng = getattr(self, f"{place}_lat"), getattr(self, f"{place}_lng")
+            if (lat is None) != (lng is None):
+                raise ValueError(f"{place}_lat and {place}_lng must be given together")
+        return self
 
 
 class CreateRideRequest(RideBase):
@@ -18,6 +30,11 @@ class CreateRideRequest(RideBase):
     pass
 
 
+class BulkCreateRidesRequest(BaseModel):
+    # Cada item se valida por separado para poder reportar errores por posición
+    rides: List[Dict[str, Any]] = Field(min_length=1)
+
+
 class RideResponse(RideBase):
     id: int
     driver_id: str
@@ -26,8 +43,7 @@ class RideResponse(RideBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RidePassengerResponse(BaseModel):
@@ -41,3 +57,34 @@ class RidePassengerResponse(BaseModel):
 
 class ListRidesResponse(BaseModel):
     rides: List[RideResponse]
+    next_cursor: Optional[str] = None
+
+
+class RideManifestResponse(RideResponse):
+    passengers: List[RidePassengerResponse]
+
+
+class DriverRidesResponse(BaseModel):
+    rides: List[RideManifestResponse]
+    next_cursor: Optional[str] = None
+
+
+class BulkRideResult(BaseModel):
+    index: int
+    ride: Optional[RideResponse] = None
+    error: Optional[str] = None
+
+
+class BulkCreateRidesResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRideResult]
+
+
+class PlaceSuggestionResponse(BaseModel):
+    name: str
+    open_rides: int
+
+
+class PlaceSuggestionsResponse(BaseModel):
+    places: List[PlaceSuggestionResponse]
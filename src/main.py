@@ -1,7 +1,34 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.infrastructure.db.session import init_db
-from src.interface.api.ride_router import router as ride_router
+from src.config import settings
+from src.infrastructure.db.session import (
+    async_engine,
+    async_replica_engines,
+    engine,
+    init_db,
+    replica_engines,
+)
+from src.infrastructure.logging_config import configure_logging, shutdown_logging
+from src.infrastructure.request_metrics import instrument_engine
+from src.interface.api.dependencies import (
+    housekeeping_scheduler,
+    jwks_key_store,
+    outbox_relay,
+    place_index_refresher,
+    replica_router,
+    request_metrics,
+    ride_store,
+)
+from src.interface.api.metrics_middleware import RequestMetricsMiddleware
+
+# DB_ASYNC elige entre el stack sync (threadpool + psycopg2) y el asyncio
+if settings.DB_ASYNC:
+    from src.interface.api.async_ride_router import router as ride_router
+else:
+    from src.interface.api.ride_router import router as ride_router
+
+# Logging por cola con escritor en segundo plano; nivel según DEBUG
+configure_logging(debug=settings.DEBUG)
 
 app = FastAPI(title="Ride Service")
 
@@ -16,6 +43,21 @@ app.add_middleware(
     allow_headers=["*"],  # Authorization, Content-Type, etc.
 )
 
+# Último en agregarse = más externo: mide también CORS
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    for replica_engine in replica_engines:
+        instrument_engine(replica_engine)
+    for async_replica_engine in async_replica_engines:
+        instrument_engine(async_replica_engine.sync_engine)
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        metrics=request_metrics,
+        server_timing=settings.METRICS_SERVER_TIMING,
+    )
+
 
 @app.on_event("startup")
 def on_startup() -> None:
@@ -23,12 +65,46 @@ def on_startup() -> None:
     Se ejecuta al arrancar la app.
     Aquí inicializamos la base de datos (crear tablas en dev, etc.).
     """
-    init_db()
+    if ride_store is None:
+        init_db()
+    if jwks_key_store is not None:
+        jwks_key_store.start()
+    # Antes del índice de lugares, que ya lee a través del router
+    replica_router.start()
+    place_index_refresher.start()
+    if outbox_relay is not None:
+        outbox_relay.start()
+    if housekeeping_scheduler is not None:
+        housekeeping_scheduler.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    # Antes que el relay: sus eventos salen en el último drenado
+    if housekeeping_scheduler is not None:
+        housekeeping_scheduler.stop()
+    if outbox_relay is not None:
+        outbox_relay.stop()
+    place_index_refresher.stop()
+    replica_router.stop()
+    if jwks_key_store is not None:
+        jwks_key_store.stop()
+    shutdown_logging()
 
 
 # Montamos las rutas de la capa interface
 app.include_router(ride_router)
 
+if settings.METRICS_ENABLED:
+    from src.interface.api.metrics_router import router as metrics_router
+
+    app.include_router(metrics_router)
+
+if settings.INSTRUMENTATION_ENABLED:
+    from src.interface.api.instrumentation_router import router as instrumentation_router
+
+    app.include_router(instrumentation_router)
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,22 @@
+"""
+Configuración común de los tests.
+
+Los tests escriben, vencen y archivan filas, así que nunca corren contra
+DATABASE_URL: usan TEST_DATABASE_URL (una base descartable, p. ej. PostgreSQL
+en CI) o, si no está, un SQLite temporal. Se fija antes de importar `src`,
+porque los engines se crean al importar la configuración.
+"""
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="ride-service-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{_TMP}/test.db")
+
+import pytest  # noqa: E402
+
+from src.infrastructure.db.session import init_db  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database() -> None:
+    init_db()
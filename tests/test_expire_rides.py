@@ -0,0 +1,62 @@
+"""
+El housekeeping vence los rides que salieron sin que el driver los completara.
+
+Pasan a CANCELLED con un ride.expired: COMPLETED y ride.completed quedan para
+los que el driver completó. Se corre contra la base y contra el store en
+memoria, con salidas en el año 2000 para no tocar los rides de otros tests.
+"""
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+
+from src.application.dto import CreateRideCommand
+from src.application.ports.ride_event_publisher_port import RideEventPublisherPort
+from src.application.use_cases.create_ride import CreateRideUseCase
+from src.application.use_cases.expire_rides import ExpireRidesUseCase
+from src.domain.entities import RideStatus
+from src.domain.events import RideEvent, RideEventType
+from src.infrastructure.db.session import SessionLocal
+from src.infrastructure.repositories.in_memory_unit_of_work import InMemoryUnitOfWork
+from src.infrastructure.repositories.ride_in_memory_repository import InMemoryRideStore
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+DEPARTED = datetime(2000, 1, 1, 8, 0)
+NOW = DEPARTED + timedelta(hours=2)
+
+
+class Recorder(RideEventPublisherPort):
+    def __init__(self) -> None:
+        self.events: List[RideEvent] = []
+
+    def publish(self, event: RideEvent) -> None:
+        self.events.append(event)
+
+
+@pytest.fixture(params=["sqlalchemy", "memory"])
+def unit_of_work(request):
+    if request.param == "memory":
+        store = InMemoryRideStore()
+        yield lambda events=None: InMemoryUnitOfWork(store, events)
+        return
+    with SessionLocal() as session:
+        yield lambda events=None: SQLAlchemyUnitOfWork(session, None, events)
+
+
+def test_departed_rides_expire_to_cancelled(unit_of_work) -> None:
+    command = CreateRideCommand(
+        driver_id="expire-driver",
+        origin="Expire A",
+        destination="UPC Monterrico",
+        departure_time=DEPARTED,
+        seats_total=3,
+    )
+    ride = CreateRideUseCase(unit_of_work()).execute(command)
+    recorder = Recorder()
+
+    expired = ExpireRidesUseCase(unit_of_work(recorder)).execute(NOW, timedelta(hours=1), 100)
+
+    assert expired >= 1
+    mine = [event for event in recorder.events if event.ride.id == ride.id]
+    assert [event.type for event in mine] == [RideEventType.EXPIRED]
+    assert mine[0].ride.status == RideStatus.CANCELLED
@@ -0,0 +1,86 @@
+"""
+Idempotency-Key sobre la tabla: la respuesta exitosa se confirma junto con el ride.
+
+Un request que cae después del commit del caso de uso (acá: el handler falla
+después de crear el ride) no deja la clave libre ni sin respuesta: el
+reintento, aun con la caché fría y pasado `lock_seconds`, repite el 201 en vez
+de crear otro ride.
+"""
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi import Response
+from sqlalchemy import func, select
+
+from src.application.dto import CreateRideCommand
+from src.application.use_cases.create_ride import CreateRideUseCase
+from src.domain.entities import Ride
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.db.models import RideModel
+from src.infrastructure.db.session import SessionLocal
+from src.infrastructure.idempotency import IdempotencyGuard, IdempotencyStore
+from src.infrastructure.repositories.ride_queries import get_idempotency_key_stmt
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+from src.interface.api.idempotency import idempotent, request_hash
+from src.interface.api.ride_json import ride_response
+
+DRIVER = "idem-test-driver"
+
+
+def new_guard() -> IdempotencyGuard:
+    # lock_seconds=0: una reserva sin respuesta se retoma enseguida
+    return IdempotencyGuard(IdempotencyStore(SessionLocal, lock_seconds=0), TTLCache(100, 60))
+
+
+def respond(ride: Ride) -> Response:
+    return ride_response(ride, status_code=201)
+
+
+def post(guard: IdempotencyGuard, key: str, origin: str, crash: bool = False) -> Response:
+    command = CreateRideCommand(
+        driver_id=DRIVER,
+        origin=origin,
+        destination="UPC Monterrico",
+        departure_time=datetime(2031, 1, 1, 8, 0),
+        seats_total=3,
+    )
+
+    def handler() -> Response:
+        with SessionLocal() as session:
+            ride = CreateRideUseCase(SQLAlchemyUnitOfWork(session)).execute(command)
+        if crash:
+            raise RuntimeError("process died after the commit")
+        return respond(ride)
+
+    fingerprint = request_hash("POST", "/rides", origin)
+    return idempotent(guard, key, DRIVER, fingerprint, handler, respond)
+
+
+def rides_from(origin: str) -> int:
+    with SessionLocal() as session:
+        return session.scalar(
+            select(func.count()).select_from(RideModel).where(RideModel.origin == origin)
+        )
+
+
+def test_response_is_stored_with_the_ride() -> None:
+    key, origin = uuid4().hex, f"idem-{uuid4().hex[:8]}"
+
+    first = post(new_guard(), key, origin)
+
+    with SessionLocal() as session:
+        row = session.execute(get_idempotency_key_stmt(DRIVER, key)).one()
+    assert (row.status_code, row.body) == (201, bytes(first.body))
+
+
+def test_retry_after_a_crash_past_the_commit_does_not_create_again() -> None:
+    key, origin = uuid4().hex, f"idem-{uuid4().hex[:8]}"
+
+    with pytest.raises(RuntimeError):
+        post(new_guard(), key, origin, crash=True)
+    retry = post(new_guard(), key, origin)
+
+    assert retry.status_code == 201
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert rides_from(origin) == 1
@@ -0,0 +1,169 @@
+"""
+Claves de verificación por `kid` desde un JWKS (archivo local o un servidor
+HTTP de prueba) y respaldo con la PEM estática.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, Optional
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.infrastructure.security.jwks import JWKSKeyStore
+from src.infrastructure.security.token_verifier import TokenVerifier
+
+
+def private_key() -> rsa.RSAPrivateKey:
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def jwk(key: rsa.RSAPrivateKey, kid: str, use: str = "sig") -> dict:
+    return {**json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key())), "kid": kid, "use": use}
+
+
+def pem(key: rsa.RSAPrivateKey) -> str:
+    return key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+
+def token(key: rsa.RSAPrivateKey, kid: Optional[str] = None) -> str:
+    headers = {"kid": kid} if kid else None
+    return jwt.encode({"sub": "user-1", "exp": time.time() + 300}, key, algorithm="RS256", headers=headers)
+
+
+def write_jwks(path: Path, *jwks: dict) -> None:
+    path.write_text(json.dumps({"keys": list(jwks)}))
+
+
+@pytest.fixture(scope="module")
+def keys() -> dict[str, rsa.RSAPrivateKey]:
+    return {name: private_key() for name in ("static", "a", "b")}
+
+
+def verifier(store: JWKSKeyStore, static: rsa.RSAPrivateKey) -> TokenVerifier:
+    return TokenVerifier.from_pem(pem(static), "RS256", key_store=store)
+
+
+def test_keys_are_indexed_by_kid(tmp_path: Path, keys) -> None:
+    path = tmp_path / "jwks.json"
+    write_jwks(path, jwk(keys["a"], "a"), jwk(keys["b"], "b"), jwk(keys["static"], "enc", use="enc"))
+    store = JWKSKeyStore(str(path))
+    store.refresh()
+
+    assert sorted(store.kids) == ["a", "b"]
+    assert store.get("missing") is None
+    tokens = verifier(store, keys["static"])
+    assert tokens.verify(token(keys["a"], "a"))["sub"] == "user-1"
+    assert tokens.verify(token(keys["b"], "b"))["sub"] == "user-1"
+    # El kid elige la clave: firmado con otra, no verifica
+    with pytest.raises(jwt.PyJWTError):
+        tokens.verify(token(keys["b"], "a"))
+
+
+def test_refresh_rotates_keys(tmp_path: Path, keys) -> None:
+    path = tmp_path / "jwks.json"
+    write_jwks(path, jwk(keys["a"], "a"))
+    store = JWKSKeyStore(str(path))
+    store.refresh()
+    write_jwks(path, jwk(keys["b"], "b"))
+    store.refresh()
+
+    assert store.kids == ["b"]
+    tokens = verifier(store, keys["static"])
+    assert tokens.verify(token(keys["b"], "b"))["sub"] == "user-1"
+    with pytest.raises(jwt.PyJWTError):
+        tokens.verify(token(keys["a"], "a"))
+
+
+def test_unparseable_document_keeps_previous_keys(tmp_path: Path, keys) -> None:
+    path = tmp_path / "jwks.json"
+    write_jwks(path, jwk(keys["a"], "a"))
+    store = JWKSKeyStore(str(path))
+    store.refresh()
+    path.write_text("not json")
+
+    with pytest.raises(ValueError):
+        store.refresh()
+    assert store.kids == ["a"]
+
+
+def test_tokens_without_known_kid_fall_back_to_pem(tmp_path: Path, keys) -> None:
+    path = tmp_path / "jwks.json"
+    write_jwks(path, jwk(keys["a"], "a"))
+    store = JWKSKeyStore(str(path))
+    store.refresh()
+    tokens = verifier(store, keys["static"])
+
+    assert tokens.verify(token(keys["static"]))["sub"] == "user-1"
+    assert tokens.verify(token(keys["static"], "unknown"))["sub"] == "user-1"
+
+
+class _SlowJWKSServer(ThreadingHTTPServer):
+    """Servidor JWKS de prueba: sirve `document` tardando `delay` segundos."""
+
+    document: dict = {"keys": []}
+    delay = 0.0
+    requests = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _SlowJWKSServer
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        body = json.dumps(self.server.document).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+@pytest.fixture
+def jwks_server() -> Iterator[_SlowJWKSServer]:
+    server = _SlowJWKSServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_unknown_kid_requests_refresh_without_blocking(jwks_server: _SlowJWKSServer, keys) -> None:
+    jwks_server.document = {"keys": [jwk(keys["a"], "a")]}
+    store = JWKSKeyStore(
+        f"http://127.0.0.1:{jwks_server.server_address[1]}/jwks.json",
+        refresh_seconds=3600,
+        jitter_seconds=0,
+        min_refresh_interval_seconds=0,
+    )
+    store.start()
+    try:
+        assert store.kids == ["a"]
+        # Rotación en el IAM: el documento nuevo tarda en servirse
+        jwks_server.document = {"keys": [jwk(keys["a"], "a"), jwk(keys["b"], "b")]}
+        jwks_server.delay = 1.0
+        tokens = verifier(store, keys["static"])
+
+        started = time.monotonic()
+        with pytest.raises(jwt.PyJWTError):
+            tokens.verify(token(keys["b"], "b"))
+        assert time.monotonic() - started < 0.5
+
+        deadline = time.monotonic() + 5
+        while store.get("b") is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert tokens.verify(token(keys["b"], "b"))["sub"] == "user-1"
+        assert jwks_server.requests == 2
+    finally:
+        store.stop()
@@ -0,0 +1,165 @@
+"""
+Las migraciones llevan cualquier base al esquema de los modelos.
+
+Sobre archivos SQLite temporales: una base vacía, una creada por `init_db`
+antes de que hubiera migraciones (con un ride y un pasajero, y con ese pasajero
+repetido) y una segunda corrida que no aplica nada. Se comparan columnas (nombre, tipo, nulabilidad,
+PK) e índices (nombre, columnas, unicidad) con `Base.metadata.create_all`.
+"""
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+
+from src.infrastructure.db.base import Base
+from src.infrastructure.db import models  # noqa: F401
+from src.infrastructure.db.migrations import MIGRATIONS, migrate
+
+# Lo que creaba init_db (Base.metadata.create_all) en la versión inicial, en SQLite
+BASELINE_DDL = [
+    """
+    CREATE TABLE rides (
+        id INTEGER NOT NULL,
+        driver_id VARCHAR NOT NULL,
+        origin VARCHAR NOT NULL,
+        destination VARCHAR NOT NULL,
+        departure_time DATETIME NOT NULL,
+        seats_total INTEGER NOT NULL,
+        seats_available INTEGER NOT NULL,
+        status VARCHAR(9) NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX ix_rides_destination ON rides (destination)",
+    "CREATE INDEX ix_rides_driver_id ON rides (driver_id)",
+    "CREATE INDEX ix_rides_id ON rides (id)",
+    "CREATE INDEX ix_rides_origin ON rides (origin)",
+    """
+    CREATE TABLE ride_passengers (
+        id INTEGER NOT NULL,
+        ride_id INTEGER NOT NULL,
+        passenger_id VARCHAR NOT NULL,
+        status VARCHAR(9) NOT NULL,
+        joined_at DATETIME NOT NULL,
+        left_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(ride_id) REFERENCES rides (id)
+    )
+    """,
+    "CREATE INDEX ix_ride_passengers_passenger_id ON ride_passengers (passenger_id)",
+    "CREATE INDEX ix_ride_passengers_id ON ride_passengers (id)",
+    """
+    INSERT INTO rides (id, driver_id, origin, destination, departure_time, seats_total,
+                       seats_available, status, created_at, updated_at)
+    VALUES (1, 'd1', 'A', 'B', '2030-01-01 08:00:00', 4, 3, 'OPEN',
+            '2029-12-31 08:00:00', '2029-12-31 08:00:00')
+    """,
+    """
+    INSERT INTO ride_passengers (id, ride_id, passenger_id, status, joined_at)
+    VALUES (1, 1, 'p1', 'JOINED', '2029-12-31 09:00:00')
+    """,
+]
+
+
+def sqlite_engine(path: Path) -> Engine:
+    return create_engine(f"sqlite:///{path}")
+
+
+def schema(engine: Engine) -> dict:
+    inspector = inspect(engine)
+    result = {}
+    for table in sorted(inspector.get_table_names()):
+        if table == "schema_migrations":
+            continue
+        pk = set(inspector.get_pk_constraint(table)["constrained_columns"])
+        result[table] = {
+            "columns": [
+                (c["name"], str(c["type"]), c["nullable"], c["name"] in pk)
+                for c in sorted(inspector.get_columns(table), key=lambda c: c["name"])
+            ],
+            "indexes": sorted(
+                (i["name"], tuple(i["column_names"]), bool(i["unique"]))
+                for i in inspector.get_indexes(table)
+            ),
+        }
+    return result
+
+
+def diff(expected: dict, actual: dict) -> list[str]:
+    problems = []
+    for table in sorted(expected.keys() | actual.keys()):
+        if table not in actual:
+            problems.append(f"missing table {table}")
+            continue
+        if table not in expected:
+            problems.append(f"unexpected table {table}")
+            continue
+        for part in ("columns", "indexes"):
+            want, got = set(expected[table][part]), set(actual[table][part])
+            for item in sorted(want - got, key=str):
+                problems.append(f"{table}: missing {part[:-1]} {item}")
+            for item in sorted(got - want, key=str):
+                problems.append(f"{table}: unexpected {part[:-1]} {item}")
+    return problems
+
+
+@pytest.fixture
+def expected(tmp_path: Path) -> dict:
+    model = sqlite_engine(tmp_path / "model.db")
+    Base.metadata.create_all(model)
+    return schema(model)
+
+
+@pytest.fixture
+def baseline(tmp_path: Path) -> Engine:
+    engine = sqlite_engine(tmp_path / "baseline.db")
+    with engine.begin() as conn:
+        for statement in BASELINE_DDL:
+            conn.execute(text(statement))
+    return engine
+
+
+def test_fresh_database_matches_models(tmp_path: Path, expected: dict) -> None:
+    engine = sqlite_engine(tmp_path / "fresh.db")
+
+    assert len(migrate(engine)) == len(MIGRATIONS)
+    assert diff(expected, schema(engine)) == []
+
+
+def test_baseline_database_upgrades_and_keeps_rows(baseline: Engine, expected: dict) -> None:
+    assert len(migrate(baseline)) == len(MIGRATIONS)
+    assert diff(expected, schema(baseline)) == []
+    with baseline.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM rides")).scalar_one() == 1
+        assert conn.execute(text("SELECT count(*) FROM ride_passengers")).scalar_one() == 1
+
+
+def test_rerun_applies_nothing(baseline: Engine, expected: dict) -> None:
+    migrate(baseline)
+
+    assert migrate(baseline) == []
+    assert diff(expected, schema(baseline)) == []
+
+
+def test_duplicate_passengers_are_removed_before_the_unique_index(baseline: Engine) -> None:
+    # El join inicial (leer y después insertar) podía anotar dos veces al mismo
+    # pasajero y descontar dos asientos
+    with baseline.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO ride_passengers (id, ride_id, passenger_id, status, joined_at) "
+                "VALUES (2, 1, 'p1', 'CANCELLED', '2029-12-31 08:30:00'), "
+                "(3, 1, 'p1', 'JOINED', '2029-12-31 09:00:00')"
+            )
+        )
+        conn.execute(text("UPDATE rides SET seats_available = 1 WHERE id = 1"))
+
+    assert len(migrate(baseline)) == len(MIGRATIONS)
+    with baseline.connect() as conn:
+        rows = conn.execute(text("SELECT id, status FROM ride_passengers")).all()
+        seats = conn.execute(text("SELECT seats_available, status FROM rides")).one()
+    assert [tuple(row) for row in rows] == [(1, "JOINED")]
+    assert tuple(seats) == (3, "OPEN")
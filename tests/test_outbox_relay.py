@@ -0,0 +1,121 @@
+"""
+Entrega al menos una vez del outbox de eventos de rides.
+
+Cada ride creado con el alta masiva deja un ride.created en `ride_outbox` en la
+misma transacción; el relay lo entrega al sink y borra la fila después.
+"""
+import json
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import List
+
+import pytest
+from sqlalchemy import func, select
+
+from src.application.dto import CreateRideCommand, OutboxMessage
+from src.application.use_cases.create_ride import BulkCreateRidesUseCase
+from src.domain.clock import utcnow
+from src.infrastructure.db.models import RideOutboxModel
+from src.infrastructure.db.session import SessionLocal, engine
+from src.infrastructure.outbox import InMemoryOutboxSink, JsonLinesOutboxSink, OutboxRelay
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+EVENTS = 250
+
+
+class FlakySink(InMemoryOutboxSink):
+    """Entrega el lote y falla después, cada `every` envíos (como un ack perdido)."""
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self._every = every
+        self.calls = 0
+
+    def send(self, messages: List[OutboxMessage]) -> None:
+        super().send(messages)
+        self.calls += 1
+        if self.calls % self._every == 0:
+            raise ConnectionError("sink ack lost")
+
+
+@pytest.fixture(autouse=True)
+def empty_outbox() -> None:
+    OutboxRelay(SessionLocal, InMemoryOutboxSink(), batch_size=1_000).drain()
+
+
+def pending() -> int:
+    with SessionLocal() as session:
+        return session.scalar(select(func.count()).select_from(RideOutboxModel))
+
+
+def write_events(count: int, relay: OutboxRelay) -> None:
+    base = utcnow() + timedelta(days=1)
+    commands = [
+        CreateRideCommand(
+            driver_id="outbox-test",
+            origin=f"Origen {i % 40}",
+            destination="UPC Monterrico",
+            departure_time=base + timedelta(minutes=i),
+            seats_total=4,
+        )
+        for i in range(count)
+    ]
+    with SessionLocal() as session:
+        BulkCreateRidesUseCase(SQLAlchemyUnitOfWork(session, outbox=relay)).execute(commands)
+
+
+def test_relay_delivers_every_event_once() -> None:
+    sink = InMemoryOutboxSink()
+    relay = OutboxRelay(SessionLocal, sink, batch_size=100)
+    write_events(EVENTS, relay)
+
+    assert relay.drain() == EVENTS
+    assert len({m.id for m in sink.messages}) == len(sink.messages) == EVENTS
+    assert {m.event_type for m in sink.messages} == {"ride.created"}
+    assert pending() == 0
+
+
+def test_failing_sink_loses_nothing() -> None:
+    # Se reintenta el lote entero: puede haber duplicados, nunca pérdidas
+    sink = FlakySink(every=3)
+    relay = OutboxRelay(SessionLocal, sink, batch_size=20)
+    write_events(EVENTS, relay)
+    failures = 0
+    while pending():
+        try:
+            relay.drain()
+        except ConnectionError:
+            failures += 1
+
+    assert failures > 0
+    assert len({m.id for m in sink.messages}) == EVENTS
+
+
+def test_concurrent_relays_lose_nothing() -> None:
+    sinks = [InMemoryOutboxSink(), InMemoryOutboxSink()]
+    relays = [OutboxRelay(SessionLocal, sink, batch_size=20) for sink in sinks]
+    write_events(EVENTS, relays[0])
+    threads = [threading.Thread(target=relay.drain) for relay in relays]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [m.id for sink in sinks for m in sink.messages]
+    assert len(set(ids)) == EVENTS
+    assert pending() == 0
+    if engine.dialect.name == "postgresql":
+        # SKIP LOCKED reparte los lotes sin duplicados (SQLite no lo soporta)
+        assert len(ids) == EVENTS
+
+
+def test_json_lines_sink_writes_one_line_per_event(tmp_path: Path) -> None:
+    path = tmp_path / "ride-events.jsonl"
+    relay = OutboxRelay(SessionLocal, JsonLinesOutboxSink(str(path)), batch_size=100)
+    write_events(EVENTS, relay)
+
+    assert relay.drain() == EVENTS
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == EVENTS
+    assert all(json.loads(line)["type"] == "ride.created" for line in lines)
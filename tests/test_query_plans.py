@@ -0,0 +1,159 @@
+"""
+Ninguna consulta del repositorio cae en un recorrido completo de tabla.
+
+Ejecuta los métodos de lectura de RideSQLAlchemyRepository, los lotes del
+housekeeping y la purga de claves de Idempotency-Key (en una transacción que
+se descarta), captura el SQL real y corre EXPLAIN sobre cada sentencia con sus
+mismos parámetros:
+
+- PostgreSQL (TEST_DATABASE_URL): nodo "Seq Scan", con enable_seqscan=off para
+  que el resultado no dependa del tamaño de la tabla sino de que exista un
+  índice utilizable;
+- SQLite: "SCAN <tabla>" sin índice.
+"""
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from src.domain.clock import utcnow
+from src.domain.entities import PassengerStatus, Ride, RidePassenger, RideStatus
+from src.domain.geo import BoundingBox, GeoRadius
+from src.infrastructure.db.session import SessionLocal, engine
+from src.infrastructure.place_index import TrigramPlaceIndex
+from src.infrastructure.repositories.ride_queries import (
+    place_names_stmt,
+    purge_idempotency_keys_stmt,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+
+
+@contextmanager
+def captured_statements():
+    statements: list[tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed(repo: RideSQLAlchemyRepository) -> Ride:
+    now = utcnow()
+    ride = repo.create_ride(
+        Ride(
+            id=None,
+            driver_id="plan-driver",
+            origin="plan-origin",
+            destination="plan-destination",
+            departure_time=now + timedelta(days=1),
+            seats_total=4,
+            seats_available=4,
+            status=RideStatus.OPEN,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    repo.reserve_seat(
+        RidePassenger(
+            id=None,
+            ride_id=ride.id,  # type: ignore[arg-type]
+            passenger_id=f"plan-passenger-{now.timestamp()}",
+            status=PassengerStatus.JOINED,
+            joined_at=now,
+            left_at=None,
+        )
+    )
+    return ride
+
+
+def exercise(repo: RideSQLAlchemyRepository, ride: Ride) -> None:
+    """Cubre las combinaciones de filtros que usa la API."""
+    now = utcnow()
+    cursor = (ride.departure_time, ride.id)
+    repo.get_ride_by_id(ride.id)  # type: ignore[arg-type]
+    repo.get_passenger(ride.id, "plan-passenger")  # type: ignore[arg-type]
+    repo.list_passengers(ride.id)  # type: ignore[arg-type]
+    repo.list_rides(limit=20)
+    repo.list_rides(after=cursor, limit=20)  # type: ignore[arg-type]
+    repo.list_rides(origin=ride.origin, limit=20)
+    repo.list_rides(destination=ride.destination, limit=20)
+    repo.list_rides(origin=ride.origin, destination=ride.destination, limit=20)
+    repo.list_rides(status=RideStatus.OPEN, limit=20)
+    repo.list_rides(status=RideStatus.COMPLETED, limit=20)
+    repo.list_rides(
+        origin=ride.origin,
+        status=RideStatus.OPEN,
+        departure_from=now,
+        departure_to=now + timedelta(days=7),
+        after=cursor,  # type: ignore[arg-type]
+        limit=20,
+    )
+    campus = GeoRadius(lat=-12.104, lng=-76.963, radius_km=2)
+    repo.list_rides(origin_area=campus, limit=20)
+    repo.list_rides(destination_area=BoundingBox(-12.2, -77.1, -12.0, -76.9), limit=20)
+    repo.list_rides(origin_area=campus, status=RideStatus.OPEN, after=cursor, limit=20)  # type: ignore[arg-type]
+    repo.list_rides(origin_search="plan-orig", limit=20)
+    repo.list_rides(destination_search="plan-destnation", status=RideStatus.OPEN, limit=20)
+    repo.list_passenger_rides("plan-passenger", limit=20)
+    repo.list_passenger_rides("plan-passenger", after=cursor, limit=20)  # type: ignore[arg-type]
+    repo.list_driver_rides(ride.driver_id, limit=20)
+    repo.list_driver_rides(ride.driver_id, after=cursor, limit=20)  # type: ignore[arg-type]
+    # Housekeeping con una fecha futura: vence el ride sembrado y lo archiva
+    # (la sesión se cierra sin commit)
+    later = ride.departure_time + timedelta(days=1)
+    repo.expire_rides(later, now, limit=500)
+    repo.archive_rides(later, now, limit=500)
+
+
+def full_scans(plan: str, dialect: str) -> list[str]:
+    if dialect == "postgresql":
+        return re.findall(r"Seq Scan on (\w+)", plan)
+    return [
+        m.group(1)
+        for m in re.finditer(r"\bSCAN (\w+)\b(?! USING)", plan)
+        # Las subconsultas/CTE materializadas no son tablas
+        if m.group(1) not in {"CONSTANT", "SUBQUERY"}
+    ]
+
+
+def explained_plans(statements) -> list[tuple[str, str]]:
+    dialect = engine.dialect.name
+    explain = "EXPLAIN" if dialect == "postgresql" else "EXPLAIN QUERY PLAN"
+    plans = []
+    with engine.connect() as conn:
+        if dialect == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"{explain} {statement}", parameters).all()
+            plans.append((statement, "\n".join(str(row[-1]) for row in rows)))
+    return plans
+
+
+def test_repository_statements_use_indexes() -> None:
+    place_index = TrigramPlaceIndex()
+    with SessionLocal() as session:
+        repo = RideSQLAlchemyRepository(session, place_index)
+        ride = seed(repo)
+        session.commit()
+        place_index.ride_opened(ride)
+        with captured_statements() as statements:
+            exercise(repo, ride)
+            session.execute(place_names_stmt()).all()
+            session.execute(purge_idempotency_keys_stmt(utcnow() - timedelta(days=1), 500))
+
+    assert statements
+    scans = [
+        f"{', '.join(tables)}:\n{statement}\n{plan}"
+        for statement, plan in explained_plans(statements)
+        if (tables := full_scans(plan, engine.dialect.name))
+    ]
+    assert scans == [], "\n\n".join(scans)
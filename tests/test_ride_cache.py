@@ -0,0 +1,62 @@
+"""
+Lecturas de réplicas y la caché compartida de rides.
+
+La "réplica" es la misma base de los tests: lo que se prueba es el ruteo y qué
+lecturas llenan la caché, no el atraso.
+"""
+import pytest
+
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.db.replicas import Replica, ReplicaRouter
+from src.infrastructure.db.session import SessionLocal, engine
+from src.infrastructure.repositories.cached_ride_repository import (
+    CachedRideRepository,
+    RideCache,
+)
+from src.infrastructure.repositories.ride_sqlalchemy_repository import (
+    RideSQLAlchemyRepository,
+)
+
+
+@pytest.fixture
+def router() -> ReplicaRouter:
+    replica = Replica("replica-1", engine, SessionLocal, healthy=True)
+    return ReplicaRouter(SessionLocal, [replica], sticky_seconds=60)
+
+
+@pytest.fixture
+def cache() -> RideCache:
+    return RideCache(TTLCache(100, 60))
+
+
+def list_twice(router: ReplicaRouter, cache: RideCache, user_id: str) -> None:
+    # Como get_sql_ride_repository: una sesión de lectura por request
+    for _ in range(2):
+        with router.read_session(user_id) as db:
+            fill = not router.from_replica(db)
+            CachedRideRepository(RideSQLAlchemyRepository(db), cache, fill=fill).list_rides(
+                origin="cache-test"
+            )
+
+
+def test_replica_reads_do_not_fill_the_cache(router: ReplicaRouter, cache: RideCache) -> None:
+    with router.read_session("reader") as db:
+        assert router.from_replica(db)
+
+    list_twice(router, cache, "reader")
+
+    assert cache.stats().get("list_hits", 0) == 0
+    assert cache.stats()["list_misses"] == 2
+
+
+def test_sticky_writer_reads_the_primary_and_fills_the_cache(
+    router: ReplicaRouter, cache: RideCache
+) -> None:
+    router.mark_write("writer")
+    with router.read_session("writer") as db:
+        assert not router.from_replica(db)
+
+    list_twice(router, cache, "writer")
+
+    assert cache.stats()["list_misses"] == 1
+    assert cache.stats()["list_hits"] == 1
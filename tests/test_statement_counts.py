@@ -0,0 +1,205 @@
+"""
+Presupuesto de sentencias SQL y commits por caso de uso.
+
+Cada caso de uso corre sobre su propia sesión (como un request); se cuentan las
+sentencias que llegan al driver y los commits. La unidad de trabajo lleva
+outbox, así que cada commit con eventos suma un INSERT a `ride_outbox`.
+"""
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import count
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from src.application.dto import (
+    CreateRideCommand,
+    DriverRidesQuery,
+    JoinRideCommand,
+    LeaveRideCommand,
+    PassengerRidesQuery,
+)
+from src.application.use_cases.complete_ride import CompleteRideUseCase
+from src.application.use_cases.create_ride import BulkCreateRidesUseCase, CreateRideUseCase
+from src.application.use_cases.join_ride import JoinRideUseCase, RideIsFullError
+from src.application.use_cases.leave_ride import LeaveRideUseCase
+from src.application.use_cases.list_rides import (
+    ListDriverRidesUseCase,
+    ListPassengerRidesUseCase,
+)
+from src.domain.clock import utcnow
+from src.domain.entities import Ride, RideStatus
+from src.infrastructure.db.session import SessionLocal, engine
+from src.infrastructure.outbox import InMemoryOutboxSink, OutboxRelay
+from src.infrastructure.repositories.sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+BULK_SIZE = 50
+
+# Únicos por corrida: la base de TEST_DATABASE_URL puede traer datos de corridas previas
+_RUN = uuid4().hex[:8]
+_drivers = count()
+
+
+@pytest.fixture
+def relay() -> OutboxRelay:
+    relay = OutboxRelay(SessionLocal, InMemoryOutboxSink(), batch_size=500)
+    relay.drain()  # eventos de otros tests
+    return relay
+
+
+@pytest.fixture
+def driver_id() -> str:
+    return f"count-driver-{_RUN}-{next(_drivers)}"
+
+
+@contextmanager
+def counted(relay: OutboxRelay):
+    counts = {"statements": 0, "commits": 0}
+
+    def statement(*_args) -> None:
+        counts["statements"] += 1
+
+    def commit(*_args) -> None:
+        counts["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", statement)
+    event.listen(engine, "commit", commit)
+    try:
+        with SessionLocal() as session:
+            yield SQLAlchemyUnitOfWork(session, outbox=relay), counts
+    finally:
+        event.remove(engine, "before_cursor_execute", statement)
+        event.remove(engine, "commit", commit)
+
+
+def command(driver_id: str, seats: int, offset: int = 0) -> CreateRideCommand:
+    return CreateRideCommand(
+        driver_id=driver_id,
+        origin="count-origin",
+        destination="count-destination",
+        departure_time=utcnow() + timedelta(days=1, minutes=offset),
+        seats_total=seats,
+    )
+
+
+def create_ride(relay: OutboxRelay, driver_id: str, seats: int = 1) -> Ride:
+    with SessionLocal() as session:
+        return CreateRideUseCase(SQLAlchemyUnitOfWork(session, outbox=relay)).execute(
+            command(driver_id, seats)
+        )
+
+
+def join(relay: OutboxRelay, ride: Ride, passenger_id: str) -> None:
+    with SessionLocal() as session:
+        JoinRideUseCase(SQLAlchemyUnitOfWork(session, outbox=relay)).execute(
+            JoinRideCommand(ride_id=ride.id, passenger_id=passenger_id)  # type: ignore[arg-type]
+        )
+
+
+def test_create_ride(relay: OutboxRelay, driver_id: str) -> None:
+    with counted(relay) as (uow, counts):
+        CreateRideUseCase(uow).execute(command(driver_id, seats=1))
+
+    assert counts == {"statements": 2, "commits": 1}
+    assert relay.drain() == 1
+
+
+def test_bulk_create_rides(relay: OutboxRelay, driver_id: str) -> None:
+    # Sin centinela (SQLite), RETURNING ordenado cae a una fila por sentencia
+    budget = 1 if engine.dialect.name == "postgresql" else BULK_SIZE
+    with counted(relay) as (uow, counts):
+        BulkCreateRidesUseCase(uow, chunk_size=BULK_SIZE).execute(
+            [command(driver_id, seats=2, offset=i) for i in range(BULK_SIZE)]
+        )
+
+    assert counts["statements"] <= budget + 1
+    assert counts["commits"] == 1
+    assert relay.drain() == BULK_SIZE
+
+
+def test_join_ride(relay: OutboxRelay, driver_id: str) -> None:
+    ride = create_ride(relay, driver_id)
+    relay.drain()
+    # get_passenger + UPDATE ... RETURNING + INSERT del pasajero + outbox
+    # (ride.joined y ride.filled en un solo INSERT)
+    with counted(relay) as (uow, counts):
+        JoinRideUseCase(uow).execute(JoinRideCommand(ride_id=ride.id, passenger_id="p1"))  # type: ignore[arg-type]
+
+    assert counts == {"statements": 4, "commits": 1}
+    assert relay.drain() == 2
+
+
+def test_join_full_ride_does_not_commit(relay: OutboxRelay, driver_id: str) -> None:
+    ride = create_ride(relay, driver_id)
+    join(relay, ride, "p1")
+    relay.drain()
+    # get_passenger + UPDATE sin filas + lectura del motivo
+    with counted(relay) as (uow, counts):
+        with pytest.raises(RideIsFullError):
+            JoinRideUseCase(uow).execute(JoinRideCommand(ride_id=ride.id, passenger_id="p2"))  # type: ignore[arg-type]
+
+    assert counts == {"statements": 3, "commits": 0}
+    assert relay.drain() == 0
+
+
+def test_leave_and_rejoin(relay: OutboxRelay, driver_id: str) -> None:
+    ride = create_ride(relay, driver_id)
+    join(relay, ride, "p1")
+    relay.drain()
+    # Baja del pasajero + UPDATE atómico del ride (vuelve a OPEN) + outbox
+    with counted(relay) as (uow, counts):
+        LeaveRideUseCase(uow).execute(LeaveRideCommand(ride_id=ride.id, passenger_id="p1"))  # type: ignore[arg-type]
+    assert counts == {"statements": 3, "commits": 1}
+
+    # Reingreso: reactiva la fila CANCELLED en vez de insertar
+    with counted(relay) as (uow, counts):
+        JoinRideUseCase(uow).execute(JoinRideCommand(ride_id=ride.id, passenger_id="p1"))  # type: ignore[arg-type]
+    assert counts == {"statements": 4, "commits": 1}
+    assert relay.drain() == 3
+
+
+def test_list_passenger_rides(relay: OutboxRelay, driver_id: str) -> None:
+    ride = create_ride(relay, driver_id, seats=2)
+    join(relay, ride, f"{driver_id}-passenger")
+    # Un SELECT con JOIN
+    with counted(relay) as (uow, counts):
+        page = ListPassengerRidesUseCase(uow.rides).execute(
+            PassengerRidesQuery(passenger_id=f"{driver_id}-passenger")
+        )
+
+    assert counts == {"statements": 1, "commits": 0}
+    assert [r.id for r in page.rides] == [ride.id]
+
+
+@pytest.mark.parametrize("page_size", [10, BULK_SIZE])
+def test_list_driver_rides(relay: OutboxRelay, driver_id: str, page_size: int) -> None:
+    with SessionLocal() as session:
+        BulkCreateRidesUseCase(SQLAlchemyUnitOfWork(session, outbox=relay), chunk_size=BULK_SIZE).execute(
+            [command(driver_id, seats=2, offset=i) for i in range(BULK_SIZE)]
+        )
+    # El SELECT de rides y un SELECT ... IN de pasajeros, igual para cualquier tamaño de página
+    with counted(relay) as (uow, counts):
+        page = ListDriverRidesUseCase(uow.rides, max_page_size=BULK_SIZE).execute(
+            DriverRidesQuery(driver_id=driver_id, limit=page_size)
+        )
+
+    assert counts == {"statements": 2, "commits": 0}
+    assert len(page.rides) == page_size
+
+
+def test_complete_ride(relay: OutboxRelay, driver_id: str) -> None:
+    ride = create_ride(relay, driver_id)
+    join(relay, ride, "p1")
+    relay.drain()
+    # UPDATE condicional ... RETURNING (sin leer el ride antes) + outbox
+    with counted(relay) as (uow, counts):
+        CompleteRideUseCase(uow).execute(ride.id, driver_id)  # type: ignore[arg-type]
+    assert counts == {"statements": 2, "commits": 1}
+    assert relay.drain() == 1
+
+    with SessionLocal() as session:
+        completed = SQLAlchemyUnitOfWork(session).rides.get_ride_by_id(ride.id)  # type: ignore[arg-type]
+    assert completed is not None
+    assert completed.status == RideStatus.COMPLETED
+    assert completed.seats_available == 0